@@ -1,11 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from typing import List, Dict, Any, Optional
+import asyncio
+import json
 import logging
 import aiohttp
 import time
-from datetime import datetime
 from base64 import b64decode
-from app.auth.auth import current_active_user
+from app.auth.auth import current_active_user, current_superuser
+from app.config import (
+    FEED_MAX_BYTES,
+    METADATA_HEAD_MAX_BYTES,
+    METADATA_MAX_BYTES,
+    STREAMING_EXTRACTION_ENABLED,
+)
 from app.models.user import User
 from app.schemas.feed import (
     Feed,
@@ -17,22 +25,41 @@ from app.schemas.feed import (
     FavoriteArticleCreate,
     AiSummary,
     AiSummaryCreate,
+    Article,
+    ParseFeedsRequest,
 )
 from app.dynamodb.repositories.feeds import FeedRepository
 from app.dynamodb.repositories.read_articles import ReadArticleRepository
 from app.dynamodb.repositories.favorite_articles import FavoriteArticleRepository
 from app.dynamodb.repositories.ai_summary import AiSummaryRepository
-from app.utils.content_extractor import ContentExtractor
+from app.dynamodb.repositories.articles import get_article_repository
+from app.utils.body_cache import BodyCache
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.feed_parser import FeedParseError
+from app.utils.feed_fetcher import FeedFetcher, FeedRateLimitError
+from app.utils.timeline import (
+    TimelineSnapshots,
+    cursor_snapshot_id,
+    iter_new_entries,
+    merge_timeline,
+    newest_key,
+    normalize_since,
+    watermark,
+    watermark_link,
+)
+from app.utils.host_limiter import HostThrottledError
+from app.utils.http_client import HttpClient, read_prefix, read_until
+from app.utils.extraction_cache import ExtractionCache
+from app.utils.extraction_pool import ExtractionPool, ExtractionTimeoutError
 from app.utils.metadata_extractor import MetadataExtractor
+from app.utils.streaming_extractor import StreamingContentExtractor
+from app.utils.websub import WebSubManager
 from app.utils.summarizer import ArticleSummarizer
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# RSS2JSONのエンドポイント
-RSS2JSON_ENDPOINT = "https://api.rss2json.com/v1/api.json"
-
 
 def get_feed_repository() -> FeedRepository:
     """フィードリポジトリを取得する依存性注入関数"""
@@ -54,11 +81,6 @@ def get_ai_summary_repository() -> AiSummaryRepository:
     return AiSummaryRepository()
 
 
-def get_content_extractor() -> ContentExtractor:
-    """コンテンツ抽出器を取得する依存性注入関数"""
-    return ContentExtractor()
-
-
 def get_metadata_extractor() -> MetadataExtractor:
     """メタデータ抽出器を取得する依存性注入関数"""
     return MetadataExtractor()
@@ -69,6 +91,52 @@ def get_summarizer() -> ArticleSummarizer:
     return ArticleSummarizer()
 
 
+def get_websub_manager() -> WebSubManager:
+    """WebSubマネージャーを取得"""
+    return WebSubManager.get_instance()
+
+
+def get_http_client() -> HttpClient:
+    """共有HTTPクライアントを取得"""
+    return HttpClient.get_instance()
+
+
+def get_body_cache() -> BodyCache:
+    """記事ページの本文キャッシュを取得"""
+    return BodyCache.get_instance()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """本文・メタデータ抽出のプロセスプールを取得"""
+    return ExtractionPool.get_instance()
+
+
+def get_feed_fetcher() -> FeedFetcher:
+    """フィード取得器を取得する依存性注入関数"""
+    return FeedFetcher.get_instance()
+
+
+def get_timeline_snapshots() -> TimelineSnapshots:
+    """タイムラインのマージ元のスナップショットを取得"""
+    return TimelineSnapshots.get_instance()
+
+
+async def resolve_article(article_id: Optional[str], article_repository) -> Article:
+    """記事ストアのキーから記事を取得（見つからなければ404）"""
+    if not article_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="article_linkまたはarticle_idを指定してください",
+        )
+    stored = await article_repository.get_article(article_id)
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="指定された記事が見つかりません",
+        )
+    return stored
+
+
 @router.get("/favorite-articles", response_model=List[FavoriteArticle])
 async def get_favorite_articles(
     user: User = Depends(current_active_user),
@@ -125,10 +193,22 @@ async def add_favorite_article(
         get_favorite_article_repository
     ),
     feed_repository: FeedRepository = Depends(get_feed_repository),
+    article_repository=Depends(get_article_repository),
 ):
     """記事をお気に入りに追加"""
     start_time = time.time()
     try:
+        # 記事ストアのキーが指定された場合はリンク・タイトル等を補完
+        if article.article_id:
+            stored = await resolve_article(article.article_id, article_repository)
+            article.article_link = article.article_link or stored.link
+            article.article_title = article.article_title or stored.title
+            article.article_description = (
+                article.article_description or stored.description
+            )
+            article.article_image = article.article_image or stored.image
+            article.article_categories = article.article_categories or stored.categories
+
         # 外部記事の場合はフィード確認をスキップ
         if article.feed_id is not None and not article.is_external:
             feed_check_start = time.time()
@@ -238,13 +318,21 @@ async def mark_article_as_read(
     read_article_repository: ReadArticleRepository = Depends(
         get_read_article_repository
     ),
+    article_repository=Depends(get_article_repository),
 ):
     """記事を既読としてマークする"""
     try:
+        # 記事ストアのキーが指定された場合はリンクを補完
+        if not article.article_link:
+            stored = await resolve_article(article.article_id, article_repository)
+            article.article_link = stored.link
+
         read_article = await read_article_repository.mark_article_as_read(
             article, user.id
         )
         return read_article
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"既読記事作成エラー: {str(e)}")
         raise HTTPException(
@@ -254,55 +342,62 @@ async def mark_article_as_read(
 
 
 @router.get("/parse-feed")
-async def parse_feed(url: str = Query(...), user: User = Depends(current_active_user)):
+async def parse_feed(
+    url: str = Query(...),
+    since: Optional[str] = Query(
+        None, description="この日時以降の記事だけを返す（前回のwatermark）"
+    ),
+    since_link: Optional[str] = Query(
+        None, description="前回のwatermark_link（既に受け取った最新記事を除く）"
+    ),
+    known: List[str] = Query([], description="取得済みの記事のGUID"),
+    user: User = Depends(current_active_user),
+    feed_fetcher: FeedFetcher = Depends(get_feed_fetcher),
+):
     """RSSフィードを解析するエンドポイント"""
     logger.info(f"Parsing feed: {url}")
     try:
-        # RSS2JSONにリクエスト（API keyなし）
-        params = {
-            "rss_url": url,
+        since_key = normalize_since(since)
+
+        # 条件付きGETで取得し、未更新ならキャッシュ済みの解析結果を使う
+        data = await feed_fetcher.fetch(url)
+        entries = data["entries"]
+
+        if since_key or known:
+            # 新着記事だけを返し、なければ本文なしの応答で済ませる
+            entries = list(iter_new_entries(entries, since_key, set(known), since_link))
+            if not entries:
+                return {
+                    "entries": [],
+                    "status": "not_modified",
+                    "watermark": watermark(data["entries"]),
+                    "watermark_link": watermark_link(data["entries"]),
+                }
+
+        logger.info(f"Successfully processed {len(entries)} articles")
+        return {
+            "entries": entries,
+            "status": "success",
+            "feed": data["feed"],
+            "watermark": watermark(data["entries"]),
+            "watermark_link": watermark_link(data["entries"]),
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(RSS2JSON_ENDPOINT, params=params) as response:
-                # RSS2JSONのレートリミットチェック
-                if response.status == 429:
-                    logger.warning("Rate limit reached for RSS2JSON API")
-                    return {
-                        "status": "error",
-                        "code": 429,
-                        "message": "Rate limit exceeded",
-                    }
-
-                response.raise_for_status()
-                data = await response.json()
-
-        logger.debug(f"RSS2JSON response status: {data.get('status')}")
-
-        if data["status"] != "ok":
-            logger.error(f"RSS2JSON error: {data.get('message', 'Unknown error')}")
-            raise HTTPException(status_code=500, detail="Failed to parse feed")
-
-        # 記事データを整形
-        articles = []
-        for item in data.get("items", []):
-            article = {
-                "title": item.get("title", ""),
-                "link": item.get("link", ""),
-                "description": item.get("description", ""),
-                "published": item.get("pubDate")
-                or item.get("dc:date")
-                or item.get("date")
-                or item.get("published")
-                or datetime.now().isoformat(),
-                "image": item.get("thumbnail", ""),
-                "categories": item.get("categories", []),
-            }
-            articles.append(article)
-
-        logger.info(f"Successfully processed {len(articles)} articles")
-        return {"entries": articles, "status": "success", "feed": data.get("feed", {})}
-
+    except FeedRateLimitError:
+        logger.warning(f"Rate limit reached for feed: {url}")
+        return {
+            "status": "error",
+            "code": 429,
+            "message": "Rate limit exceeded",
+        }
+    except CircuitOpenError as e:
+        logger.warning(f"フィード取得が遮断されました: {str(e)}")
+        raise circuit_open_exception(e)
+    except FeedParseError as e:
+        logger.error(f"Feed parse error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to parse feed")
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
     except aiohttp.ClientError as e:
         logger.error(f"Request error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -312,26 +407,468 @@ async def parse_feed(url: str = Query(...), user: User = Depends(current_active_
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def describe_feed_error(error: BaseException) -> Dict[str, Any]:
+    """フィード取得時の例外をレスポンス用のエラー情報に変換"""
+    if isinstance(error, FeedRateLimitError):
+        return {"code": 429, "message": "Rate limit exceeded"}
+    if isinstance(error, CircuitOpenError):
+        return {"code": 503, "message": "Feed host is temporarily unavailable"}
+    if isinstance(error, asyncio.TimeoutError):
+        return {"code": 504, "message": "Feed fetch timed out"}
+    if isinstance(error, FeedParseError):
+        return {"code": 500, "message": "Failed to parse feed"}
+    if isinstance(error, aiohttp.ClientResponseError):
+        return {"code": error.status, "message": str(error)}
+    return {"code": 500, "message": str(error) or error.__class__.__name__}
+
+
+@router.post("/parse-feeds")
+async def parse_feeds(
+    request: ParseFeedsRequest,
+    user: User = Depends(current_active_user),
+    feed_repository: FeedRepository = Depends(get_feed_repository),
+    feed_fetcher: FeedFetcher = Depends(get_feed_fetcher),
+):
+    """複数のRSSフィードをまとめて解析するエンドポイント"""
+    results: List[Dict[str, Any]] = [
+        {"url": url, "feed_id": None} for url in request.urls
+    ]
+
+    # フィードIDで指定されたものはURLを解決する（フィード一覧は一度だけ読み込む）
+    feeds_by_id = (
+        {str(feed.id): feed for feed in await feed_repository.get_all_feeds()}
+        if request.feed_ids
+        else {}
+    )
+    for feed_id in request.feed_ids:
+        feed = feeds_by_id.get(str(feed_id))
+        if not feed:
+            results.append(
+                {
+                    "url": None,
+                    "feed_id": feed_id,
+                    "status": "error",
+                    "code": 404,
+                    "message": "フィードが見つかりません",
+                }
+            )
+            continue
+        results.append({"url": feed.url, "feed_id": feed.id})
+
+    pending = [result for result in results if "status" not in result]
+    logger.info(f"Parsing {len(pending)} feeds in batch")
+    fetched = await feed_fetcher.fetch_many([result["url"] for result in pending])
+
+    for result, data in zip(pending, fetched):
+        if isinstance(data, BaseException):
+            logger.warning(f"一括解析でのフィード取得エラー ({result['url']}): {data}")
+            result.update({"status": "error", **describe_feed_error(data)})
+            continue
+        result.update(
+            {"status": "success", "entries": data["entries"], "feed": data["feed"]}
+        )
+
+    return {"status": "success", "results": results}
+
+
+async def fetch_timeline_sources(
+    feed_repository: FeedRepository, feed_fetcher: FeedFetcher
+) -> Dict[str, Any]:
+    """有効な全フィードを取得し、タイムラインのマージ元と取得エラーを返す"""
+    feeds = [f for f in await feed_repository.get_all_feeds() if f.enabled]
+    results = await feed_fetcher.fetch_many([feed.url for feed in feeds])
+
+    sources = []
+    errors = []
+    for feed, result in zip(feeds, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"タイムライン用フィード取得エラー ({feed.url}): {result}")
+            errors.append(
+                {
+                    "feed_id": feed.id,
+                    "url": feed.url,
+                    **describe_feed_error(result),
+                }
+            )
+            continue
+        feed_info = {
+            "feedName": feed.name or feed.url,
+            "feedUrl": feed.url,
+            "feed_id": feed.id,
+        }
+        sources.append((feed_info, result["entries"]))
+    return {"sources": sources, "errors": errors}
+
+
+@router.get("/timeline")
+async def get_timeline(
+    limit: int = Query(50, ge=1, le=500, description="1ページの記事数"),
+    cursor: Optional[str] = Query(None, description="前ページのnext_cursor"),
+    since: Optional[str] = Query(
+        None, description="この日時以降の記事だけを返す（前回のwatermark）"
+    ),
+    since_link: Optional[str] = Query(
+        None, description="前回のwatermark_link（既に受け取った最新記事を除く）"
+    ),
+    known: List[str] = Query([], description="取得済みの記事のGUID"),
+    user: User = Depends(current_active_user),
+    feed_repository: FeedRepository = Depends(get_feed_repository),
+    feed_fetcher: FeedFetcher = Depends(get_feed_fetcher),
+    snapshots: TimelineSnapshots = Depends(get_timeline_snapshots),
+):
+    """有効な全フィードの記事を新しい順にマージして返す
+
+    2ページ目以降は1ページ目のマージ元から返し、フィードを取得し直さない。
+    """
+    try:
+        snapshot_id = cursor_snapshot_id(cursor) if cursor else None
+        snapshot = snapshots.get(snapshot_id, user.id)
+        if snapshot is None:
+            snapshot_id = snapshots.new_id()
+            snapshot = await fetch_timeline_sources(feed_repository, feed_fetcher)
+        sources, errors = snapshot["sources"], snapshot["errors"]
+
+        since_key = normalize_since(since)
+        page, next_cursor = merge_timeline(
+            sources, limit, cursor, since_key, set(known), snapshot_id, since_link
+        )
+        if next_cursor:
+            snapshots.put(snapshot_id, user.id, snapshot)
+        latest = newest_key(entries for _, entries in sources) or (None, None)
+
+        if not page and (since_key or known) and not cursor:
+            # 新着記事がなければ本文なしの応答で済ませる
+            return {
+                "status": "not_modified",
+                "entries": [],
+                "next_cursor": None,
+                "watermark": latest[0] or since_key,
+                "watermark_link": latest[1] if latest[0] else since_link,
+                "errors": errors,
+            }
+
+        return {
+            "status": "success",
+            "entries": [{**entry, **feed_info} for feed_info, entry in page],
+            "next_cursor": next_cursor,
+            "watermark": latest[0] or None,
+            "watermark_link": latest[1] if latest[0] else None,
+            "errors": errors,
+        }
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+    except Exception as e:
+        logger.error(f"タイムライン取得エラー: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"タイムラインの取得中にエラーが発生しました: {str(e)}",
+        )
+
+
+# ストリーミング形式ごとのContent-Type
+TIMELINE_STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def encode_stream_event(event: Dict[str, Any], stream_format: str) -> str:
+    """ストリームの1イベントをNDJSONの行またはSSEのメッセージに変換"""
+    payload = json.dumps(event, ensure_ascii=False, default=str)
+    if stream_format == "sse":
+        return f"event: {event['type']}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+@router.get("/timeline/stream")
+async def stream_timeline(
+    request: Request,
+    stream_format: Optional[str] = Query(
+        None,
+        alias="format",
+        pattern="^(ndjson|sse)$",
+        description="ndjson または sse（省略時はAcceptヘッダーで判定）",
+    ),
+    since: Optional[str] = Query(
+        None, description="この日時以降の記事だけを返す（前回のwatermark）"
+    ),
+    since_link: Optional[str] = Query(
+        None, description="前回のwatermark_link（既に受け取った最新記事を除く）"
+    ),
+    known: List[str] = Query([], description="取得済みの記事のGUID"),
+    user: User = Depends(current_active_user),
+    feed_repository: FeedRepository = Depends(get_feed_repository),
+    feed_fetcher: FeedFetcher = Depends(get_feed_fetcher),
+):
+    """有効な全フィードを取得し、取得できたフィードから順に記事を送信する
+
+    各フィードの記事は新しい順に並んだ"feed"イベントとして送られ、
+    並べ替え・マージはクライアント側で行う。最後に"done"イベントを送る。
+    """
+    try:
+        since_key = normalize_since(since)
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
+    if stream_format is None:
+        accept = request.headers.get("Accept", "")
+        stream_format = "sse" if "text/event-stream" in accept else "ndjson"
+
+    feeds = [f for f in await feed_repository.get_all_feeds() if f.enabled]
+    known_guids = set(known)
+
+    async def events():
+        latest = None
+        errors = 0
+        async for index, result in feed_fetcher.iter_completed(
+            [feed.url for feed in feeds]
+        ):
+            feed = feeds[index]
+            if isinstance(result, BaseException):
+                logger.warning(
+                    f"タイムライン用フィード取得エラー ({feed.url}): {result}"
+                )
+                errors += 1
+                event = {
+                    "type": "error",
+                    "feed_id": feed.id,
+                    "url": feed.url,
+                    **describe_feed_error(result),
+                }
+            else:
+                feed_info = {
+                    "feedName": feed.name or feed.url,
+                    "feedUrl": feed.url,
+                    "feed_id": feed.id,
+                }
+                entries = iter_new_entries(
+                    result["entries"], since_key, known_guids, since_link
+                )
+                feed_latest = newest_key([result["entries"]])
+                if feed_latest and (latest is None or feed_latest > latest):
+                    latest = feed_latest
+                event = {
+                    "type": "feed",
+                    **feed_info,
+                    "entries": [{**entry, **feed_info} for entry in entries],
+                    "watermark": watermark(result["entries"]),
+                    "watermark_link": watermark_link(result["entries"]),
+                }
+            yield encode_stream_event(event, stream_format)
+
+        yield encode_stream_event(
+            {
+                "type": "done",
+                "feeds": len(feeds),
+                "errors": errors,
+                "watermark": latest[0] if latest else since_key,
+                "watermark_link": latest[1] if latest else since_link,
+            },
+            stream_format,
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type=TIMELINE_STREAM_MEDIA_TYPES[stream_format],
+        # プロキシでのバッファリングを避けて逐次送信させる
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/fetch-stats")
+async def get_fetch_stats(
+    user: User = Depends(current_active_user),
+    feed_fetcher: FeedFetcher = Depends(get_feed_fetcher),
+):
+    """フィード取得の統計情報（合流・新規取得の件数など）を取得"""
+    return {
+        **feed_fetcher.get_stats(),
+        "http_pool": feed_fetcher.http_client.get_stats(),
+        "body_cache": get_body_cache().get_stats(),
+        "extraction_pool": get_extraction_pool().get_stats(),
+        "extraction_cache": ExtractionCache.get_instance().get_stats(),
+        "websub": get_websub_manager().get_subscriptions(),
+    }
+
+
+@router.get("/circuit-breakers")
+async def get_circuit_breakers(
+    user: User = Depends(current_superuser),
+    http_client: HttpClient = Depends(get_http_client),
+):
+    """配信元ホストごとのサーキットブレーカーの状態を取得（管理者のみ）"""
+    return http_client.breaker.get_stats()
+
+
+@router.post("/circuit-breakers/{host}/reset")
+async def reset_circuit_breaker(
+    host: str,
+    user: User = Depends(current_superuser),
+    http_client: HttpClient = Depends(get_http_client),
+):
+    """ホストのサーキットブレーカーを初期化して遮断を解除（管理者のみ）"""
+    if not http_client.breaker.reset(host):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ホストが見つかりません",
+        )
+    return {"host": host, "reset": True}
+
+
+@router.get("/websub/callback/{callback_id}")
+async def verify_websub_subscription(
+    callback_id: str,
+    request: Request,
+    websub: WebSubManager = Depends(get_websub_manager),
+):
+    """WebSubハブからの購読検証に応答（ハブから呼ばれるため認証なし）"""
+    params = request.query_params
+    lease_seconds = params.get("hub.lease_seconds")
+    challenge = await websub.verify(
+        callback_id,
+        params.get("hub.mode", ""),
+        params.get("hub.topic", ""),
+        params.get("hub.challenge", ""),
+        int(lease_seconds) if lease_seconds and lease_seconds.isdigit() else None,
+    )
+    if challenge is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="購読が見つかりません",
+        )
+    return PlainTextResponse(challenge)
+
+
+@router.post("/websub/callback/{callback_id}")
+async def receive_websub_content(
+    callback_id: str,
+    request: Request,
+    websub: WebSubManager = Depends(get_websub_manager),
+):
+    """WebSubハブから配信されたフィードを取り込む（ハブから呼ばれるため認証なし）
+
+    認証されていない本文を読み込むため、購読を確認してから上限までだけ読み込み、
+    署名を検証してから解析する。
+    """
+    subscription = await websub.get_subscription(callback_id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="購読が見つかりません",
+        )
+
+    body = await read_limited_body(request, FEED_MAX_BYTES)
+    content_type = request.headers.get("Content-Type", "")
+    charset = None
+    if "charset=" in content_type:
+        charset = content_type.split("charset=", 1)[1].split(";")[0].strip(' "')
+
+    try:
+        await websub.receive(
+            subscription, body, request.headers.get("X-Hub-Signature"), charset
+        )
+    except FeedParseError as e:
+        logger.warning(f"WebSub配信の解析に失敗しました: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"フィードの解析に失敗しました: {str(e)}",
+        )
+
+    # 署名が一致しない配信も、仕様に従い2xxで応答して破棄する
+    return Response(status_code=status.HTTP_202_ACCEPTED)
+
+
+async def read_limited_body(request: Request, max_bytes: int) -> bytes:
+    """リクエストの本文をmax_bytesまで読み込む（超える場合は413）"""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"本文が大きすぎます（上限 {max_bytes} バイト）",
+    )
+    length = request.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise too_large
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def throttled_exception(error: HostThrottledError) -> HTTPException:
+    """流量制限で送信できなかったことを429のレスポンスに変換"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"配信元へのリクエストが制限されています: {error.host}",
+        headers={"Retry-After": str(int(error.retry_after) + 1)},
+    )
+
+
+def circuit_open_exception(error: CircuitOpenError) -> HTTPException:
+    """サーキットブレーカーで遮断されたことを503のレスポンスに変換"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"配信元が応答しないため一時的にリクエストを止めています: {error.host}",
+        headers={"Retry-After": str(int(error.retry_after) + 1)},
+    )
+
+
+def extraction_timeout_exception(error: ExtractionTimeoutError) -> HTTPException:
+    """抽出の制限時間超過を504のレスポンスに変換"""
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=f"ページの解析が制限時間内に終わりませんでした: {str(error)}",
+    )
+
+
 @router.get("/extract-metadata")
 async def extract_metadata(
     url: str = Query(..., description="メタデータを抽出するURL"),
     user: User = Depends(current_active_user),
     metadata_extractor: MetadataExtractor = Depends(get_metadata_extractor),
+    http_client: HttpClient = Depends(get_http_client),
+    body_cache: BodyCache = Depends(get_body_cache),
+    extraction_pool: ExtractionPool = Depends(get_extraction_pool),
 ):
     """URLからメタデータ（タイトル、説明、画像など）を抽出"""
     try:
-        # 記事の取得
-        async with aiohttp.ClientSession() as client:
-            async with client.get(url) as response:
+        cached = await body_cache.get(url)
+        if cached is not None:
+            # 取得済みの本文があれば配信元に問い合わせない
+            with cached:
+                metadata = await extraction_pool.extract_metadata(
+                    cached.body, cached.charset, url
+                )
+        else:
+            async with http_client.get(url) as response:
                 if response.status != 200:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail=f"URLにアクセスできません: {response.status}",
                     )
-                html = await response.text()
 
-        # メタデータの抽出
-        metadata = metadata_extractor.extract_metadata(html, url)
+                # OGP・Twitter Cardsは<head>にあるため、まずは</head>まで読んで抽出する
+                body, complete = await read_prefix(
+                    response, METADATA_HEAD_MAX_BYTES, stop_marker=b"</head>"
+                )
+                metadata = await extraction_pool.extract_metadata(
+                    body, response.charset, url
+                )
+
+                # 揃わなければ本文の段落や画像から補うため、上限まで読み進める
+                if not complete and not metadata_extractor.has_head_metadata(metadata):
+                    rest, _ = await read_prefix(
+                        response, METADATA_MAX_BYTES - len(body)
+                    )
+                    metadata = await extraction_pool.extract_metadata(
+                        body + rest, response.charset, url
+                    )
+                    body, complete = body + rest, response.content.at_eof()
+
+                # 最後まで読めた本文は要約などで再利用できるよう保存する
+                if complete:
+                    await body_cache.set(url, body, response.charset)
 
         return {
             "title": metadata.get("title", ""),
@@ -339,6 +876,15 @@ async def extract_metadata(
             "image": metadata.get("image", ""),
             "categories": metadata.get("keywords", []),
         }
+    except HostThrottledError as e:
+        logger.warning(f"URL取得が流量制限されました: {str(e)}")
+        raise throttled_exception(e)
+    except CircuitOpenError as e:
+        logger.warning(f"URL取得が遮断されました: {str(e)}")
+        raise circuit_open_exception(e)
+    except ExtractionTimeoutError as e:
+        logger.error(f"メタデータ抽出がタイムアウトしました ({url}): {str(e)}")
+        raise extraction_timeout_exception(e)
     except aiohttp.ClientError as e:
         logger.error(f"URL取得エラー: {str(e)}")
         raise HTTPException(
@@ -482,10 +1028,18 @@ async def summarize_article(
     article: AiSummaryCreate,
     lang: str = Query("ja", description="要約の言語（ja/en）"),
     ai_summary_repository: AiSummaryRepository = Depends(get_ai_summary_repository),
-    content_extractor: ContentExtractor = Depends(get_content_extractor),
     summarizer: ArticleSummarizer = Depends(get_summarizer),
+    article_repository=Depends(get_article_repository),
+    http_client: HttpClient = Depends(get_http_client),
+    body_cache: BodyCache = Depends(get_body_cache),
+    extraction_pool: ExtractionPool = Depends(get_extraction_pool),
 ):
     """記事を要約する"""
+    # 記事ストアのキーが指定された場合はリンクを補完
+    if not article.article_link:
+        stored = await resolve_article(article.article_id, article_repository)
+        article.article_link = stored.link
+
     # 外部記事の場合は feed_id を None として扱う
     feed_id = None if article.feed_id == 0 else article.feed_id
 
@@ -497,20 +1051,42 @@ async def summarize_article(
         return existing_summary
 
     try:
-        # 記事本文の取得
-        async with aiohttp.ClientSession() as client:
-            async with client.get(article.article_link) as response:
+        # 記事本文の取得（取得済みの本文があれば再利用する）し、HTMLから本文を抽出
+        cached = await body_cache.get(article.article_link)
+        if cached is not None:
+            with cached:
+                article_text = await extraction_pool.extract_content(
+                    cached.body, cached.charset, article.article_link
+                )
+        else:
+            async with http_client.get(article.article_link, hedge=True) as response:
                 if response.status != 200:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail=f"記事にアクセスできません: {response.status}",
                     )
-                html = await response.text()
-
-        # HTMLから本文を抽出
-        article_text = content_extractor.extract_main_content(
-            html, article.article_link
-        )
+                charset = response.charset
+                if STREAMING_EXTRACTION_ENABLED:
+                    # 要約に使う文字数の本文が集まったら受信を打ち切る
+                    streaming = StreamingContentExtractor(
+                        article.article_link, summarizer.max_input_chars, charset
+                    )
+                    body, complete = await read_until(response, streaming.feed)
+                    if complete:
+                        # 最後まで受信した場合は保留していた要素から本文を決める
+                        streaming.finish_input()
+                else:
+                    streaming = None
+                    body, complete = await response.read(), True
+                # 最後まで読めた本文は再利用できるよう保存する
+                if complete:
+                    await body_cache.set(article.article_link, body, charset)
+            if streaming is not None and streaming.done:
+                article_text = streaming.text
+            else:
+                article_text = await extraction_pool.extract_content(
+                    body, charset, article.article_link
+                )
 
         # 本文が短すぎる場合はエラー
         if len(article_text) < 100:
@@ -529,12 +1105,21 @@ async def summarize_article(
 
         # 要約をDBに保存
         new_summary = await ai_summary_repository.create_summary(
-            article.article_link, summary_text, feed_id
+            article.article_link, summary_text, feed_id, article.article_id
         )
 
         return new_summary
     except HTTPException:
         raise
+    except HostThrottledError as e:
+        logger.warning(f"記事取得が流量制限されました: {str(e)}")
+        raise throttled_exception(e)
+    except CircuitOpenError as e:
+        logger.warning(f"URL取得が遮断されました: {str(e)}")
+        raise circuit_open_exception(e)
+    except ExtractionTimeoutError as e:
+        logger.error(f"本文抽出がタイムアウトしました: {str(e)}")
+        raise extraction_timeout_exception(e)
     except Exception as e:
         logger.error(f"記事要約エラー: {str(e)}")
         raise HTTPException(
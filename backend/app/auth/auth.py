@@ -41,3 +41,4 @@ async def get_user_manager(user_db=Depends(get_dynamo_user_db)):
 fastapi_users = FastAPIUsers[User, int](get_user_manager, [auth_backend])
 
 current_active_user = fastapi_users.current_user(active=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,3 +16,168 @@ AWS_SECRET_ACCESS_KEY = os.getenv("ENV_AWS_SECRET_ACCESS_KEY", "dummy")
 
 # USE_DYNAMODBは残しておく（他の場所で使用されている可能性がある）
 USE_DYNAMODB = os.getenv("USE_DYNAMODB", "true").lower() == "true"
+
+# フィードキャッシュ設定（保持するフィード数の上限）
+FEED_CACHE_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "500"))
+
+# バックグラウンドでのフィード定期取得設定
+FEED_POLL_ENABLED = os.getenv("FEED_POLL_ENABLED", "true").lower() == "true"
+FEED_POLL_CONCURRENCY = int(os.getenv("FEED_POLL_CONCURRENCY", "5"))
+FEED_POLL_MIN_INTERVAL = int(os.getenv("FEED_POLL_MIN_INTERVAL", "300"))
+FEED_POLL_MAX_INTERVAL = int(os.getenv("FEED_POLL_MAX_INTERVAL", "21600"))
+FEED_POLL_DEFAULT_INTERVAL = int(os.getenv("FEED_POLL_DEFAULT_INTERVAL", "900"))
+FEED_LIST_REFRESH_INTERVAL = int(os.getenv("FEED_LIST_REFRESH_INTERVAL", "300"))
+# 定期取得を行うプロセスを1つに決めるロックファイル（同じホストのワーカーで共有、空の場合は全プロセスが取得）
+FEED_POLL_LOCK_FILE = os.getenv(
+    "FEED_POLL_LOCK_FILE",
+    os.path.join(tempfile.gettempdir(), "rss-feed-app", "feed-poll.lock"),
+)
+# 定期取得の結果を他のワーカーと共有するディレクトリ（空の場合は共有しない）
+FEED_CACHE_SHARED_DIR = os.getenv(
+    "FEED_CACHE_SHARED_DIR",
+    os.path.join(tempfile.gettempdir(), "rss-feed-app", "feeds"),
+)
+
+# 記事ストアのバックエンド（dynamodb / local）
+ARTICLE_STORE_BACKEND = os.getenv(
+    "ARTICLE_STORE_BACKEND", "dynamodb" if USE_DYNAMODB else "local"
+).lower()
+
+# 取得直後のフィードを再検証せずに返す期間（秒）
+FEED_FRESHNESS_WINDOW = float(os.getenv("FEED_FRESHNESS_WINDOW", "30"))
+
+# 複数フィードの一括取得設定（同時取得数・フィードごとのタイムアウト秒数）
+FEED_BATCH_CONCURRENCY = int(os.getenv("FEED_BATCH_CONCURRENCY", "10"))
+FEED_BATCH_TIMEOUT = float(os.getenv("FEED_BATCH_TIMEOUT", "10"))
+# 1回の一括取得で指定できるURLとフィードIDの合計数の上限（超えた場合は422を返す）
+FEED_BATCH_MAX_FEEDS = int(os.getenv("FEED_BATCH_MAX_FEEDS", "100"))
+
+# タイムラインの2ページ目以降を取得し直さずに返すため、マージ元を保持する秒数と件数
+TIMELINE_SNAPSHOT_TTL = float(os.getenv("TIMELINE_SNAPSHOT_TTL", "600"))
+TIMELINE_SNAPSHOT_MAX_ENTRIES = int(os.getenv("TIMELINE_SNAPSHOT_MAX_ENTRIES", "200"))
+
+# WebSub（PubSubHubbub）設定（コールバックの公開URLが未設定の場合は無効）
+WEBSUB_CALLBACK_BASE_URL = os.getenv("WEBSUB_CALLBACK_BASE_URL", "").rstrip("/")
+WEBSUB_LEASE_SECONDS = int(os.getenv("WEBSUB_LEASE_SECONDS", "864000"))
+WEBSUB_RENEW_MARGIN = int(os.getenv("WEBSUB_RENEW_MARGIN", "3600"))
+# 購読の保存先（dynamodb / local）。ワーカー間・再起動後も検証と配信を受けるため共有する
+WEBSUB_STORE_BACKEND = os.getenv(
+    "WEBSUB_STORE_BACKEND", "dynamodb" if USE_DYNAMODB else "local"
+).lower()
+# フィード本文（取得・WebSubの配信）の最大バイト数
+FEED_MAX_BYTES = int(os.getenv("FEED_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# 外部HTTP接続の共有プール設定（全体・ホストごとの接続数、キープアライブ秒数、タイムアウト秒数）
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "8"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_TOTAL_TIMEOUT = float(os.getenv("HTTP_TOTAL_TIMEOUT", "30"))
+
+# メタデータ抽出時の読み込み上限（<head>の探索範囲・本文全体の上限バイト数）
+METADATA_HEAD_MAX_BYTES = int(os.getenv("METADATA_HEAD_MAX_BYTES", str(256 * 1024)))
+METADATA_MAX_BYTES = int(os.getenv("METADATA_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# DNS解決結果のキャッシュ設定（TTLの下限・上限、TTL不明時の既定値、失敗時の保持秒数、保持件数）
+DNS_CACHE_MIN_TTL = float(os.getenv("DNS_CACHE_MIN_TTL", "30"))
+DNS_CACHE_MAX_TTL = float(os.getenv("DNS_CACHE_MAX_TTL", "3600"))
+DNS_CACHE_DEFAULT_TTL = float(os.getenv("DNS_CACHE_DEFAULT_TTL", "300"))
+DNS_NEGATIVE_TTL = float(os.getenv("DNS_NEGATIVE_TTL", "30"))
+DNS_CACHE_MAX_ENTRIES = int(os.getenv("DNS_CACHE_MAX_ENTRIES", "1000"))
+
+# 配信元ホストごとの流量制限（トークンバケット）設定
+# HOST_RATE_OVERRIDESは "host=毎秒の回数[:バースト],..." の形式で個別に指定する
+HOST_RATE_PER_SECOND = float(os.getenv("HOST_RATE_PER_SECOND", "2"))
+HOST_RATE_BURST = int(os.getenv("HOST_RATE_BURST", "5"))
+HOST_RATE_OVERRIDES = os.getenv("HOST_RATE_OVERRIDES", "")
+# 待ち時間がこの秒数を超える場合は待たずにエラーとする
+HOST_MAX_WAIT = float(os.getenv("HOST_MAX_WAIT", "10"))
+# 429でRetry-Afterがない場合の待機秒数と、Retry-Afterに従う上限秒数
+HOST_DEFAULT_BACKOFF = float(os.getenv("HOST_DEFAULT_BACKOFF", "60"))
+HOST_MAX_RETRY_AFTER = float(os.getenv("HOST_MAX_RETRY_AFTER", "3600"))
+# 状態を保持するホスト数の上限（超えたら使われていないホストから破棄する）
+HOST_MAX_BUCKETS = int(os.getenv("HOST_MAX_BUCKETS", "10000"))
+
+# 取得した記事ページのディスクキャッシュ設定（保存先、合計サイズの上限バイト数、再取得までの秒数）
+BODY_CACHE_DIR = os.getenv(
+    "BODY_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rss-feed-app", "bodies")
+)
+BODY_CACHE_MAX_BYTES = int(os.getenv("BODY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+BODY_CACHE_TTL = float(os.getenv("BODY_CACHE_TTL", "86400"))
+
+# 配信元ホストごとのサーキットブレーカー設定
+# 直近BREAKER_WINDOW件のうち、失敗率または遅延率が閾値を超えたら一定時間リクエストを止める
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_REQUESTS = int(os.getenv("BREAKER_MIN_REQUESTS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "10"))
+BREAKER_SLOW_CALL_RATE = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+# 遮断する秒数（続けて遮断される場合は上限まで倍にする）
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_MAX_OPEN_SECONDS = float(os.getenv("BREAKER_MAX_OPEN_SECONDS", "900"))
+# 閉じたまま、この秒数のあいだ失敗していないホストの状態は破棄する
+BREAKER_IDLE_SECONDS = float(os.getenv("BREAKER_IDLE_SECONDS", "600"))
+
+# 遅いリクエストの追い越し（ヘッジ）設定
+# ホストの応答時間がHEDGE_PERCENTILEパーセンタイルを超えたら同じリクエストをもう1件送り、先に返った方を使う
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+# パーセンタイルを計算する直近の件数と、ヘッジを始めるのに必要な件数
+HEDGE_LATENCY_WINDOW = int(os.getenv("HEDGE_LATENCY_WINDOW", "200"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+# ヘッジを送るまでの最短の待ち秒数
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+# 追加で送るリクエストの上限（通常のリクエストに対する割合と、まとめて使える件数）
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.05"))
+HEDGE_BUDGET_BURST = int(os.getenv("HEDGE_BUDGET_BURST", "10"))
+
+# 本文・メタデータ抽出に使うHTMLパーサー（auto / lxml / html.parser）
+# autoはlxmlがインストールされていればlxml、なければhtml.parserを使う
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "auto")
+
+# 本文・メタデータ抽出を実行するプロセスプールの設定
+# ワーカー数が0の場合はプールを使わず、リクエストを処理するプロセスで抽出する
+# （Lambdaでは共有メモリが使えずプロセスプールが動かないため0にする）
+EXTRACTION_WORKERS = int(
+    os.getenv(
+        "EXTRACTION_WORKERS",
+        (
+            "0"
+            if os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+            else str(min(os.cpu_count() or 1, 4))
+        ),
+    )
+)
+# 1件の抽出の制限秒数（超えた場合、実行中のワーカーはプールごと作り直す）
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "10"))
+# ワーカーの起動方法（fork / forkserver / spawn）
+EXTRACTION_START_METHOD = os.getenv("EXTRACTION_START_METHOD", "forkserver")
+
+# サイト別の本文抽出ルールを追加するJSONファイル（組み込みのルールに追加・上書きする）
+SITE_RULES_FILE = os.getenv("SITE_RULES_FILE", "")
+
+# 本文・メタデータの抽出結果のキャッシュ設定（メモリ上に保持する件数）
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "1000"))
+# ディスクにも保存する場合の保存先と合計サイズの上限バイト数（保存先が空の場合はメモリのみ）
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "")
+EXTRACTION_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("EXTRACTION_CACHE_DISK_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+# 要約する記事の本文を受信しながら抽出する設定
+# 要約に使う文字数が集まった時点で、記事ページの受信と解析を打ち切る
+STREAMING_EXTRACTION_ENABLED = (
+    os.getenv("STREAMING_EXTRACTION_ENABLED", "true").lower() == "true"
+)
+# 受信しながらの解析はイベントループ上で行うため、解析するバイト数と合計秒数に上限を設ける
+# （超えた場合は最後まで受信してから抽出用のプロセスプールで抽出する）
+STREAMING_EXTRACTION_MAX_BYTES = int(
+    os.getenv("STREAMING_EXTRACTION_MAX_BYTES", str(256 * 1024))
+)
+STREAMING_EXTRACTION_MAX_SECONDS = float(
+    os.getenv("STREAMING_EXTRACTION_MAX_SECONDS", "0.02")
+)
+# <body>の開始からこのバイト数を解析しても本文の候補が見つからなければ打ち切る
+STREAMING_EXTRACTION_PROBE_BYTES = int(
+    os.getenv("STREAMING_EXTRACTION_PROBE_BYTES", str(32 * 1024))
+)
@@ -155,6 +155,14 @@ async def init_tables():
         },
     ]
 
+    # articlesテーブル（正規化したリンクのハッシュをキーとする共有記事ストア）
+    articles_key_schema = [{"AttributeName": "id", "KeyType": "HASH"}]
+    articles_attrs = [{"AttributeName": "id", "AttributeType": "S"}]
+
+    # websub_subscriptionsテーブル（フィードURLのハッシュをキーとするWebSubの購読）
+    websub_key_schema = [{"AttributeName": "id", "KeyType": "HASH"}]
+    websub_attrs = [{"AttributeName": "id", "AttributeType": "S"}]
+
     # テーブル作成を実行
     status_feeds = await create_table_if_not_exists(
         "feeds", feeds_key_schema, feeds_attrs, feeds_gsi
@@ -171,6 +179,12 @@ async def init_tables():
     status_summaries = await create_table_if_not_exists(
         "ai_summaries", summaries_key_schema, summaries_attrs, summaries_gsi
     )
+    status_articles = await create_table_if_not_exists(
+        "articles", articles_key_schema, articles_attrs
+    )
+    status_websub = await create_table_if_not_exists(
+        "websub_subscriptions", websub_key_schema, websub_attrs
+    )
 
     # 作成されたテーブル一覧を取得
     dynamodb = get_dynamodb_client()
@@ -51,6 +51,7 @@ class AiSummaryRepository:
                 id=item.get("id"),
                 feed_id=item.get("feed_id"),
                 article_link=item.get("article_link"),
+                article_id=item.get("article_id"),
                 summary=item.get("summary"),
                 created_at=item.get("created_at"),
             )
@@ -59,7 +60,11 @@ class AiSummaryRepository:
             return None
 
     async def create_summary(
-        self, article_link: str, summary: str, feed_id: Optional[str] = None
+        self,
+        article_link: str,
+        summary: str,
+        feed_id: Optional[str] = None,
+        article_id: Optional[str] = None,
     ) -> AiSummary:
         """新しいAI要約を作成"""
         try:
@@ -79,6 +84,10 @@ class AiSummaryRepository:
             if feed_id:
                 item["feed_id"] = feed_id
 
+            # 記事ストアのキーがある場合は追加
+            if article_id:
+                item["article_id"] = article_id
+
             # アイテムを追加
             self.table.put_item(Item=item)
 
@@ -87,6 +96,7 @@ class AiSummaryRepository:
                 id=summary_id,
                 feed_id=feed_id,
                 article_link=article_link,
+                article_id=article_id,
                 summary=summary,
                 created_at=now,
             )
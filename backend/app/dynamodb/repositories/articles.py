@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import ARTICLE_STORE_BACKEND
+from app.schemas.feed import Article
+from app.dynamodb.client import get_dynamodb_resource
+from app.utils.url_normalizer import article_key
+
+logger = logging.getLogger(__name__)
+
+# シングルトンパターンによるリポジトリインスタンスの管理
+_article_repository_instance = None
+
+
+def build_article_item(
+    entry: Dict[str, Any], feed_url: Optional[str]
+) -> Dict[str, Any]:
+    """解析済みの記事エントリから保存用のアイテムを作成"""
+    item = {
+        "id": entry.get("article_id") or article_key(entry.get("link", "")),
+        "link": entry.get("link", ""),
+        "title": entry.get("title", ""),
+        "description": entry.get("description", ""),
+        "image": entry.get("image", ""),
+        "categories": [str(c) for c in entry.get("categories", [])],
+        "published": entry.get("published"),
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    if feed_url:
+        item["feed_url"] = feed_url
+    return item
+
+
+class ArticleRepository:
+    """記事ストア（DynamoDB）"""
+
+    def __init__(self):
+        self.table_name = "articles"
+        self.resource = get_dynamodb_resource()
+        self.table = self.resource.Table(self.table_name)
+
+    async def upsert_articles(
+        self, entries: List[Dict[str, Any]], feed_url: Optional[str] = None
+    ) -> int:
+        """記事をまとめて登録（既存のキーは上書き）"""
+        if not entries:
+            return 0
+
+        items = {}
+        for entry in entries:
+            item = build_article_item(entry, feed_url)
+            items[item["id"]] = item
+
+        def write():
+            with self.table.batch_writer(overwrite_by_pkeys=["id"]) as batch:
+                for item in items.values():
+                    batch.put_item(Item=item)
+
+        try:
+            # 件数が多いためスレッドで書き込み、イベントループを止めない
+            await asyncio.to_thread(write)
+            return len(items)
+        except Exception as e:
+            logger.error(f"記事の一括登録中にエラーが発生しました: {str(e)}")
+            raise
+
+    async def get_article(self, article_id: str) -> Optional[Article]:
+        """キーで記事を取得"""
+        try:
+            response = self.table.get_item(Key={"id": article_id})
+            item = response.get("Item")
+            if not item:
+                return None
+            return Article(**item)
+        except Exception as e:
+            logger.error(
+                f"記事取得中にエラーが発生しました (ID: {article_id}): {str(e)}"
+            )
+            raise
+
+
+class LocalArticleRepository:
+    """記事ストア（ローカル環境用のメモリ上の実装）"""
+
+    def __init__(self):
+        self._items: Dict[str, Dict[str, Any]] = {}
+
+    async def upsert_articles(
+        self, entries: List[Dict[str, Any]], feed_url: Optional[str] = None
+    ) -> int:
+        """記事をまとめて登録（既存のキーは上書き）"""
+        for entry in entries:
+            item = build_article_item(entry, feed_url)
+            self._items[item["id"]] = item
+        return len(entries)
+
+    async def get_article(self, article_id: str) -> Optional[Article]:
+        """キーで記事を取得"""
+        item = self._items.get(article_id)
+        return Article(**item) if item else None
+
+
+def get_article_repository():
+    """設定に応じた記事ストアを取得（シングルトン）"""
+    global _article_repository_instance
+    if _article_repository_instance is None:
+        if ARTICLE_STORE_BACKEND == "local":
+            _article_repository_instance = LocalArticleRepository()
+        else:
+            _article_repository_instance = ArticleRepository()
+    return _article_repository_instance
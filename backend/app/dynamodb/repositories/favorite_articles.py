@@ -238,6 +238,10 @@ class FavoriteArticleRepository:
             else:
                 item["article_categories"] = []
 
+            # 記事ストアのキーがあれば追加
+            if article.article_id:
+                item["article_id"] = article.article_id
+
             # feed_idがあれば追加
             if article.feed_id is not None:
                 item["feed_id"] = str(article.feed_id)
@@ -275,6 +279,7 @@ class FavoriteArticleRepository:
                 article_categories=item["article_categories"],
                 feed_id=article.feed_id,
                 is_external=bool(article.is_external),
+                article_id=article.article_id,
                 favorited_at=now,
             )
 
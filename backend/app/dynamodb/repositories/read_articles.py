@@ -69,6 +69,7 @@ class ReadArticleRepository:
                     id=item["id"],
                     user_id=item["user_id"],
                     article_link=item["article_link"],
+                    article_id=item.get("article_id"),
                     read_at=item["read_at"],
                 )
 
@@ -84,6 +85,10 @@ class ReadArticleRepository:
                 "read_at": now,
             }
 
+            # 記事ストアのキーがある場合は追加
+            if article.article_id:
+                item["article_id"] = article.article_id
+
             # アイテムを追加
             self.table.put_item(Item=item)
 
@@ -92,6 +97,7 @@ class ReadArticleRepository:
                 id=item_id,
                 user_id=user_id_str,
                 article_link=article.article_link,
+                article_id=article.article_id,
                 read_at=now,
             )
         except Exception as e:
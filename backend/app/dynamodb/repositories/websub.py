@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from app.config import WEBSUB_STORE_BACKEND
+from app.dynamodb.client import get_dynamodb_resource
+
+logger = logging.getLogger(__name__)
+
+# 数値として保存する項目（DynamoDBではDecimalで扱う）
+NUMBER_FIELDS = ("requested_at", "lease_expires_at")
+
+# シングルトンパターンによるリポジトリインスタンスの管理
+_websub_repository_instance = None
+
+
+def to_item(data: Dict[str, Any]) -> Dict[str, Any]:
+    """購読の状態をDynamoDBのアイテムに変換"""
+    item = {key: value for key, value in data.items() if value is not None}
+    for field in NUMBER_FIELDS:
+        if field in item:
+            item[field] = Decimal(str(item[field]))
+    return item
+
+
+def from_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """DynamoDBのアイテムを購読の状態に変換"""
+    data = dict(item)
+    for field in NUMBER_FIELDS:
+        data[field] = float(data[field]) if data.get(field) is not None else None
+    return data
+
+
+class WebSubRepository:
+    """WebSubの購読（DynamoDB、キーはフィードURLのハッシュ）"""
+
+    def __init__(self):
+        self.table_name = "websub_subscriptions"
+        self.resource = get_dynamodb_resource()
+        self.table = self.resource.Table(self.table_name)
+
+    async def get_subscription(self, key: str) -> Optional[Dict[str, Any]]:
+        """キーで購読を取得"""
+        try:
+            response = await asyncio.to_thread(self.table.get_item, Key={"id": key})
+        except Exception as e:
+            logger.error(f"WebSub購読の取得中にエラーが発生しました: {str(e)}")
+            raise
+        item = response.get("Item")
+        return from_item(item) if item else None
+
+    async def save_subscription(self, data: Dict[str, Any]) -> None:
+        """購読を保存（同じキーは上書き）"""
+        try:
+            await asyncio.to_thread(self.table.put_item, Item=to_item(data))
+        except Exception as e:
+            logger.error(f"WebSub購読の保存中にエラーが発生しました: {str(e)}")
+            raise
+
+    async def delete_subscription(self, key: str) -> None:
+        """購読を削除"""
+        try:
+            await asyncio.to_thread(self.table.delete_item, Key={"id": key})
+        except Exception as e:
+            logger.error(f"WebSub購読の削除中にエラーが発生しました: {str(e)}")
+            raise
+
+
+class LocalWebSubRepository:
+    """WebSubの購読（ローカル環境用のメモリ上の実装）"""
+
+    def __init__(self):
+        self._items: Dict[str, Dict[str, Any]] = {}
+
+    async def get_subscription(self, key: str) -> Optional[Dict[str, Any]]:
+        """キーで購読を取得"""
+        item = self._items.get(key)
+        return dict(item) if item else None
+
+    async def save_subscription(self, data: Dict[str, Any]) -> None:
+        """購読を保存（同じキーは上書き）"""
+        self._items[data["id"]] = dict(data)
+
+    async def delete_subscription(self, key: str) -> None:
+        """購読を削除"""
+        self._items.pop(key, None)
+
+
+def get_websub_repository():
+    """設定に応じたWebSub購読のリポジトリを取得（シングルトン）"""
+    global _websub_repository_instance
+    if _websub_repository_instance is None:
+        if WEBSUB_STORE_BACKEND == "local":
+            _websub_repository_instance = LocalWebSubRepository()
+        else:
+            _websub_repository_instance = WebSubRepository()
+    return _websub_repository_instance
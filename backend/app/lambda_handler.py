@@ -90,6 +90,10 @@ def handler(event, context):
     # 通常のリクエスト処理
     try:
         application = get_application()
+        # lifespanを無効にしているため、フィードの定期取得（FeedScheduler）は行わない。
+        # フィードのAPIは毎回配信元に条件付きGETで問い合わせる（未更新なら304で済む）。
+        # 定期取得した結果を使う場合は、FEED_CACHE_SHARED_DIRを共有ストレージ（EFS等）に
+        # 向け、常駐するサーバー（main.py）で定期取得を行う
         asgi_handler = Mangum(application, lifespan="off")
         return asgi_handler(event, context)
     except Exception as e:
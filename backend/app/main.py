@@ -69,6 +69,57 @@ def get_application():
             logger.error(f"アプリケーション起動中にエラーが発生しました: {str(e)}")
             # エラーが発生してもアプリケーションは起動させる
 
+    # フィードのバックグラウンド定期取得を開始
+    @app.on_event("startup")
+    async def start_feed_scheduler():
+        from app.config import FEED_POLL_ENABLED
+
+        if not FEED_POLL_ENABLED:
+            logger.info("フィードの定期取得は無効化されています")
+            return
+
+        try:
+            from app.utils.feed_scheduler import FeedScheduler
+
+            FeedScheduler.get_instance().start()
+        except Exception as e:
+            logger.error(f"フィード定期取得の開始中にエラーが発生しました: {str(e)}")
+
+    @app.on_event("shutdown")
+    async def stop_feed_scheduler():
+        from app.utils.feed_scheduler import FeedScheduler
+
+        await FeedScheduler.get_instance().stop()
+
+    # 外部HTTPリクエストで共有する接続プールを開く
+    @app.on_event("startup")
+    async def open_http_client():
+        from app.utils.http_client import HttpClient
+
+        await HttpClient.get_instance().open()
+
+    @app.on_event("shutdown")
+    async def close_http_client():
+        from app.utils.http_client import HttpClient
+
+        await HttpClient.get_instance().close()
+
+    # 本文・メタデータ抽出のワーカーを起動しておく
+    @app.on_event("startup")
+    async def start_extraction_pool():
+        from app.utils.extraction_pool import ExtractionPool
+
+        try:
+            await ExtractionPool.get_instance().start()
+        except Exception as e:
+            logger.error(f"抽出用のワーカーの起動中にエラーが発生しました: {str(e)}")
+
+    @app.on_event("shutdown")
+    async def close_extraction_pool():
+        from app.utils.extraction_pool import ExtractionPool
+
+        await ExtractionPool.get_instance().close()
+
     return app
 
 
@@ -3,6 +3,8 @@ from .feed import (
     Feed,
     FeedCreate,
     FeedUpdate,
+    ParseFeedsRequest,
+    Article,
     ReadArticle,
     ReadArticleCreate,
     FavoriteArticle,
@@ -18,6 +20,8 @@ __all__ = [
     "Feed",
     "FeedCreate",
     "FeedUpdate",
+    "ParseFeedsRequest",
+    "Article",
     "ReadArticle",
     "ReadArticleCreate",
     "FavoriteArticle",
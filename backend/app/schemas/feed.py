@@ -1,7 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from datetime import datetime
 from typing import Optional, List, Any, Union
 
+from app.config import FEED_BATCH_MAX_FEEDS
+
 
 class FeedBase(BaseModel):
     name: str
@@ -21,6 +23,22 @@ class FeedUpdate(FeedBase):
     default_image: Optional[str] = None
 
 
+class ParseFeedsRequest(BaseModel):
+    """複数フィードの一括解析リクエスト（URLまたはフィードIDで指定）"""
+
+    urls: List[str] = []
+    feed_ids: List[Union[int, str]] = []
+
+    @model_validator(mode="after")
+    def check_batch_size(self) -> "ParseFeedsRequest":
+        """URLとフィードIDの合計が一括取得の上限を超えていないか確認"""
+        if len(self.urls) + len(self.feed_ids) > FEED_BATCH_MAX_FEEDS:
+            raise ValueError(
+                f"一度に解析できるフィードは{FEED_BATCH_MAX_FEEDS}件までです"
+            )
+        return self
+
+
 class Feed(FeedBase):
     """互換性のために残すSQLAlchemy向けモデル"""
 
@@ -31,12 +49,31 @@ class Feed(FeedBase):
         from_attributes = True
 
 
+class Article(BaseModel):
+    """記事ストアに保存される記事（キーは正規化したリンクのハッシュ）"""
+
+    id: str
+    link: str
+    title: str = ""
+    description: Optional[str] = ""
+    image: Optional[str] = ""
+    categories: Optional[List[str]] = []
+    published: Optional[str] = None
+    feed_url: Optional[str] = None
+    updated_at: Optional[Union[datetime, str]] = None
+
+    class Config:
+        from_attributes = True
+
+
 class ReadArticleBase(BaseModel):
     article_link: str
+    article_id: Optional[str] = None
 
 
 class ReadArticleCreate(ReadArticleBase):
-    pass
+    # article_idを指定した場合はリンクを省略できる
+    article_link: Optional[str] = None
 
 
 class ReadArticle(ReadArticleBase):
@@ -56,10 +93,24 @@ class FavoriteArticleBase(BaseModel):
     article_categories: Optional[List[str]] = []
     feed_id: Optional[Union[int, str]] = "aaa"
     is_external: bool = False
+    article_id: Optional[str] = None
 
 
 class FavoriteArticleCreate(FavoriteArticleBase):
-    pass
+    # article_idを指定した場合はリンク・タイトル等を記事ストアから補完する
+    article_link: Optional[str] = None
+    article_title: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_article_reference(self) -> "FavoriteArticleCreate":
+        """article_idがなければリンクとタイトルを必須とする"""
+        if not self.article_id and (
+            self.article_link is None or self.article_title is None
+        ):
+            raise ValueError(
+                "article_idを指定しない場合はarticle_linkとarticle_titleが必要です"
+            )
+        return self
 
 
 class FavoriteArticle(FavoriteArticleBase):
@@ -76,10 +127,12 @@ class FavoriteArticle(FavoriteArticleBase):
 class AiSummaryBase(BaseModel):
     feed_id: Optional[Union[int, str]] = None
     article_link: str
+    article_id: Optional[str] = None
 
 
 class AiSummaryCreate(AiSummaryBase):
-    pass
+    # article_idを指定した場合はリンクを省略できる
+    article_link: Optional[str] = None
 
 
 class AiSummary(AiSummaryBase):
@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import BODY_CACHE_DIR, BODY_CACHE_MAX_BYTES, BODY_CACHE_TTL
+from app.utils.url_normalizer import article_key
+
+logger = logging.getLogger(__name__)
+
+# シングルトンパターンによるキャッシュインスタンスの管理
+_body_cache_instance = None
+
+
+class CachedBody:
+    """ディスクキャッシュから読み出した本文（mmapで参照する）"""
+
+    def __init__(self, body: mmap.mmap, charset: Optional[str], fetched_at: float):
+        self.body = body
+        self.charset = charset
+        self.fetched_at = fetched_at
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+    def close(self) -> None:
+        self.body.close()
+
+    def __enter__(self) -> "CachedBody":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class BodyCache:
+    """取得した記事ページの本文を保存するディスクキャッシュ
+
+    本文はハッシュ値をファイル名として一度だけ保存し（内容アドレス）、
+    正規化したURLごとの索引がそれを参照する。読み出しはmmapで行うため、
+    同じページを扱う複数のワーカーはOSのページキャッシュを共有できる。
+    ファイルの読み書きはイベントループを止めないようスレッドで行う。
+    合計サイズが上限を超えたら、最後に使われたのが古い索引から削除する。
+    どれを削除するかはメモリ上の索引（LRU順）で決め、ディレクトリは走査しない。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _body_cache_instance
+        if _body_cache_instance is None:
+            _body_cache_instance = cls()
+        return _body_cache_instance
+
+    def __init__(
+        self,
+        directory: str = BODY_CACHE_DIR,
+        max_bytes: int = BODY_CACHE_MAX_BYTES,
+        ttl: float = BODY_CACHE_TTL,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.index_dir = os.path.join(directory, "index")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+        # 索引のキー -> (本文のハッシュ値, サイズ)。先頭ほど最後に使われたのが古い
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        # 本文のハッシュ値 -> 参照している索引の数
+        self._refs: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._load_index()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "deduplicated": 0,
+            "evicted": 0,
+        }
+
+    def _index_path(self, key: str) -> str:
+        return os.path.join(self.index_dir, f"{key}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _load_index(self) -> None:
+        """起動時に保存済みの索引を最終利用時刻の順に読み込む"""
+        entries = []
+        for name in os.listdir(self.index_dir):
+            path = os.path.join(self.index_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                entries.append((os.path.getmtime(path), name[: -len(".json")], entry))
+            except (OSError, ValueError):
+                continue
+        entries.sort(key=lambda item: item[0])
+        for _, key, entry in entries:
+            try:
+                self._track(key, entry["digest"], entry["size"])
+            except KeyError:
+                continue
+        self._remove_orphans()
+
+    def _remove_orphans(self) -> None:
+        """どの索引からも参照されない本文を削除（起動時に一度だけ走査する）"""
+        now = time.time()
+        for root, _, files in os.walk(self.blob_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    # 他のワーカーが索引を書く直前の本文は残す
+                    if name not in self._refs and now - os.stat(path).st_mtime > 60:
+                        os.unlink(path)
+                except OSError:
+                    pass
+
+    def _track(self, key: str, digest: str, size: int) -> None:
+        """索引をメモリ上で最新として記録し、本文の参照数と合計サイズを更新"""
+        previous = self._entries.pop(key, None)
+        if previous is not None and previous[0] == digest:
+            self._entries[key] = previous
+            return
+        if previous is not None:
+            self._release(previous[0], previous[1])
+        self._entries[key] = (digest, size)
+        if self._refs.get(digest, 0) == 0:
+            self._total_bytes += size
+        self._refs[digest] = self._refs.get(digest, 0) + 1
+
+    def _release(self, digest: str, size: int) -> bool:
+        """本文の参照を減らす（どの索引からも参照されなくなればTrue）"""
+        count = self._refs.get(digest, 0) - 1
+        if count > 0:
+            self._refs[digest] = count
+            return False
+        self._refs.pop(digest, None)
+        self._total_bytes -= size
+        return True
+
+    async def get(self, url: str) -> Optional[CachedBody]:
+        """URLの本文を取得（期限切れ・未保存の場合はNone）"""
+        key = article_key(url)
+        result = await asyncio.to_thread(self._read, key)
+        if result is None:
+            self.stats["misses"] += 1
+            return None
+
+        cached, digest = result
+        # 他のワーカーが保存した索引も含めて、LRUの順序に反映する
+        self._track(key, digest, len(cached))
+        self.stats["hits"] += 1
+        return cached
+
+    def _read(self, key: str) -> Optional[Tuple[CachedBody, str]]:
+        index_path = self._index_path(key)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["fetched_at"] >= self.ttl:
+                return None
+            with open(self._blob_path(entry["digest"]), "rb") as f:
+                body = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # 最終利用時刻を更新し、再起動後もLRUの順序を引き継ぐ
+            os.utime(index_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return (
+            CachedBody(body, entry.get("charset"), entry["fetched_at"]),
+            entry["digest"],
+        )
+
+    async def set(self, url: str, body: bytes, charset: Optional[str] = None) -> None:
+        """本文を保存（同じ内容の本文はファイルを共有する）"""
+        if not body:
+            return
+        key = article_key(url)
+        try:
+            digest, deduplicated = await asyncio.to_thread(
+                self._write, key, url, body, charset
+            )
+        except OSError as e:
+            logger.warning(f"本文キャッシュの保存に失敗しました ({url}): {str(e)}")
+            return
+
+        if deduplicated:
+            self.stats["deduplicated"] += 1
+        self.stats["stored"] += 1
+        self._track(key, digest, len(body))
+        if self._total_bytes > self.max_bytes:
+            await self._evict()
+
+    def _write(
+        self, key: str, url: str, body: bytes, charset: Optional[str]
+    ) -> Tuple[str, bool]:
+        """本文と索引を書き込み、本文のハッシュ値と既存の本文を共有したかを返す"""
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        deduplicated = os.path.exists(blob_path)
+        if not deduplicated:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._write_atomic(blob_path, body)
+
+        entry = {
+            "url": url,
+            "digest": digest,
+            "charset": charset,
+            "size": len(body),
+            "fetched_at": time.time(),
+        }
+        self._write_atomic(self._index_path(key), json.dumps(entry).encode("utf-8"))
+        return digest, deduplicated
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        """一時ファイルに書いてから置き換え、読み出し中のワーカーに途中の内容を見せない"""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+    async def _evict(self) -> None:
+        """最後に使われたのが古い索引から、合計が上限の9割に収まるまで削除する"""
+        target = self.max_bytes * 0.9
+        paths = []
+        while self._entries and self._total_bytes > target:
+            key, (digest, size) = self._entries.popitem(last=False)
+            paths.append(self._index_path(key))
+            if self._release(digest, size):
+                # 読み出し中のmmapは削除後も有効なまま残る
+                paths.append(self._blob_path(digest))
+            self.stats["evicted"] += 1
+        await asyncio.to_thread(self._remove, paths)
+        logger.info(f"本文キャッシュを整理しました: {self._total_bytes} bytes")
+
+    @staticmethod
+    def _remove(paths: List[str]) -> None:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュの利用状況を取得"""
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,123 @@
+import codecs
+import logging
+import mmap
+import re
+from typing import Optional, Tuple, Union
+
+from charset_normalizer import from_bytes
+
+logger = logging.getLogger(__name__)
+
+# 文字コード判定の対象（ディスクキャッシュの本文はmmapのまま渡される）
+BytesLike = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# BOMと対応する文字コード（長いものから順に判定する）
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# <meta charset="..."> / <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_PATTERN = re.compile(
+    rb"<meta[^>]+charset\s*=\s*[\"']?\s*([a-zA-Z0-9_\-:.]+)", re.I
+)
+# <?xml version="1.0" encoding="..."?>
+XML_ENCODING_PATTERN = re.compile(
+    rb"^<\?xml[^>]+encoding\s*=\s*[\"']([a-zA-Z0-9_\-.]+)"
+)
+# 宣言を探す先頭のバイト数（HTML仕様ではmetaは先頭1024バイト以内）
+SNIFF_BYTES = 4096
+# Pythonのコーデックにない別名
+CHARSET_ALIASES = {
+    "windows-31j": "cp932",
+    "x-sjis": "cp932",
+    "x-euc-jp": "euc_jp",
+}
+# 宣言上の名前より広い文字集合を持つ互換の文字コード（機種依存文字を含むページが多い）
+CHARSET_SUPERSETS = {
+    "shift_jis": "cp932",
+    "iso8859-1": "cp1252",
+    "ascii": "utf-8",
+}
+
+
+def normalize_charset(name: Optional[str]) -> Optional[str]:
+    """文字コード名をPythonのコーデック名に正規化（不明な名前はNone）"""
+    if not name:
+        return None
+    name = name.strip().strip("\"'").lower()
+    try:
+        codec = codecs.lookup(CHARSET_ALIASES.get(name, name)).name
+    except LookupError:
+        return None
+    return CHARSET_SUPERSETS.get(codec, codec)
+
+
+def sniff_charset(body: BytesLike) -> Tuple[Optional[str], str]:
+    """本文の先頭から文字コードを判定（BOM > XML宣言 > metaタグ）
+
+    戻り値は文字コードと判定の根拠。判定できない場合は(None, "")。
+    """
+    for bom, encoding in BOMS:
+        if body[: len(bom)] == bom:
+            return encoding, "bom"
+
+    head = body[:SNIFF_BYTES]
+    match = XML_ENCODING_PATTERN.match(head)
+    if match:
+        charset = normalize_charset(match.group(1).decode("ascii"))
+        if charset:
+            return charset, "xml"
+
+    match = META_CHARSET_PATTERN.search(head)
+    if match:
+        charset = normalize_charset(match.group(1).decode("ascii"))
+        if charset:
+            return charset, "meta"
+    return None, ""
+
+
+def detect_charset(
+    body: BytesLike, header_charset: Optional[str] = None, partial: bool = False
+) -> Tuple[str, str]:
+    """本文の文字コードを判定し、(文字コード, 判定の根拠)を返す
+
+    Content-Typeのcharset > BOM > XML宣言・metaタグ > UTF-8として妥当か
+    の順に判定し、いずれでも決まらない場合だけ統計的な推定を行う。
+    partialは受信途中の先頭部分であることを表し、末尾で切れた文字を不正とみなさない。
+    """
+    # BOMはContent-Typeより優先される（HTML仕様の判定順）
+    charset, source = sniff_charset(body[:4])
+    if charset:
+        return charset, source
+
+    charset = normalize_charset(header_charset)
+    if charset:
+        return charset, "header"
+
+    charset, source = sniff_charset(body)
+    if charset:
+        return charset, source
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(body, final=not partial)
+        return "utf-8", "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    best = from_bytes(bytes(body[: SNIFF_BYTES * 16])).best()
+    charset = normalize_charset(best.encoding) if best else None
+    return charset or "utf-8", "detected"
+
+
+def decode_body(body: BytesLike, header_charset: Optional[str] = None) -> str:
+    """本文を判定した文字コードで一度だけデコード
+
+    bytesのほかmmapなどのバッファも受け付ける。途中で打ち切った本文は
+    末尾の文字が欠けている場合があるため、不正なバイト列は置換文字にする。
+    """
+    charset, source = detect_charset(body, header_charset)
+    logger.debug(f"文字コード判定: {charset} ({source})")
+    return str(body, charset, errors="replace")
@@ -0,0 +1,200 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.config import (
+    BREAKER_FAILURE_RATE,
+    BREAKER_IDLE_SECONDS,
+    BREAKER_MAX_OPEN_SECONDS,
+    BREAKER_MIN_REQUESTS,
+    BREAKER_OPEN_SECONDS,
+    BREAKER_SLOW_CALL_RATE,
+    BREAKER_SLOW_CALL_SECONDS,
+    BREAKER_WINDOW,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """ホストへのリクエストがサーキットブレーカーで遮断されたことを表す例外"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Circuit is open for {retry_after:.0f}s: {host}")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class HostCircuit:
+    """ホストごとのサーキットブレーカーの状態"""
+
+    def __init__(self, host: str, window: int):
+        self.host = host
+        self.state = CLOSED
+        # 直近の結果 (成功したか, 所要秒数)
+        self.outcomes: deque = deque(maxlen=window)
+        self.opened_at: Optional[float] = None
+        self.open_seconds = 0.0
+        self.trips = 0
+        self.probing = False
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+
+    def is_expired(self, now: float, idle_seconds: float) -> bool:
+        """閉じたまま最近失敗していないか（破棄しても挙動がほぼ変わらない）"""
+        return self.state == CLOSED and (
+            self.last_failure_at is None or now - self.last_failure_at >= idle_seconds
+        )
+
+    def retry_after(self) -> float:
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(self.opened_at + self.open_seconds - time.monotonic(), 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = len(self.outcomes)
+        return {
+            "host": self.host,
+            "state": self.state,
+            "requests": total,
+            "failure_rate": (
+                sum(1 for ok, _ in self.outcomes if not ok) / total if total else 0.0
+            ),
+            "retry_after": self.retry_after(),
+            "trips": self.trips,
+            "last_error": self.last_error,
+        }
+
+
+class CircuitBreaker:
+    """配信元ホストごとのサーキットブレーカー
+
+    直近のリクエストの失敗率・遅延したリクエストの割合が閾値を超えたホストは
+    一定時間遮断（open）し、リクエストを送らずにCircuitOpenErrorとする。
+    遮断時間が過ぎると1件だけ試行（half_open）し、成功すれば復帰、
+    失敗すれば遮断時間を倍にして再び遮断する。
+    閉じたまま idle_seconds のあいだ失敗していないホストの状態は、
+    新しいホストを記録する際に定期的に破棄する。
+    """
+
+    def __init__(
+        self,
+        window: int = BREAKER_WINDOW,
+        min_requests: int = BREAKER_MIN_REQUESTS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate: float = BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS,
+        idle_seconds: float = BREAKER_IDLE_SECONDS,
+    ):
+        self.window = window
+        self.min_requests = min_requests
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.idle_seconds = idle_seconds
+        self._circuits: Dict[str, HostCircuit] = {}
+        self._expired_at = time.monotonic()
+
+    def _circuit(self, host: str) -> HostCircuit:
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            self._expire()
+            circuit = HostCircuit(host, self.window)
+            self._circuits[host] = circuit
+        return circuit
+
+    def _expire(self) -> None:
+        """閉じたまま最近失敗していないホストの状態を破棄（idle_secondsごとに1回）"""
+        now = time.monotonic()
+        if now - self._expired_at < self.idle_seconds:
+            return
+        self._expired_at = now
+        for host in [
+            h for h, c in self._circuits.items() if c.is_expired(now, self.idle_seconds)
+        ]:
+            del self._circuits[host]
+
+    def before_request(self, host: str) -> None:
+        """リクエストを送ってよいか確認（遮断中はCircuitOpenErrorを送出）"""
+        circuit = self._circuit(host)
+        if circuit.state == OPEN:
+            retry_after = circuit.retry_after()
+            if retry_after > 0:
+                raise CircuitOpenError(host, retry_after)
+            circuit.state = HALF_OPEN
+            circuit.probing = False
+            logger.info(f"サーキットブレーカーを試行状態にしました: {host}")
+
+        if circuit.state == HALF_OPEN:
+            # 試行中は1件だけ通し、他は遮断したままにする
+            if circuit.probing:
+                raise CircuitOpenError(host, 0.0)
+            circuit.probing = True
+
+    def record(
+        self, host: str, ok: bool, elapsed: float, error: Optional[str] = None
+    ) -> None:
+        """リクエストの結果を記録し、状態を更新"""
+        circuit = self._circuit(host)
+        if not ok:
+            circuit.last_error = error
+            circuit.last_failure_at = time.monotonic()
+
+        if circuit.state == HALF_OPEN:
+            circuit.probing = False
+            if ok and elapsed < self.slow_call_seconds:
+                circuit.state = CLOSED
+                circuit.outcomes.clear()
+                circuit.open_seconds = 0.0
+                logger.info(f"サーキットブレーカーを復帰させました: {host}")
+            else:
+                self._trip(circuit)
+            return
+
+        circuit.outcomes.append((ok, elapsed))
+        total = len(circuit.outcomes)
+        if circuit.state != CLOSED or total < self.min_requests:
+            return
+        failures = sum(1 for success, _ in circuit.outcomes if not success)
+        slow = sum(
+            1 for _, seconds in circuit.outcomes if seconds >= self.slow_call_seconds
+        )
+        if failures / total >= self.failure_rate or slow / total >= self.slow_call_rate:
+            self._trip(circuit)
+
+    def release(self, host: str) -> None:
+        """結果を記録せずに試行枠を返す（キャンセル時など）"""
+        circuit = self._circuits.get(host)
+        if circuit is not None and circuit.state == HALF_OPEN:
+            circuit.probing = False
+
+    def _trip(self, circuit: HostCircuit) -> None:
+        """遮断状態にする（続けて遮断される場合は遮断時間を倍にする）"""
+        circuit.state = OPEN
+        circuit.opened_at = time.monotonic()
+        circuit.open_seconds = min(
+            max(circuit.open_seconds * 2, self.open_seconds), self.max_open_seconds
+        )
+        circuit.trips += 1
+        circuit.outcomes.clear()
+        logger.warning(
+            f"サーキットブレーカーで{circuit.open_seconds:.0f}秒間遮断します: "
+            f"{circuit.host} ({circuit.last_error})"
+        )
+
+    def reset(self, host: str) -> bool:
+        """ホストの状態を初期化（管理用）"""
+        return self._circuits.pop(host, None) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ホストごとの状態を取得"""
+        return {host: circuit.to_dict() for host, circuit in self._circuits.items()}
@@ -1,13 +1,60 @@
-from bs4 import BeautifulSoup
 import re
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple
 import logging
 
+from app.utils.html_engine import HtmlEngine, get_engine
+from app.utils.site_rules import SiteRule, SiteRuleRegistry
+
 logger = logging.getLogger(__name__)
 
+# テキスト密度で評価するタグ
+DENSITY_TAGS = {"p", "div", "section"}
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# テキストの要約: (空白以外の文字数, 文字の間にある空白の連続の数, 先頭が空白か, 末尾が空白か)
+# 空白だけのテキストは先頭・末尾とも「空白がある」かどうかを表す。
+# clean_text()後の長さは 空白以外の文字数 + 空白の連続の数 になる。
+TextSummary = Tuple[int, int, bool, bool]
+EMPTY_TEXT: TextSummary = (0, 0, False, False)
+
+
+def summarize_text(text: str) -> TextSummary:
+    """テキストをclean_text()後の長さを求めるための要約に変換"""
+    stripped = text.strip()
+    if not stripped:
+        return (0, 0, bool(text), bool(text))
+    parts = WHITESPACE_PATTERN.split(stripped)
+    return (
+        sum(map(len, parts)),
+        len(parts) - 1,
+        text[0].isspace(),
+        text[-1].isspace(),
+    )
+
+
+def join_text(a: TextSummary, b: TextSummary) -> TextSummary:
+    """連結したテキストの要約（境界の空白は1つの連続として数える）"""
+    if not b[0]:
+        if not a[0]:
+            return (0, 0, a[2] or b[2], a[3] or b[3])
+        return (a[0], a[1], a[2], a[3] or b[3])
+    if not a[0]:
+        return (b[0], b[1], a[2] or b[2], b[3])
+    return (a[0] + b[0], a[1] + b[1] + (a[3] or b[2]), a[2], b[3])
+
 
 class ContentExtractor:
-    def __init__(self):
+    # 抽出結果のキャッシュのキーに含める版（抽出結果が変わる変更をしたら上げる）
+    VERSION = "1"
+
+    def __init__(
+        self,
+        engine: Optional[HtmlEngine] = None,
+        site_rules: Optional[SiteRuleRegistry] = None,
+    ):
+        # HTMLの解析に使うエンジン（既定は設定に従いlxml、なければhtml.parser）
+        self.engine = engine or get_engine()
+
         # 不要なタグのリスト
         self.noise_tags = {
             "script",
@@ -22,20 +69,21 @@ class ContentExtractor:
             "advertisement",
         }
 
-        # 本文らしい要素のセレクタ（サイトごとに追加可能）
-        self.content_selectors = {
-            "default": [
-                "description",
-                "article",
-                ".article",
-                ".post-content",
-                ".entry-content",
-                "main",
-            ],
-            "hatena": [".entry-content"],
-            "aws": [".blog-post"],
-            "azure": [".blog-content"],
-        }
+        # 本文らしい要素のセレクタ（サイト別ルールがないページで使う）
+        self.default_selectors = [
+            "description",
+            "article",
+            ".article",
+            ".post-content",
+            ".entry-content",
+            "main",
+        ]
+        self._default_compiled = [
+            self.engine.compile(selector) for selector in self.default_selectors
+        ]
+
+        # サイト別の本文抽出ルール（ドメインで引く）
+        self.site_rules = site_rules or SiteRuleRegistry.get_instance()
 
     def clean_text(self, text: str) -> str:
         """テキストのクリーニング"""
@@ -47,17 +95,18 @@ class ContentExtractor:
 
     def calculate_text_density(self, element) -> float:
         """テキスト密度を計算"""
-        text_length = len(self.clean_text(element.get_text()))
+        text_length = len(self.clean_text(self.engine.get_text(element)))
         if text_length == 0:
             return 0
 
         # リンクテキストの長さを取得
         link_text_length = sum(
-            len(self.clean_text(a.get_text())) for a in element.find_all("a")
+            len(self.clean_text(self.engine.get_text(a)))
+            for a in self.engine.find_all(element, ["a"])
         )
 
         # タグの数を取得
-        tags_count = len(element.find_all())
+        tags_count = len(self.engine.find_all(element))
         if tags_count == 0:
             tags_count = 1
 
@@ -65,76 +114,122 @@ class ContentExtractor:
         density = (text_length - link_text_length) / tags_count
         return density
 
-    def extract_content_by_density(self, soup: BeautifulSoup) -> List[str]:
+    def score_density(self, root: Any) -> List[Dict[str, Any]]:
+        """p, div, sectionタグのテキスト密度を、木を1回たどるだけで計算
+
+        子から親の順（後順）に、クリーニング後のテキスト長・リンクテキスト長・
+        子孫のタグ数・ノイズタグの有無を積み上げる。結果はcalculate_text_density
+        と同じで、ノイズタグを含む要素は除く。戻り値は文書順。
+        """
+        engine = self.engine
+        candidates: List[Dict[str, Any]] = []
+        # [要素, 子の反復子, テキストの要約, リンクテキスト長, タグ数, ノイズの有無, 文書順]
+        stack = [[root, engine.children(root), EMPTY_TEXT, 0, 0, False, 0]]
+        order = 0
+        while stack:
+            frame = stack[-1]
+            for child in frame[1]:
+                if isinstance(child, str):
+                    frame[2] = join_text(frame[2], summarize_text(child))
+                else:
+                    order += 1
+                    stack.append(
+                        [child, engine.children(child), EMPTY_TEXT, 0, 0, False, order]
+                    )
+                    break
+            else:
+                stack.pop()
+                if not stack:
+                    break
+                element, _, text, link_length, tags_count, noise, index = frame
+                name = engine.tag_name(element)
+                text_length = text[0] + text[1]
+
+                if name in DENSITY_TAGS and not noise:
+                    density = 0
+                    if text_length:
+                        density = (text_length - link_length) / (tags_count or 1)
+                    candidates.append(
+                        {
+                            "element": element,
+                            "density": density,
+                            "length": text_length,
+                            "order": index,
+                        }
+                    )
+
+                parent = stack[-1]
+                parent[2] = join_text(parent[2], text)
+                parent[3] += link_length + (text_length if name == "a" else 0)
+                parent[4] += tags_count + 1
+                parent[5] = parent[5] or noise or name in self.noise_tags
+
+        # 後順で集めたため、文書順（親が先）に並べ直す
+        candidates.sort(key=lambda c: c["order"])
+        return candidates
+
+    def extract_content_by_density(self, root: Any) -> List[str]:
         """テキスト密度による本文抽出"""
-        candidates = []
-
-        # p, div, sectionタグを評価
-        for element in soup.find_all(["p", "div", "section"]):
-            # ノイズとなるタグを含む要素はスキップ
-            if any(element.find_all(tag) for tag in self.noise_tags):
-                continue
-
-            density = self.calculate_text_density(element)
-            text = self.clean_text(element.get_text())
-
-            # 密度と文字数で本文候補を判定
-            if density > 10 and len(text) > 100:
-                candidates.append(
-                    {"text": text, "density": density, "element": element}
-                )
-
-        # 密度で降順ソート
+        # 密度と文字数で本文候補を判定
+        candidates = [
+            c
+            for c in self.score_density(root)
+            if c["density"] > 10 and c["length"] > 100
+        ]
+
+        # 密度で降順ソートし（同じ密度なら文書順）、上位5つのテキストだけを取り出す
         candidates.sort(key=lambda x: x["density"], reverse=True)
-        return [c["text"] for c in candidates[:5]]  # 上位5つを返す
-
-    def extract_content_by_selectors(self, soup: BeautifulSoup, url: str) -> str:
-        """セレクタによる本文抽出"""
-        # URLに基づいてセレクタを選択
-        selectors = self.content_selectors["default"]
-        for site, site_selectors in self.content_selectors.items():
-            if site in url:
-                selectors = site_selectors
-                break
+        return [
+            self.clean_text(self.engine.get_text(c["element"])) for c in candidates[:5]
+        ]
+
+    def extract_content_by_selectors(
+        self, root: Any, rule: Optional[SiteRule] = None
+    ) -> str:
+        """セレクタによる本文抽出（サイト別ルールがあればそのセレクタを使う）"""
+        selectors, noise_selectors = self._default_compiled, []
+        if rule is not None:
+            selectors, noise_selectors = rule.compiled(self.engine)
 
         # セレクタに一致する要素から本文を抽出
         for selector in selectors:
-            content = soup.select_one(selector)
-            if content:
-                # 不要なタグを削除
-                for tag in self.noise_tags:
-                    for element in content.find_all(tag):
-                        element.decompose()
+            content = self.engine.select_one(root, selector)
+            if content is not None:
+                # 不要なタグとサイト別に指定された要素を削除
+                self.engine.remove_tags(content, self.noise_tags)
+                for noise_selector in noise_selectors:
+                    for element in self.engine.select(content, noise_selector):
+                        self.engine.remove(element)
 
-                return self.clean_text(content.get_text())
+                return self.clean_text(self.engine.get_text(content))
 
         return ""
 
     def extract_main_content(self, html: str, url: str) -> str:
         """メイン関数: 本文を抽出"""
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            root = self.engine.parse(html)
 
             # メタデータの削除
-            for tag in self.noise_tags:
-                for element in soup.find_all(tag):
-                    element.decompose()
+            self.engine.remove_tags(root, self.noise_tags)
 
             # 1. セレクタによる抽出を試みる
-            content = self.extract_content_by_selectors(soup, url)
-            if content and len(content) > 200:  # 十分な長さがある場合
+            rule = self.site_rules.lookup(url)
+            content = self.extract_content_by_selectors(root, rule)
+            # 十分な長さがある場合か、サイト別ルールで本文が見つかった場合
+            if content and (rule is not None or len(content) > 200):
                 return content
 
             # 2. テキスト密度による抽出
-            contents = self.extract_content_by_density(soup)
+            contents = self.extract_content_by_density(root)
             if contents:
                 return "\n".join(contents)
 
             # 3. フォールバック: 単純にpタグのテキストを結合
             p_texts = [
-                self.clean_text(p.get_text())
-                for p in soup.find_all("p")
-                if len(self.clean_text(p.get_text())) > 50
+                self.clean_text(self.engine.get_text(p))
+                for p in self.engine.find_all(root, ["p"])
+                if len(self.clean_text(self.engine.get_text(p))) > 50
             ]
             if p_texts:
                 return "\n".join(p_texts)
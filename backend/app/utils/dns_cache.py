@@ -0,0 +1,196 @@
+import logging
+import socket
+import statistics
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import ThreadedResolver
+
+from app.config import (
+    DNS_CACHE_DEFAULT_TTL,
+    DNS_CACHE_MAX_ENTRIES,
+    DNS_CACHE_MAX_TTL,
+    DNS_CACHE_MIN_TTL,
+    DNS_NEGATIVE_TTL,
+)
+from app.utils.single_flight import SingleFlight
+
+try:
+    import aiodns
+except ImportError:  # aiodns未導入の環境ではスレッドでgetaddrinfoを呼ぶ
+    aiodns = None
+
+logger = logging.getLogger(__name__)
+
+# 解決時間の統計に使う直近の件数
+LATENCY_SAMPLE_SIZE = 256
+
+
+class DnsCacheEntry:
+    """ホスト名の解決結果（失敗した場合はエラー）"""
+
+    def __init__(
+        self,
+        hosts: List[Dict[str, Any]],
+        ttl: float,
+        error: Optional[str] = None,
+    ):
+        self.hosts = hosts
+        self.error = error
+        self.expires_at = time.time() + ttl
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class CachingResolver(AbstractResolver):
+    """TTLに従って解決結果をキャッシュするaiohttp用の非同期DNSリゾルバ
+
+    aiodnsがあればレコードのTTLを使い、なければgetaddrinfoの結果を
+    既定のTTLで保持する。解決に失敗したホスト名も短時間キャッシュし、
+    同じホスト名への同時の問い合わせは1回にまとめる。
+    """
+
+    def __init__(
+        self,
+        min_ttl: float = DNS_CACHE_MIN_TTL,
+        max_ttl: float = DNS_CACHE_MAX_TTL,
+        default_ttl: float = DNS_CACHE_DEFAULT_TTL,
+        negative_ttl: float = DNS_NEGATIVE_TTL,
+        max_entries: int = DNS_CACHE_MAX_ENTRIES,
+    ):
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], DnsCacheEntry]" = OrderedDict()
+        self._single_flight = SingleFlight()
+        self._dns = aiodns.DNSResolver() if aiodns is not None else None
+        self._threaded = ThreadedResolver()
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "failures": 0}
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        """ホスト名を解決（キャッシュが有効ならそれを返す）"""
+        key = (host, family)
+        entry = self._entries.get(key)
+        if entry is not None and entry.is_fresh():
+            self._entries.move_to_end(key)
+            if entry.error is not None:
+                self.stats["negative_hits"] += 1
+                raise OSError(entry.error)
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            entry = await self._single_flight.do(
+                f"{family}/{host}", lambda: self._lookup(host, family)
+            )
+            if entry.error is not None:
+                raise OSError(entry.error)
+
+        return [{**h, "port": port} for h in entry.hosts]
+
+    async def _lookup(self, host: str, family: int) -> DnsCacheEntry:
+        """問い合わせて結果をキャッシュに保存"""
+        start = time.perf_counter()
+        try:
+            if self._dns is not None:
+                hosts, ttl = await self._query(host, family)
+            else:
+                hosts, ttl = await self._threaded.resolve(host, 0, family), None
+            ttl = self.default_ttl if ttl is None else ttl
+            entry = DnsCacheEntry(hosts, min(max(ttl, self.min_ttl), self.max_ttl))
+        except OSError as e:
+            self.stats["failures"] += 1
+            logger.warning(f"DNS解決に失敗しました ({host}): {str(e)}")
+            entry = DnsCacheEntry([], self.negative_ttl, str(e) or "DNS lookup failed")
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+
+        self._entries[(host, family)] = entry
+        self._entries.move_to_end((host, family))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    async def _query(
+        self, host: str, family: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """aiodnsでA/AAAAレコードを問い合わせ、アドレスと最小のTTLを返す"""
+        if family == socket.AF_INET6:
+            qtypes = [("AAAA", socket.AF_INET6)]
+        elif family == socket.AF_INET:
+            qtypes = [("A", socket.AF_INET)]
+        else:
+            qtypes = [("A", socket.AF_INET), ("AAAA", socket.AF_INET6)]
+
+        hosts: List[Dict[str, Any]] = []
+        ttls: List[float] = []
+        error: Optional[Exception] = None
+        for qtype, record_family in qtypes:
+            try:
+                records = await self._dns.query(host, qtype)
+            except aiodns.error.DNSError as e:
+                error = e
+                continue
+            for record in records:
+                hosts.append(
+                    {
+                        "hostname": host,
+                        "host": record.host,
+                        "port": 0,
+                        "family": record_family,
+                        "proto": 0,
+                        "flags": socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+                    }
+                )
+                ttls.append(record.ttl)
+
+        if not hosts:
+            # hostsファイルのみに定義された名前などはgetaddrinfoで解決する
+            try:
+                return await self._threaded.resolve(host, 0, family), None
+            except OSError:
+                if error is not None and len(error.args) > 1:
+                    raise OSError(error.args[1]) from error
+                raise
+        return hosts, min(ttls)
+
+    def cancel(self) -> None:
+        """実行中の問い合わせを取り消す（イベントループの外からも呼べる）"""
+        if self._dns is not None:
+            self._dns.cancel()
+
+    async def close(self) -> None:
+        """リゾルバを解放"""
+        self.cancel()
+        await self._threaded.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュのヒット数と解決時間の統計を取得"""
+        latencies = sorted(self._latencies)
+        lookups = (
+            self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+        )
+        return {
+            **self.stats,
+            "backend": "aiodns" if self._dns is not None else "getaddrinfo",
+            "cached_hosts": len(self._entries),
+            "hit_ratio": (
+                (self.stats["hits"] + self.stats["negative_hits"]) / lookups
+                if lookups
+                else None
+            ),
+            "coalesced": self._single_flight.stats["coalesced"],
+            "resolve_ms": {
+                "mean": statistics.mean(latencies) * 1000 if latencies else None,
+                "p95": (
+                    latencies[int(len(latencies) * 0.95)] * 1000 if latencies else None
+                ),
+            },
+        }
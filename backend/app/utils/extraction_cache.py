@@ -0,0 +1,204 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import (
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_DISK_MAX_BYTES,
+    EXTRACTION_CACHE_MAX_ENTRIES,
+)
+from app.utils.charset import BytesLike
+
+logger = logging.getLogger(__name__)
+
+# シングルトンパターンによるキャッシュインスタンスの管理
+_extraction_cache_instance = None
+
+
+def extraction_key(kind: str, version: str, body: BytesLike, *params: Any) -> str:
+    """抽出結果のキー（取得したままのバイト列と抽出器のバージョンなどから作るハッシュ値）
+
+    params には抽出結果を左右する本文以外の値（文字コード、URLなど）を渡す。
+    """
+    digest = hashlib.sha256()
+    header = json.dumps([kind, version, *params], ensure_ascii=False)
+    digest.update(header.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """本文・メタデータの抽出結果のキャッシュ
+
+    同じ記事を複数のユーザーが要約・プレビューすると、同じHTMLを毎回解析し直す。
+    抽出結果を本文のハッシュ値をキーとして保存し、2回目以降はハッシュの計算だけで返す。
+    メモリ上のLRUに加え、保存先が設定されていればディスクにも保存し、
+    ワーカーの再起動後や他のワーカーとの間でも再利用する。
+    ディスクの読み書きはスレッドで行い、削除する順序と合計サイズはメモリ上で管理する。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _extraction_cache_instance
+        if _extraction_cache_instance is None:
+            _extraction_cache_instance = cls()
+        return _extraction_cache_instance
+
+    def __init__(
+        self,
+        max_entries: int = EXTRACTION_CACHE_MAX_ENTRIES,
+        directory: str = EXTRACTION_CACHE_DIR,
+        disk_max_bytes: int = EXTRACTION_CACHE_DISK_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        # ディスクに保存済みのキー -> サイズ。先頭ほど最後に使われたのが古い
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load_disk_index()
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "evicted": 0,
+            "disk_evicted": 0,
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_disk_index(self) -> None:
+        """起動時にディスクに保存済みの抽出結果を最終利用時刻の順に記録する"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name[: -len(".json")], stat.st_size))
+        entries.sort()
+        for _, key, size in entries:
+            self._track_disk(key, size)
+
+    def _track_disk(self, key: str, size: int) -> None:
+        """ディスク上の抽出結果を最新として記録し、合計サイズを更新"""
+        self._disk_bytes += size - self._disk_entries.pop(key, 0)
+        self._disk_entries[key] = size
+
+    async def get(self, key: str) -> Optional[Any]:
+        """抽出結果を取得（なければNone）"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return copy.deepcopy(self._entries[key])
+
+        if self.directory:
+            result = await asyncio.to_thread(self._read, key)
+            if result is not None:
+                value, size = result
+                self.stats["disk_hits"] += 1
+                # 他のワーカーが保存したものも含めて、削除の順序に反映する
+                self._track_disk(key, size)
+                self._remember(key, value)
+                return copy.deepcopy(value)
+
+        self.stats["misses"] += 1
+        return None
+
+    def _read(self, key: str) -> Optional[Tuple[Any, int]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            value = json.loads(data)["value"]
+            # 最終利用時刻を更新し、再起動後も削除の順序を引き継ぐ
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return value, len(data)
+
+    async def set(self, key: str, value: Any) -> None:
+        """抽出結果を保存"""
+        self._remember(key, copy.deepcopy(value))
+        self.stats["stored"] += 1
+        if self.directory:
+            await self._write(key, value)
+
+    def _remember(self, key: str, value: Any) -> None:
+        """メモリ上に保存し、上限を超えたら最後に使われたのが古いものから削除"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    async def _write(self, key: str, value: Any) -> None:
+        """ディスクに保存（書き込みはスレッドで行う）"""
+        data = json.dumps({"value": value}, ensure_ascii=False).encode("utf-8")
+        try:
+            await asyncio.to_thread(self._write_atomic, self._path(key), data)
+        except OSError as e:
+            logger.warning(f"抽出結果のキャッシュの保存に失敗しました: {str(e)}")
+            return
+
+        self._track_disk(key, len(data))
+        if self._disk_bytes > self.disk_max_bytes:
+            await self._evict_disk()
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        """一時ファイルに書いてから置き換える"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+
+    async def _evict_disk(self) -> None:
+        """最後に使われたのが古いものから、合計が上限の9割に収まるまで削除"""
+        target = self.disk_max_bytes * 0.9
+        paths = []
+        while self._disk_entries and self._disk_bytes > target:
+            key, size = self._disk_entries.popitem(last=False)
+            self._disk_bytes -= size
+            paths.append(self._path(key))
+            self.stats["disk_evicted"] += 1
+        await asyncio.to_thread(self._remove, paths)
+        logger.info(f"抽出結果のキャッシュを整理しました: {self._disk_bytes} bytes")
+
+    @staticmethod
+    def _remove(paths: List[str]) -> None:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """キャッシュの利用状況を取得"""
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_bytes": self._disk_bytes if self.directory else None,
+        }
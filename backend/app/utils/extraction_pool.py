@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from app.config import (
+    EXTRACTION_START_METHOD,
+    EXTRACTION_TIMEOUT,
+    EXTRACTION_WORKERS,
+)
+from app.utils.charset import BytesLike, decode_body
+from app.utils.content_extractor import ContentExtractor
+from app.utils.extraction_cache import ExtractionCache, extraction_key
+from app.utils.html_engine import get_engine
+from app.utils.metadata_extractor import MetadataExtractor
+from app.utils.site_rules import SiteRuleRegistry
+
+logger = logging.getLogger(__name__)
+
+# シングルトンパターンによるプールインスタンスの管理
+_extraction_pool_instance = None
+
+# 抽出器（ワーカープロセスごとに1つだけ作る）
+_content_extractor: Optional[ContentExtractor] = None
+_metadata_extractor: Optional[MetadataExtractor] = None
+
+
+class ExtractionTimeoutError(Exception):
+    """抽出が制限時間内に終わらなかったことを表す例外"""
+
+
+def _init_worker() -> None:
+    """抽出器を作成（ワーカーの起動時に呼ばれ、HTMLパーサーを読み込んでおく）"""
+    global _content_extractor, _metadata_extractor
+    if _content_extractor is None:
+        _content_extractor = ContentExtractor()
+        _metadata_extractor = MetadataExtractor()
+
+
+def _warm_up() -> int:
+    """ワーカーが起動したことを確認"""
+    return os.getpid()
+
+
+def _extract_content(body: BytesLike, charset: Optional[str], url: str) -> str:
+    """本文を抽出（ワーカーで実行）"""
+    _init_worker()
+    return _content_extractor.extract_main_content(decode_body(body, charset), url)
+
+
+def _extract_metadata(
+    body: BytesLike, charset: Optional[str], url: str
+) -> Dict[str, Any]:
+    """メタデータを抽出（ワーカーで実行）"""
+    _init_worker()
+    return _metadata_extractor.extract_metadata(decode_body(body, charset), url)
+
+
+class ExtractionPool:
+    """本文・メタデータの抽出を別プロセスで実行するプール
+
+    抽出はCPUを使い続けるため、イベントループで実行すると大きなページ1件で
+    同じワーカーの他のリクエストがすべて止まる。取得したままのバイト列を渡し、
+    文字コードの判定から抽出までをプールのワーカーで行い、結果だけを受け取る。
+    ワーカー数が0の場合は従来どおりイベントループ上で抽出する。
+    抽出結果のキャッシュを渡した場合は、同じ本文の抽出をワーカーに送らずに返す。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _extraction_pool_instance
+        if _extraction_pool_instance is None:
+            _extraction_pool_instance = cls(cache=ExtractionCache.get_instance())
+        return _extraction_pool_instance
+
+    def __init__(
+        self,
+        workers: int = EXTRACTION_WORKERS,
+        timeout: float = EXTRACTION_TIMEOUT,
+        start_method: str = EXTRACTION_START_METHOD,
+        cache: Optional[ExtractionCache] = None,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.start_method = start_method
+        self.cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "timeouts": 0,
+            "restarts": 0,
+            "total_seconds": 0.0,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """プールを取得（未作成の場合は作成）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+            )
+            logger.info(f"抽出用のプロセスプールを作成しました: {self.workers}プロセス")
+        return self._executor
+
+    async def start(self) -> None:
+        """ワーカーをすべて起動し、初回の抽出を待たせないようにする"""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        # 空きワーカーがない間の投入ごとにプロセスが起動される
+        futures = [executor.submit(_warm_up) for _ in range(self.workers)]
+        pids = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        logger.info(f"抽出用のワーカーを起動しました: {sorted(set(pids))}")
+
+    async def close(self) -> None:
+        """プールを終了"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        """実行中のジョブを止めるため、ワーカーを終了させてプールを作り直す"""
+        if self._executor is not executor:
+            return
+        self.stats["restarts"] += 1
+        logger.warning("抽出が制限時間を超えたため、プロセスプールを作り直します")
+        # ProcessPoolExecutorは実行中のジョブを取り消せないため、プロセスを直接終了させる
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """ワーカーで関数を実行し、制限時間内に結果を受け取る"""
+        if self.workers <= 0:
+            return func(*args)
+
+        for attempt in range(2):
+            executor = self._get_executor()
+            started = time.monotonic()
+            try:
+                future: Future = executor.submit(func, *args)
+                self.stats["submitted"] += 1
+                result = await asyncio.wait_for(
+                    asyncio.wrap_future(future), self.timeout
+                )
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                # 待ち行列にあるジョブは取り消せるが、実行中のジョブはワーカーごと止める
+                if not future.cancel() and not future.done():
+                    self._restart(executor)
+                raise ExtractionTimeoutError(
+                    f"Extraction timed out after {self.timeout:.0f}s"
+                )
+            except asyncio.CancelledError:
+                # 呼び出し元の取り消し（待ち行列にあれば実行されない）
+                self.stats["cancelled"] += 1
+                raise
+            except BrokenProcessPool:
+                # 他のジョブのタイムアウトでプールが作り直された場合は1度だけやり直す
+                if attempt:
+                    raise
+                if self._executor is executor:
+                    self._executor = None
+                continue
+            self.stats["completed"] += 1
+            self.stats["total_seconds"] += time.monotonic() - started
+            return result
+
+    def _payload(self, body: BytesLike) -> BytesLike:
+        """ワーカーに渡せる形にする
+
+        ワーカーは別プロセスのため、ディスクキャッシュのmmapは渡す際にbytesへ複写する
+        （ワーカーを使わない場合はmmapをそのまま参照する）。
+        """
+        if self.workers > 0 and not isinstance(body, bytes):
+            return bytes(body)
+        return body
+
+    async def _run_cached(self, key: str, func: Callable[..., Any], *args: Any) -> Any:
+        """キャッシュにあればそれを返し、なければワーカーで実行して保存する"""
+        result = await self.cache.get(key)
+        if result is None:
+            result = await self._run(func, *args)
+            await self.cache.set(key, result)
+        return result
+
+    async def extract_content(
+        self, body: BytesLike, charset: Optional[str], url: str
+    ) -> str:
+        """取得したページのバイト列から本文を抽出"""
+        if self.cache is None:
+            return await self._run(_extract_content, self._payload(body), charset, url)
+        # 本文の抽出結果はURLではなく、適用されるサイト別ルールの内容だけに左右される
+        rule = SiteRuleRegistry.get_instance().lookup(url)
+        key = extraction_key(
+            "content",
+            ContentExtractor.VERSION,
+            body,
+            get_engine().name,
+            charset,
+            rule.fingerprint if rule is not None else None,
+        )
+        return await self._run_cached(
+            key, _extract_content, self._payload(body), charset, url
+        )
+
+    async def extract_metadata(
+        self, body: BytesLike, charset: Optional[str], url: str
+    ) -> Dict[str, Any]:
+        """取得したページのバイト列からメタデータを抽出"""
+        if self.cache is None:
+            return await self._run(_extract_metadata, self._payload(body), charset, url)
+        # 相対パスの画像はURLを基準に補完するため、URLもキーに含める
+        key = extraction_key(
+            "metadata",
+            MetadataExtractor.VERSION,
+            body,
+            get_engine().name,
+            charset,
+            url,
+        )
+        return await self._run_cached(
+            key, _extract_metadata, self._payload(body), charset, url
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """プールの利用状況を取得"""
+        return {**self.stats, "workers": self.workers, "timeout": self.timeout}
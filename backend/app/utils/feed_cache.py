@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.config import FEED_CACHE_MAX_ENTRIES, FEED_CACHE_SHARED_DIR
+
+logger = logging.getLogger(__name__)
+
+# シングルトンパターンによるキャッシュインスタンスの管理
+_feed_cache_instance = None
+
+
+class CachedFeed:
+    """キャッシュされたフィードの解析結果と検証用ヘッダー"""
+
+    def __init__(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        self.url = url
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time()
+        self.validated_at = self.fetched_at
+        # 再検証せずに返してよい秒数（定期取得対象のフィードで設定される）
+        self.ttl = 0.0
+
+    def is_fresh(self, min_ttl: float = 0.0) -> bool:
+        """再検証なしで返せるかどうか（min_ttlは最低限の鮮度保持期間）"""
+        return time.time() - self.validated_at < max(self.ttl, min_ttl)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """条件付きGET用のリクエストヘッダーを生成"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class FeedCache:
+    """フィードURLをキーとした解析結果のキャッシュ（LRU）
+
+    共有ディレクトリが設定されていれば、定期取得を行うプロセスがpublish()で
+    取得結果を書き出し、他のワーカーはload_shared()で読み込んで配信元に
+    問い合わせずに返せるようにする。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _feed_cache_instance
+        if _feed_cache_instance is None:
+            _feed_cache_instance = cls()
+        return _feed_cache_instance
+
+    def __init__(
+        self,
+        max_entries: int = FEED_CACHE_MAX_ENTRIES,
+        shared_dir: str = FEED_CACHE_SHARED_DIR,
+    ):
+        self.max_entries = max_entries
+        self.shared_dir = shared_dir
+        self._entries: "OrderedDict[str, CachedFeed]" = OrderedDict()
+        # 最後に読み書きした共有ファイルの更新時刻（変わっていなければ読み込まない）
+        self._shared_mtimes: Dict[str, float] = {}
+
+    def get(self, url: str) -> Optional[CachedFeed]:
+        """キャッシュを取得（最近使用した順を更新）"""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        self._entries.move_to_end(url)
+        return entry
+
+    def set(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CachedFeed:
+        """解析結果と検証用ヘッダーを保存"""
+        entry = CachedFeed(url, data, etag, last_modified)
+        previous = self._entries.get(url)
+        if previous is not None:
+            entry.ttl = previous.ttl
+        self._store(entry)
+        return entry
+
+    def _store(self, entry: CachedFeed) -> None:
+        self._entries[entry.url] = entry
+        self._entries.move_to_end(entry.url)
+
+        # 上限を超えた場合は最も古いものから削除
+        while len(self._entries) > self.max_entries:
+            evicted_url, _ = self._entries.popitem(last=False)
+            logger.debug(f"フィードキャッシュから削除しました: {evicted_url}")
+
+    def mark_validated(self, url: str) -> Optional[CachedFeed]:
+        """304応答を受けたキャッシュの検証時刻を更新"""
+        entry = self.get(url)
+        if entry is not None:
+            entry.validated_at = time.time()
+        return entry
+
+    def set_ttl(self, url: str, ttl: float) -> None:
+        """再検証なしで返してよい秒数を設定"""
+        entry = self._entries.get(url)
+        if entry is not None:
+            entry.ttl = ttl
+
+    def _shared_path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.shared_dir, f"{digest}.json")
+
+    async def publish(self, url: str) -> None:
+        """解析結果と鮮度を共有ディレクトリに書き出す（他のワーカー向け）"""
+        entry = self._entries.get(url)
+        if not self.shared_dir or entry is None:
+            return
+        snapshot = {
+            "url": url,
+            "data": entry.data,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "fetched_at": entry.fetched_at,
+            "validated_at": entry.validated_at,
+            "ttl": entry.ttl,
+        }
+        try:
+            await asyncio.to_thread(self._write_shared, url, snapshot)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(
+                f"フィードの取得結果を共有できませんでした ({url}): {str(e)}"
+            )
+
+    def _write_shared(self, url: str, snapshot: Dict[str, Any]) -> None:
+        """一時ファイルに書いてから置き換える（読み込み中のワーカーに途中の内容を見せない）"""
+        data = json.dumps(snapshot, ensure_ascii=False).encode("utf-8")
+        os.makedirs(self.shared_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.shared_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._shared_path(url))
+        except OSError:
+            os.unlink(temp_path)
+            raise
+        self._shared_mtimes[url] = os.stat(self._shared_path(url)).st_mtime
+
+    async def load_shared(self, url: str) -> Optional[CachedFeed]:
+        """共有ディレクトリの解析結果が手元より新しければ読み込んで返す
+
+        ファイルの更新時刻が前回から変わっていなければ読み込まない。
+        """
+        if not self.shared_dir:
+            return None
+        try:
+            snapshot = await asyncio.to_thread(self._read_shared, url)
+        except (OSError, ValueError):
+            return None
+        if snapshot is None or snapshot.get("url") != url:
+            return None
+
+        current = self._entries.get(url)
+        if current is not None and current.validated_at >= snapshot["validated_at"]:
+            return None
+        entry = CachedFeed(
+            url, snapshot["data"], snapshot["etag"], snapshot["last_modified"]
+        )
+        entry.fetched_at = snapshot["fetched_at"]
+        entry.validated_at = snapshot["validated_at"]
+        entry.ttl = snapshot["ttl"]
+        self._store(entry)
+        return entry
+
+    def _read_shared(self, url: str) -> Optional[Dict[str, Any]]:
+        """共有ファイルを読み込む（前回から更新されていなければNone）"""
+        path = self._shared_path(url)
+        try:
+            mtime = os.stat(path).st_mtime
+            if self._shared_mtimes.get(url) == mtime:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        self._shared_mtimes[url] = mtime
+        return snapshot
+
+    def delete(self, url: str) -> None:
+        """キャッシュを削除"""
+        self._entries.pop(url, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,296 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from app.config import (
+    FEED_BATCH_CONCURRENCY,
+    FEED_BATCH_TIMEOUT,
+    FEED_FRESHNESS_WINDOW,
+    FEED_MAX_BYTES,
+)
+from app.dynamodb.repositories.articles import get_article_repository
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.feed_cache import CachedFeed, FeedCache
+from app.utils.feed_parser import FeedParseError, FeedParser
+from app.utils.host_limiter import HostThrottledError, host_of
+from app.utils.http_client import HttpClient
+from app.utils.single_flight import SingleFlight
+from app.utils.timeline import sort_entries
+from app.utils.url_normalizer import article_key
+
+logger = logging.getLogger(__name__)
+
+# フィード取得時のリクエストヘッダー
+FEED_REQUEST_HEADERS = {
+    "Accept": "application/rss+xml, application/atom+xml, application/rdf+xml, application/xml;q=0.9, text/xml;q=0.8, */*;q=0.5",
+}
+# フィード本文を読み込む単位（バイト）
+FEED_CHUNK_SIZE = 64 * 1024
+
+# シングルトンパターンによるフェッチャーインスタンスの管理
+_feed_fetcher_instance = None
+
+
+def prepare_entries(data: Dict[str, Any]) -> None:
+    """解析結果の記事を新しい順に並べ、記事ストアのキーを付与"""
+    # タイムラインでのマージに備えて新しい順に並べておく
+    data["entries"] = sort_entries(data["entries"])
+    for entry in data["entries"]:
+        entry["article_id"] = article_key(entry["link"])
+
+
+def unconditional_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """条件付きGETのヘッダーを除いたリクエストヘッダー"""
+    return {
+        name: value
+        for name, value in headers.items()
+        if name.lower() not in ("if-none-match", "if-modified-since")
+    }
+
+
+class FeedRateLimitError(Exception):
+    """配信元からレートリミット（429）を返されたことを表す例外"""
+
+
+class FeedFetcher:
+    """条件付きGETでフィードを取得し、解析結果をキャッシュするクラス"""
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _feed_fetcher_instance
+        if _feed_fetcher_instance is None:
+            _feed_fetcher_instance = cls()
+        return _feed_fetcher_instance
+
+    def __init__(
+        self,
+        cache: FeedCache = None,
+        article_repository=None,
+        http_client: HttpClient = None,
+    ):
+        self.cache = cache or FeedCache.get_instance()
+        self.article_repository = article_repository or get_article_repository()
+        self.single_flight = SingleFlight()
+        self.http_client = http_client or HttpClient.get_instance()
+        self.stats = {
+            "fetched": 0,
+            "not_modified": 0,
+            "not_modified_retried": 0,
+            "served_fresh": 0,
+            "bytes_received": 0,
+            "articles_ingested": 0,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得処理の統計情報を取得"""
+        return {
+            **self.stats,
+            "requests": {
+                **self.single_flight.stats,
+                "in_flight": self.single_flight.in_flight(),
+            },
+            "cached_feeds": len(self.cache),
+        }
+
+    async def fetch(self, url: str, revalidate: bool = False) -> Dict[str, Any]:
+        """フィードを取得して解析結果を返す（未更新ならキャッシュを返す）"""
+        # 定期取得を行うプロセスや、WebSubの配信を受けた他のワーカーが
+        # 共有した結果のほうが新しければ使う
+        cached = await self.cache.load_shared(url) or self.cache.get(url)
+        # 定期取得や直前の取得で新しい状態が保たれている場合は配信元に問い合わせない
+        if (
+            cached is not None
+            and not revalidate
+            and cached.is_fresh(FEED_FRESHNESS_WINDOW)
+        ):
+            self.stats["served_fresh"] += 1
+            return cached.data
+
+        # 同じURLへの同時取得は1回にまとめる
+        return await self.single_flight.do(url, lambda: self._fetch(url))
+
+    async def fetch_many(
+        self,
+        urls: List[str],
+        concurrency: int = FEED_BATCH_CONCURRENCY,
+        timeout: float = FEED_BATCH_TIMEOUT,
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        """複数のフィードを同時数を制限して取得（結果はurlsと同じ順）
+
+        フィードごとにタイムアウトを設け、失敗したフィードは例外を結果として返す。
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(
+            *(self._fetch_bounded(url, semaphore, timeout) for url in urls),
+            return_exceptions=True,
+        )
+
+    async def iter_completed(
+        self,
+        urls: List[str],
+        concurrency: int = FEED_BATCH_CONCURRENCY,
+        timeout: float = FEED_BATCH_TIMEOUT,
+    ) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], BaseException]]]:
+        """複数のフィードを取得し、完了した順に(urlsでの位置, 結果)を返す
+
+        fetch_manyと同じく失敗したフィードは例外を結果として返す。
+        呼び出し元が途中で中断した場合は残りの取得をキャンセルする。
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(index: int, url: str):
+            try:
+                return index, await self._fetch_bounded(url, semaphore, timeout)
+            except Exception as e:
+                return index, e
+
+        tasks = [
+            asyncio.create_task(fetch_one(index, url)) for index, url in enumerate(urls)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_bounded(
+        self, url: str, semaphore: asyncio.Semaphore, timeout: float
+    ) -> Dict[str, Any]:
+        """同時数とタイムアウトを制限してフィードを取得"""
+        async with semaphore:
+            return await asyncio.wait_for(self.fetch(url), timeout)
+
+    async def _fetch(self, url: str) -> Dict[str, Any]:
+        """配信元からフィードを取得して解析する"""
+        cached = self.cache.get(url)
+        headers = dict(FEED_REQUEST_HEADERS)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+
+        # 配信元から待機を指示されている間は、キャッシュがあれば待たずに返す
+        if cached is not None and self.http_client.limiter.blocked_for(host_of(url)):
+            return self._rate_limited(url, cached)
+
+        try:
+            for attempt in range(2):
+                async with self.http_client.get(
+                    url, headers=headers, hedge=True
+                ) as response:
+                    # 未更新の場合はキャッシュ済みの解析結果を返す
+                    if response.status == 304 and cached is not None:
+                        self.stats["not_modified"] += 1
+                        self.cache.mark_validated(url)
+                        logger.info(f"Feed not modified, serving cached parse: {url}")
+                        return cached.data
+
+                    if response.status == 304:
+                        # 手元にない本文を304で返された（途中のキャッシュなど）場合は、
+                        # 条件なしで1回だけ取得し直す
+                        if attempt == 0:
+                            self.stats["not_modified_retried"] += 1
+                            logger.warning(
+                                f"304 without a cached parse, refetching: {url}"
+                            )
+                            headers = {
+                                **unconditional_headers(headers),
+                                "Cache-Control": "no-cache",
+                            }
+                            continue
+                        raise FeedParseError(
+                            "配信元が未更新(304)を返したため、フィードを取得できません"
+                        )
+
+                    # 配信元のレートリミットチェック
+                    if response.status == 429:
+                        return self._rate_limited(url, cached)
+
+                    response.raise_for_status()
+
+                    # 受信しながら解析する
+                    parser = FeedParser(response.charset)
+                    received = 0
+                    async for chunk in response.content.iter_chunked(FEED_CHUNK_SIZE):
+                        self.stats["bytes_received"] += len(chunk)
+                        received += len(chunk)
+                        if received > FEED_MAX_BYTES:
+                            raise FeedParseError(
+                                f"フィードが大きすぎます（上限 {FEED_MAX_BYTES} バイト）"
+                            )
+                        parser.feed(chunk)
+                    data = parser.close()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    break
+        except HostThrottledError:
+            # Retry-Afterで止められている間や待ち行列が長い間は配信元に問い合わせない
+            return self._rate_limited(url, cached)
+        except CircuitOpenError:
+            # 障害中のホストは待たずに、最後に取得できた解析結果を返す
+            if cached is not None:
+                logger.warning(f"Circuit open, serving cached parse: {url}")
+                return cached.data
+            raise
+
+        prepare_entries(data)
+
+        self.stats["fetched"] += 1
+        self.cache.set(url, data, etag=etag, last_modified=last_modified)
+        await self._ingest(url, data, cached)
+        return data
+
+    def _rate_limited(self, url: str, cached: Optional[CachedFeed]) -> Dict[str, Any]:
+        """レートリミット中はキャッシュ済みの解析結果を返す（なければ例外）"""
+        if cached is not None:
+            logger.warning(f"Rate limited, serving cached parse: {url}")
+            return cached.data
+        raise FeedRateLimitError(f"Rate limit exceeded: {url}")
+
+    async def ingest_pushed(self, url: str, data: Dict[str, Any]) -> int:
+        """WebSubで配信された記事をキャッシュ済みの解析結果に取り込む
+
+        配信は定期取得を行わないワーカーにも届くため、取り込んだ結果は共有する。
+        """
+        prepare_entries(data)
+        cached = await self.cache.load_shared(url) or self.cache.get(url)
+        if cached is None:
+            self.cache.set(url, data)
+            await self.cache.publish(url)
+            await self._ingest(url, data, None)
+            return len(data["entries"])
+
+        # 配信された記事を優先して統合し、件数は従来の範囲に収める
+        pushed_ids = {e["article_id"] for e in data["entries"]}
+        merged = data["entries"] + [
+            e for e in cached.data["entries"] if e.get("article_id") not in pushed_ids
+        ]
+        limit = max(len(cached.data["entries"]), len(data["entries"]))
+        merged_data = {
+            "feed": {**cached.data["feed"], **data["feed"]},
+            "entries": sort_entries(merged)[:limit],
+        }
+
+        # 検証用ヘッダーは引き継ぎ、次回の条件付きGETでは統合後の結果を使う
+        self.cache.set(url, merged_data, cached.etag, cached.last_modified)
+        await self.cache.publish(url)
+        await self._ingest(url, data, cached)
+        return len(data["entries"])
+
+    async def _ingest(
+        self, url: str, data: Dict[str, Any], cached: Optional[CachedFeed]
+    ) -> None:
+        """前回の取得以降に追加された記事だけを記事ストアに登録"""
+        known = (
+            {e.get("article_id") for e in cached.data["entries"]} if cached else set()
+        )
+        new_entries = [e for e in data["entries"] if e["article_id"] not in known]
+        if not new_entries:
+            return
+
+        try:
+            count = await self.article_repository.upsert_articles(new_entries, url)
+            self.stats["articles_ingested"] += count
+        except Exception as e:
+            # 記事ストアへの登録に失敗してもフィードの取得結果は返す
+            logger.error(f"記事ストアへの登録に失敗しました ({url}): {str(e)}")
@@ -0,0 +1,342 @@
+import codecs
+import logging
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 名前空間
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RSS1_NS = "http://purl.org/rss/1.0/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+HATENA_NS = "http://www.hatena.ne.jp/info/xmlns#"
+
+# expatがそのまま扱えるエンコーディング（それ以外はUTF-8に変換してから渡す）
+EXPAT_ENCODINGS = {
+    "utf-8",
+    "utf8",
+    "utf-16",
+    "utf16",
+    "us-ascii",
+    "ascii",
+    "iso-8859-1",
+    "latin-1",
+}
+
+# フィードとして受け付けるルート要素（RSS 2.0、Atom、RSS 1.0のRDF）
+FEED_ROOTS = ("rss", "feed", "RDF")
+
+# UTF-8・UTF-16のBOM
+BYTE_ORDER_MARKS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+XML_DECLARATION_PATTERN = re.compile(
+    rb"^\s*<\?xml[^>]*?encoding\s*=\s*[\"']([A-Za-z0-9._-]+)[\"']", re.IGNORECASE
+)
+IMG_SRC_PATTERN = re.compile(r"<img[^>]+src\s*=\s*[\"']([^\"']+)[\"']", re.IGNORECASE)
+
+
+class FeedParseError(ValueError):
+    """フィードの解析に失敗したことを表す例外"""
+
+
+def _local_name(tag: str) -> str:
+    """名前空間を除いたタグ名を取得"""
+    return tag.rsplit("}", 1)[-1] if "}" in tag else tag
+
+
+def _text(element: Optional[ET.Element]) -> str:
+    """要素のテキストを取得（前後の空白は除去）"""
+    if element is None or element.text is None:
+        return ""
+    return element.text.strip()
+
+
+def parse_date(value: str) -> Optional[datetime]:
+    """RFC 822 / ISO 8601形式の日付文字列をUTCのdatetimeに変換"""
+    value = (value or "").strip()
+    if not value:
+        return None
+
+    parsed: Optional[datetime] = None
+    try:
+        # RSS 2.0（pubDate）はRFC 822形式
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            # Atom / dc:dateはISO 8601形式
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class FeedParser:
+    """RSS 2.0 / RSS 1.0(RDF) / Atomをストリーミングで解析するパーサー
+
+    feed()でバイト列を逐次渡し、close()で解析結果を受け取る。
+    記事要素は読み終わった時点で変換してツリーから切り離すため、
+    記事数が多いフィードでもメモリ使用量はほぼ一定になる。
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        # Content-Typeなどから得たエンコーディング（XML宣言がない場合のみ使用）
+        self.encoding_hint = encoding
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+        self._head = b""
+        self._started = False
+        self._decoder = None
+        self.entries: List[Dict[str, Any]] = []
+        self.feed_info: Dict[str, Any] = {}
+        # RSSの<channel>またはAtomの<feed>を読み終えたか
+        self._feed_found = False
+
+    def _start(self, data: bytes) -> bytes:
+        """先頭のXML宣言を確認し、必要であればUTF-8への変換を準備する"""
+        self._started = True
+        # BOMがあればその符号化がContent-Typeより優先され、expatがそのまま扱える
+        if data.startswith(BYTE_ORDER_MARKS):
+            return data
+        match = XML_DECLARATION_PATTERN.match(data)
+        encoding = match.group(1).decode("ascii") if match else self.encoding_hint
+        if not encoding or encoding.lower() in EXPAT_ENCODINGS:
+            return data
+
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            logger.warning(f"未対応のエンコーディングです: {encoding}")
+            return data
+
+        text = self._decoder.decode(data)
+        if match:
+            # 宣言のエンコーディングを書き換えてからexpatに渡す
+            text = re.sub(
+                r"encoding\s*=\s*[\"'][^\"']+[\"']", 'encoding="UTF-8"', text, count=1
+            )
+        return text.encode("utf-8")
+
+    def feed(self, data: bytes) -> None:
+        """バイト列を追加して解析を進める"""
+        if not self._started:
+            # XML宣言を判定できるだけのバイト数が揃うまで待つ
+            self._head += data
+            if b"?>" not in self._head and len(self._head) < 1024:
+                return
+            data, self._head = self._start(self._head), b""
+        elif self._decoder is not None:
+            data = self._decoder.decode(data).encode("utf-8")
+
+        try:
+            self._parser.feed(data)
+        except ET.ParseError as e:
+            raise FeedParseError(f"フィードのXMLが不正です: {str(e)}") from e
+        self._handle_events()
+
+    def close(self) -> Dict[str, Any]:
+        """解析を完了して結果を返す"""
+        if not self._started:
+            self._parser.feed(self._start(self._head))
+        elif self._decoder is not None:
+            self._parser.feed(self._decoder.decode(b"", final=True).encode("utf-8"))
+
+        try:
+            self._parser.close()
+        except ET.ParseError as e:
+            raise FeedParseError(f"フィードのXMLが不正です: {str(e)}") from e
+        self._handle_events()
+
+        if not self._feed_found:
+            raise FeedParseError("RSS・Atomのフィードではありません")
+        return {"feed": self.feed_info, "entries": self.entries}
+
+    def _handle_events(self) -> None:
+        """XMLPullParserのイベントを処理"""
+        for event, element in self._parser.read_events():
+            if event == "start":
+                # HTMLなどフィード以外の文書は最初の要素で打ち切る
+                if not self._stack and _local_name(element.tag) not in FEED_ROOTS:
+                    raise FeedParseError(
+                        f"RSS・Atomのフィードではありません: <{_local_name(element.tag)}>"
+                    )
+                self._stack.append(element)
+                continue
+
+            self._stack.pop()
+            name = _local_name(element.tag)
+            parent = self._stack[-1] if self._stack else None
+
+            if name in ("item", "entry"):
+                self.entries.append(self._parse_entry(element))
+                # 処理済みの記事はツリーから切り離してメモリを解放
+                if parent is not None:
+                    parent.remove(element)
+            elif name in ("channel", "feed"):
+                self._parse_feed_info(element)
+                self._feed_found = True
+            elif (
+                name == "image"
+                and parent is not None
+                and parent.tag == f"{{{RDF_NS}}}RDF"
+            ):
+                # RSS 1.0ではimage要素がchannelの兄弟要素になる
+                image_url = _text(element.find(f"{{{RSS1_NS}}}url"))
+                if image_url and not self.feed_info.get("image"):
+                    self.feed_info["image"] = image_url
+
+    def _find(self, element: ET.Element, *names: str) -> Optional[ET.Element]:
+        """名前空間の候補を順に試して子要素を検索"""
+        for name in names:
+            found = element.find(name)
+            if found is not None:
+                return found
+        return None
+
+    def _find_text(self, element: ET.Element, *names: str) -> str:
+        """子要素のテキストを候補順に検索"""
+        for name in names:
+            text = _text(element.find(name))
+            if text:
+                return text
+        return ""
+
+    def _atom_link(self, element: ET.Element, rel: str = "alternate") -> str:
+        """Atomのlink要素から指定relのhrefを取得"""
+        for link in element.findall(f"{{{ATOM_NS}}}link"):
+            if link.get("rel", "alternate") == rel:
+                return link.get("href", "")
+        return ""
+
+    def _parse_feed_info(self, element: ET.Element) -> None:
+        """チャンネル（フィード）全体の情報を取得"""
+        atom = element.tag == f"{{{ATOM_NS}}}feed"
+        rss1 = element.tag == f"{{{RSS1_NS}}}channel"
+        ns = f"{{{RSS1_NS}}}" if rss1 else ""
+
+        if atom:
+            author = self._find(element, f"{{{ATOM_NS}}}author")
+            self.feed_info.update(
+                {
+                    "url": self._atom_link(element, "self"),
+                    "hub": self._atom_link(element, "hub"),
+                    "title": self._find_text(element, f"{{{ATOM_NS}}}title"),
+                    "link": self._atom_link(element),
+                    "author": (
+                        self._find_text(author, f"{{{ATOM_NS}}}name")
+                        if author is not None
+                        else ""
+                    ),
+                    "description": self._find_text(element, f"{{{ATOM_NS}}}subtitle"),
+                    "image": self._find_text(
+                        element, f"{{{ATOM_NS}}}logo", f"{{{ATOM_NS}}}icon"
+                    ),
+                }
+            )
+            return
+
+        image = self._find(element, "image")
+        self.feed_info.update(
+            {
+                "url": self._atom_link(element, "self")
+                or (element.get(f"{{{RDF_NS}}}about", "") if rss1 else ""),
+                "hub": self._atom_link(element, "hub"),
+                "title": self._find_text(element, f"{ns}title"),
+                "link": self._find_text(element, f"{ns}link"),
+                "author": self._find_text(
+                    element, "managingEditor", f"{{{DC_NS}}}creator"
+                ),
+                "description": self._find_text(element, f"{ns}description"),
+                "image": _text(image.find("url")) if image is not None else "",
+            }
+        )
+
+    def _parse_entry(self, element: ET.Element) -> Dict[str, Any]:
+        """記事要素をフロントエンドが扱う形式に変換"""
+        if element.tag == f"{{{ATOM_NS}}}entry":
+            link = self._atom_link(element)
+            description = self._find_text(
+                element, f"{{{ATOM_NS}}}summary", f"{{{ATOM_NS}}}content"
+            )
+            published = self._find_text(
+                element, f"{{{ATOM_NS}}}published", f"{{{ATOM_NS}}}updated"
+            )
+            guid = self._find_text(element, f"{{{ATOM_NS}}}id") or link
+            title = self._find_text(element, f"{{{ATOM_NS}}}title")
+            categories = [
+                c.get("term", "")
+                for c in element.findall(f"{{{ATOM_NS}}}category")
+                if c.get("term")
+            ]
+        else:
+            ns = f"{{{RSS1_NS}}}" if element.tag == f"{{{RSS1_NS}}}item" else ""
+            link = self._find_text(element, f"{ns}link") or element.get(
+                f"{{{RDF_NS}}}about", ""
+            )
+            description = self._find_text(
+                element, f"{ns}description", f"{{{CONTENT_NS}}}encoded"
+            )
+            published = self._find_text(
+                element, "pubDate", f"{{{DC_NS}}}date", f"{ns}date", "published"
+            )
+            guid = self._find_text(element, "guid") or link
+            title = self._find_text(element, f"{ns}title")
+            categories = [
+                _text(c)
+                for c in element.findall("category")
+                + element.findall(f"{{{DC_NS}}}subject")
+                if _text(c)
+            ]
+
+        published_at = parse_date(published)
+        return {
+            "title": title,
+            "link": link,
+            "guid": guid,
+            "description": description,
+            "published": (published_at or datetime.now(timezone.utc)).isoformat(),
+            "image": self._parse_image(element, description),
+            "categories": categories,
+        }
+
+    def _parse_image(self, element: ET.Element, description: str) -> str:
+        """記事のサムネイル画像URLを取得"""
+        thumbnail = element.find(f"{{{MEDIA_NS}}}thumbnail")
+        if thumbnail is not None and thumbnail.get("url"):
+            return thumbnail.get("url")
+
+        for media in element.iter(f"{{{MEDIA_NS}}}content"):
+            if media.get("medium") == "image" or media.get("type", "").startswith(
+                "image/"
+            ):
+                return media.get("url", "")
+
+        for enclosure in element.findall("enclosure") + element.findall(
+            f"{{{ATOM_NS}}}link[@rel='enclosure']"
+        ):
+            if enclosure.get("type", "").startswith("image/"):
+                return enclosure.get("url") or enclosure.get("href", "")
+
+        hatena_image = _text(element.find(f"{{{HATENA_NS}}}imageurl"))
+        if hatena_image:
+            return hatena_image
+
+        # 本文中の最初の画像を使用
+        content = _text(element.find(f"{{{CONTENT_NS}}}encoded")) or description
+        match = IMG_SRC_PATTERN.search(content)
+        return match.group(1) if match else ""
+
+
+def parse_feed_bytes(body: bytes, encoding: Optional[str] = None) -> Dict[str, Any]:
+    """フィード本文を一括で解析する"""
+    parser = FeedParser(encoding)
+    parser.feed(body)
+    return parser.close()
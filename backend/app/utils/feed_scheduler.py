@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import os
+import statistics
+import time
+from typing import IO, Any, Dict, List, Optional
+
+from app.config import (
+    FEED_LIST_REFRESH_INTERVAL,
+    FEED_POLL_CONCURRENCY,
+    FEED_POLL_DEFAULT_INTERVAL,
+    FEED_POLL_LOCK_FILE,
+    FEED_POLL_MAX_INTERVAL,
+    FEED_POLL_MIN_INTERVAL,
+)
+from app.dynamodb.repositories.feeds import FeedRepository
+from app.utils.feed_fetcher import FeedFetcher
+from app.utils.feed_parser import parse_date
+from app.utils.websub import WebSubManager
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+logger = logging.getLogger(__name__)
+
+# スケジューラーのループ間隔（秒）
+SCHEDULER_TICK = 5
+# 更新がなかった場合に取得間隔を延ばす倍率
+UNCHANGED_BACKOFF = 1.5
+# 公開間隔の推定に使う最新記事の件数
+PUBLISH_SAMPLE_SIZE = 20
+
+# シングルトンパターンによるスケジューラーインスタンスの管理
+_feed_scheduler_instance = None
+
+
+class FeedPollState:
+    """フィードごとの定期取得の状態"""
+
+    def __init__(self, url: str, interval: float = FEED_POLL_DEFAULT_INTERVAL):
+        self.url = url
+        self.interval = interval
+        self.next_poll_at = time.time()
+        self.last_polled_at: Optional[float] = None
+        self.latest_guid: Optional[str] = None
+        self.failures = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "interval": self.interval,
+            "next_poll_at": self.next_poll_at,
+            "last_polled_at": self.last_polled_at,
+            "failures": self.failures,
+        }
+
+
+def estimate_publish_interval(entries: List[Dict[str, Any]]) -> Optional[float]:
+    """最新記事の公開日時の間隔（中央値）を秒で推定"""
+    timestamps = sorted(
+        (
+            published.timestamp()
+            for published in (parse_date(e.get("published", "")) for e in entries)
+            if published is not None
+        ),
+        reverse=True,
+    )[:PUBLISH_SAMPLE_SIZE]
+    gaps = [a - b for a, b in zip(timestamps, timestamps[1:]) if a > b]
+    if not gaps:
+        return None
+    return statistics.median(gaps)
+
+
+class FeedScheduler:
+    """有効なフィードをバックグラウンドで定期取得するスケジューラー
+
+    取得間隔はフィードごとに公開頻度から推定し、
+    更新がなければ延ばし、エラー時は指数的に延ばす。
+    取得結果はFeedCacheに保存され、APIはそこから返される。
+
+    ワーカーごとに起動されるため、ロックファイルを取得できたプロセスだけが
+    取得を行い、結果はFeedCacheの共有ディレクトリを通じて他のワーカーに渡す。
+    取得を行うプロセスが終了すると、次の周期で他のワーカーが引き継ぐ。
+    lifespanが無効なLambdaでは開始されず、APIは配信元へ条件付きGETで問い合わせる。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _feed_scheduler_instance
+        if _feed_scheduler_instance is None:
+            _feed_scheduler_instance = cls()
+        return _feed_scheduler_instance
+
+    def __init__(
+        self,
+        feed_fetcher: FeedFetcher = None,
+        concurrency: int = FEED_POLL_CONCURRENCY,
+        websub: WebSubManager = None,
+        lock_file: str = FEED_POLL_LOCK_FILE,
+    ):
+        self.feed_fetcher = feed_fetcher or FeedFetcher.get_instance()
+        self.websub = websub or WebSubManager.get_instance()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.states: Dict[str, FeedPollState] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._feeds_loaded_at = 0.0
+        self.lock_file = lock_file
+        self._lock: Optional[IO] = None
+
+    def start(self) -> None:
+        """スケジューラーを開始"""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("フィード定期取得スケジューラーを開始しました")
+
+    async def stop(self) -> None:
+        """スケジューラーを停止"""
+        tasks = [t for t in [self._task, *self._in_flight.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._in_flight.clear()
+        if self._lock is not None:
+            # ロックを解放し、他のワーカーに定期取得を引き継ぐ
+            self._lock.close()
+            self._lock = None
+        logger.info("フィード定期取得スケジューラーを停止しました")
+
+    @property
+    def is_leader(self) -> bool:
+        """このプロセスが定期取得を担当しているかどうか"""
+        return self._lock is not None or not self.lock_file or not HAS_FCNTL
+
+    def try_lead(self) -> bool:
+        """ロックファイルを取得できれば定期取得を担当する（待たずに結果を返す）"""
+        if self.is_leader:
+            return True
+        os.makedirs(os.path.dirname(self.lock_file) or ".", exist_ok=True)
+        lock = open(self.lock_file, "a")
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return False
+        self._lock = lock
+        # 他のプロセスが担当していた間の状態は持たないため、一覧から読み直す
+        self._feeds_loaded_at = 0.0
+        logger.info(f"このプロセスでフィードの定期取得を行います (pid={os.getpid()})")
+        return True
+
+    async def refresh_feeds(self) -> None:
+        """有効なフィードの一覧を読み込み、取得対象を更新"""
+        feeds = await FeedRepository().get_all_feeds()
+        urls = {feed.url for feed in feeds if feed.enabled and feed.url}
+
+        for url in urls - self.states.keys():
+            self.states[url] = FeedPollState(url)
+        for url in self.states.keys() - urls:
+            del self.states[url]
+            # 取得対象外になったフィードは毎回再検証させる
+            self.feed_fetcher.cache.set_ttl(url, 0)
+            await self.feed_fetcher.cache.publish(url)
+
+        self._feeds_loaded_at = time.time()
+        logger.info(f"定期取得対象のフィード数: {len(self.states)}")
+
+    async def _run(self) -> None:
+        """期限が来たフィードを順次取得するメインループ"""
+        while True:
+            try:
+                if not self.try_lead():
+                    await asyncio.sleep(SCHEDULER_TICK)
+                    continue
+                if time.time() - self._feeds_loaded_at >= FEED_LIST_REFRESH_INTERVAL:
+                    await self.refresh_feeds()
+                await self.websub.renew_expiring()
+
+                now = time.time()
+                for state in list(self.states.values()):
+                    if state.next_poll_at <= now and state.url not in self._in_flight:
+                        self._in_flight[state.url] = asyncio.create_task(
+                            self._poll(state)
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"フィード定期取得中にエラーが発生しました: {str(e)}")
+
+            await asyncio.sleep(SCHEDULER_TICK)
+
+    async def _poll(self, state: FeedPollState) -> None:
+        """フィードを1件取得し、次回の取得時刻を決める"""
+        succeeded = False
+        try:
+            async with self.semaphore:
+                data = await self.feed_fetcher.fetch(state.url, revalidate=True)
+
+            entries = data.get("entries", [])
+            latest_guid = entries[0].get("guid") if entries else None
+            base = estimate_publish_interval(entries) or FEED_POLL_DEFAULT_INTERVAL
+            # 公開間隔の半分ごとに確認する
+            base = min(max(base / 2, FEED_POLL_MIN_INTERVAL), FEED_POLL_MAX_INTERVAL)
+
+            if state.last_polled_at is not None and latest_guid == state.latest_guid:
+                # 更新がなければ間隔を延ばす
+                interval = max(state.interval, base) * UNCHANGED_BACKOFF
+            else:
+                interval = base
+
+            state.interval = min(interval, FEED_POLL_MAX_INTERVAL)
+            state.latest_guid = latest_guid
+            state.failures = 0
+
+            # ハブを告知しているフィードは購読し、有効な間はプッシュに任せる
+            await self.websub.ensure_subscribed(state.url, data.get("feed", {}))
+            if self.websub.is_active(state.url):
+                state.interval = FEED_POLL_MAX_INTERVAL
+            succeeded = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state.failures += 1
+            state.interval = min(state.interval * 2, FEED_POLL_MAX_INTERVAL)
+            logger.warning(f"フィードの定期取得に失敗しました ({state.url}): {str(e)}")
+        finally:
+            state.last_polled_at = time.time()
+            state.next_poll_at = state.last_polled_at + state.interval
+            self._in_flight.pop(state.url, None)
+
+        # 取得できた場合は次回の取得までAPIはキャッシュから返し、
+        # 失敗した場合は古い結果を返し続けないよう毎回再検証させる
+        ttl = state.interval + SCHEDULER_TICK if succeeded else 0
+        self.feed_fetcher.cache.set_ttl(state.url, ttl)
+        await self.feed_fetcher.cache.publish(state.url)
@@ -0,0 +1,96 @@
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.config import (
+    HEDGE_BUDGET_BURST,
+    HEDGE_BUDGET_RATIO,
+    HEDGE_ENABLED,
+    HEDGE_LATENCY_WINDOW,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """遅いリクエストを追い越すための追加リクエスト（ヘッジ）の判断
+
+    ホストごとに直近の応答時間（ヘッダー受信まで）を記録し、
+    リクエストがそのパーセンタイルを超えても応答しない場合にヘッジを許可する。
+    追加のリクエストは通常のリクエスト数の一定割合までに抑える。
+    """
+
+    def __init__(
+        self,
+        enabled: bool = HEDGE_ENABLED,
+        percentile: float = HEDGE_PERCENTILE,
+        window: int = HEDGE_LATENCY_WINDOW,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        min_delay: float = HEDGE_MIN_DELAY,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        budget_burst: int = HEDGE_BUDGET_BURST,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        # 通常のリクエストごとにbudget_ratioずつ貯まり、ヘッジ1件で1を使う
+        self.budget = float(budget_burst)
+        self._latencies: Dict[str, deque] = {}
+        self.stats = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_won": 0,
+            "skipped_budget": 0,
+        }
+
+    def observe(self, host: str, seconds: float) -> None:
+        """応答時間を記録"""
+        if not self.enabled:
+            return
+        latencies = self._latencies.get(host)
+        if latencies is None:
+            latencies = deque(maxlen=self.window)
+            self._latencies[host] = latencies
+        latencies.append(seconds)
+
+    def delay_for(self, host: str) -> Optional[float]:
+        """ヘッジを送るまでの秒数（ヘッジしない場合はNone）
+
+        ヘッジの対象となるリクエストが始まるたびに呼び出し、予算を積み増す。
+        """
+        if not self.enabled:
+            return None
+        self.stats["requests"] += 1
+        self.budget = min(self.budget + self.budget_ratio, self.budget_burst)
+
+        latencies = self._latencies.get(host)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+        return max(ordered[index], self.min_delay)
+
+    def try_spend(self) -> bool:
+        """予算が残っていればヘッジ1件分を使う"""
+        if self.budget < 1:
+            self.stats["skipped_budget"] += 1
+            return False
+        self.budget -= 1
+        self.stats["hedged"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ヘッジの実施状況を取得"""
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "budget": round(self.budget, 2),
+            "hosts": len(self._latencies),
+        }
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config import (
+    HOST_DEFAULT_BACKOFF,
+    HOST_MAX_BUCKETS,
+    HOST_MAX_RETRY_AFTER,
+    HOST_MAX_WAIT,
+    HOST_RATE_BURST,
+    HOST_RATE_OVERRIDES,
+    HOST_RATE_PER_SECOND,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HostThrottledError(Exception):
+    """ホストへのリクエストが流量制限で許可されなかったことを表す例外"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Host is throttled for {retry_after:.0f}s: {host}")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def host_of(url: str) -> str:
+    """URLから流量制限の単位となるホスト名を取得"""
+    return (urlsplit(url).hostname or "").lower()
+
+
+def parse_rate_overrides(value: str) -> Dict[str, Tuple[float, int]]:
+    """HOST_RATE_OVERRIDESの設定値を解析"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        host, _, spec = item.partition("=")
+        rate, _, burst = spec.partition(":")
+        try:
+            overrides[host.strip().lower()] = (
+                float(rate),
+                int(burst) if burst else HOST_RATE_BURST,
+            )
+        except ValueError:
+            logger.warning(f"HOST_RATE_OVERRIDESの指定が不正です: {item}")
+    return overrides
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数またはHTTP日付）を待機秒数に変換"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """ホストごとのトークンバケットと待ち行列の状態"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        # Retry-Afterなどで指定された再開時刻
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+        self.stats = {
+            "requests": 0,
+            "rejected": 0,
+            "deferred": 0,
+            "max_queue_depth": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def estimated_wait(self, now: float) -> float:
+        """行列の後ろに並んだ場合に許可されるまでのおおよその秒数"""
+        self.refill(now)
+        shortage = self.waiting + 1 - self.tokens
+        return max(
+            self.blocked_until - now, shortage / self.rate if shortage > 0 else 0
+        )
+
+    def is_idle(self, now: float) -> bool:
+        """待っているリクエストも制限もなく、トークンが満杯か（破棄しても挙動が変わらない）"""
+        self.refill(now)
+        return (
+            self.waiting == 0
+            and not self.lock.locked()
+            and now >= self.blocked_until
+            and self.tokens >= self.burst
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self.refill(now)
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "queue_depth": self.waiting,
+            "blocked_for": max(self.blocked_until - now, 0.0),
+            **self.stats,
+        }
+
+
+class HostLimiter:
+    """配信元ホストごとにリクエストの頻度を制限するクラス
+
+    ホストごとのトークンバケットで毎秒の回数とバーストを制限し、
+    順番待ちのリクエストは到着順に許可する。429やRetry-Afterを
+    受け取ったホストは指定された時刻まで新たなリクエストを送らない。
+    保持するホスト数がmax_bucketsを超えたら、トークンが満杯で使われていない
+    ホストを破棄し、それでも多ければ最後に使われたのが古いホストから破棄する。
+    """
+
+    def __init__(
+        self,
+        rate: float = HOST_RATE_PER_SECOND,
+        burst: int = HOST_RATE_BURST,
+        max_wait: float = HOST_MAX_WAIT,
+        overrides: Dict[str, Tuple[float, int]] = None,
+        max_buckets: int = HOST_MAX_BUCKETS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.overrides = (
+            overrides
+            if overrides is not None
+            else parse_rate_overrides(HOST_RATE_OVERRIDES)
+        )
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune()
+            rate, burst = self.overrides.get(host, (self.rate, self.burst))
+            bucket = TokenBucket(rate, burst)
+            self._buckets[host] = bucket
+        else:
+            self._buckets.move_to_end(host)
+        return bucket
+
+    def _prune(self) -> None:
+        """使われていないホストの状態を破棄して、上限の9割まで減らす"""
+        now = time.monotonic()
+        for host in [h for h, b in self._buckets.items() if b.is_idle(now)]:
+            del self._buckets[host]
+
+        # 残りは最後に使われたのが古いものから、待っているリクエストがなければ破棄する
+        target = int(self.max_buckets * 0.9)
+        for host in list(self._buckets):
+            if len(self._buckets) <= target:
+                break
+            bucket = self._buckets[host]
+            if bucket.waiting == 0 and not bucket.lock.locked():
+                del self._buckets[host]
+
+    async def acquire(self, host: str, max_wait: Optional[float] = None) -> None:
+        """ホストへのリクエストが許可されるまで待つ
+
+        待ち時間がmax_waitを超える見込みの場合はHostThrottledErrorを送出する。
+        """
+        bucket = self._bucket(host)
+        max_wait = self.max_wait if max_wait is None else max_wait
+        expected = bucket.estimated_wait(time.monotonic())
+        if expected > max_wait:
+            bucket.stats["rejected"] += 1
+            raise HostThrottledError(host, expected)
+
+        bucket.waiting += 1
+        bucket.stats["max_queue_depth"] = max(
+            bucket.stats["max_queue_depth"], bucket.waiting
+        )
+        started = time.monotonic()
+        try:
+            # ロックで到着順に並ばせ、先頭のリクエストだけがトークンを待つ
+            async with bucket.lock:
+                while True:
+                    now = time.monotonic()
+                    bucket.refill(now)
+                    if now >= bucket.blocked_until and bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        break
+                    await asyncio.sleep(
+                        max(
+                            bucket.blocked_until - now,
+                            (1 - bucket.tokens) / bucket.rate,
+                        )
+                    )
+        finally:
+            bucket.waiting -= 1
+            bucket.stats["wait_seconds"] += time.monotonic() - started
+        bucket.stats["requests"] += 1
+
+    def try_acquire(self, host: str) -> bool:
+        """待たずに許可できる場合だけトークンを取る（ヘッジなど追加のリクエスト用）"""
+        bucket = self._bucket(host)
+        now = time.monotonic()
+        bucket.refill(now)
+        # 並んでいるリクエストがあれば追い越さない
+        if bucket.lock.locked() or now < bucket.blocked_until or bucket.tokens < 1:
+            return False
+        bucket.tokens -= 1
+        bucket.stats["requests"] += 1
+        return True
+
+    def blocked_for(self, host: str) -> float:
+        """Retry-Afterなどでホストへのリクエストが止められている残り秒数"""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            return 0.0
+        return max(bucket.blocked_until - time.monotonic(), 0.0)
+
+    def defer(self, host: str, retry_after: Optional[float]) -> float:
+        """ホストへのリクエストを指定秒数後まで止める（429・Retry-After受信時）"""
+        bucket = self._bucket(host)
+        delay = min(
+            HOST_DEFAULT_BACKOFF if retry_after is None else retry_after,
+            HOST_MAX_RETRY_AFTER,
+        )
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+        bucket.stats["deferred"] += 1
+        logger.warning(
+            f"配信元からの要求により{delay:.0f}秒間リクエストを止めます: {host}"
+        )
+        return delay
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ホストごとの待ち行列の深さや許可数を取得"""
+        return {host: bucket.to_dict() for host, bucket in self._buckets.items()}
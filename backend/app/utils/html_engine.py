@@ -0,0 +1,240 @@
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from app.config import HTML_PARSER_BACKEND
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoupのget_text()が既定で対象とする文字列の型
+TEXT_TYPES = Tag.DEFAULT_INTERESTING_STRING_TYPES
+
+
+class HtmlEngine:
+    """本文・メタデータの抽出で使うHTMLの木構造の操作
+
+    抽出処理は木の実装に依存しないよう、ここで定義した操作だけを使う。
+    ノードは各実装の要素をそのまま扱い、ラップしない。
+    """
+
+    name = ""
+
+    def parse(self, html: str) -> Any:
+        """HTMLを解析し、文書全体を表すノードを返す"""
+        raise NotImplementedError
+
+    def find_all(self, node: Any, tags: Optional[Iterable[str]] = None) -> List[Any]:
+        """子孫要素を文書順に取得（tagsを省略した場合はすべての要素）"""
+        raise NotImplementedError
+
+    def find(
+        self, node: Any, tag: str, attrs: Optional[Dict[str, str]] = None
+    ) -> Optional[Any]:
+        """タグ名と属性値が一致する最初の子孫要素を取得"""
+        raise NotImplementedError
+
+    def compile(self, selector: str) -> Any:
+        """CSSセレクタを事前に解析（select()にはこの結果も渡せる）"""
+        raise NotImplementedError
+
+    def select(self, node: Any, selector: Any) -> List[Any]:
+        """CSSセレクタに一致する子孫要素を文書順に取得"""
+        raise NotImplementedError
+
+    def select_one(self, node: Any, selector: Any) -> Optional[Any]:
+        """CSSセレクタに一致する最初の子孫要素を取得"""
+        found = self.select(node, selector)
+        return found[0] if found else None
+
+    def get_text(self, node: Any) -> str:
+        """要素内のテキストを連結して取得（コメントは含まない）"""
+        raise NotImplementedError
+
+    def children(self, node: Any) -> Iterator[Any]:
+        """子要素と、get_text()の対象となる直下のテキスト（str）を文書順に取得"""
+        raise NotImplementedError
+
+    def tag_name(self, node: Any) -> str:
+        """要素のタグ名"""
+        raise NotImplementedError
+
+    def get_attr(self, node: Any, name: str, default: str = "") -> str:
+        """属性値を取得"""
+        raise NotImplementedError
+
+    def remove(self, node: Any) -> None:
+        """要素を子孫ごと削除（後続のテキストは残す）"""
+        raise NotImplementedError
+
+    def remove_tags(self, node: Any, tags: Iterable[str]) -> None:
+        """指定したタグの要素をすべて削除"""
+        for element in self.find_all(node, tags):
+            self.remove(element)
+
+
+class SoupEngine(HtmlEngine):
+    """BeautifulSoup（html.parser）による実装
+
+    追加の依存がなく、どの環境でも動作する。
+    """
+
+    name = "html.parser"
+
+    def parse(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, "html.parser")
+
+    def find_all(self, node, tags=None):
+        return node.find_all(list(tags) if tags is not None else True)
+
+    def find(self, node, tag, attrs=None):
+        return node.find(tag, attrs=attrs or {})
+
+    def compile(self, selector):
+        return soupsieve.compile(selector)
+
+    def select(self, node, selector):
+        if isinstance(selector, str):
+            selector = self.compile(selector)
+        return selector.select(node)
+
+    def select_one(self, node, selector):
+        if isinstance(selector, str):
+            selector = self.compile(selector)
+        return selector.select_one(node)
+
+    def get_text(self, node):
+        return node.get_text()
+
+    def children(self, node):
+        for child in node.contents:
+            if isinstance(child, Tag):
+                yield child
+            # get_text()と同様に、コメントやルビ（rt）などの文字列は含めない
+            elif type(child) in TEXT_TYPES:
+                yield child
+
+    def tag_name(self, node):
+        return node.name
+
+    def get_attr(self, node, name, default=""):
+        return node.get(name, default)
+
+    def remove(self, node):
+        node.decompose()
+
+
+class LxmlEngine(HtmlEngine):
+    """lxml（libxml2）による実装
+
+    解析と木の走査がCで行われるため、大きなページではhtml.parserより大幅に速い。
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        self._parser = lxml.html.HTMLParser(encoding="utf-8")
+        self._selectors: Dict[str, Any] = {}
+
+    def parse(self, html: str) -> Any:
+        # XML宣言付きの文字列はlxmlが受け付けないため、UTF-8のバイト列で渡す
+        root = etree.fromstring(html.encode("utf-8", "replace"), self._parser)
+        if root is None:
+            # 空の文書
+            root = lxml.html.Element("html")
+        # 文書全体（ルート要素自身も検索対象に含める）
+        return root.getroottree()
+
+    def find_all(self, node, tags=None):
+        tags = tuple(tags) if tags is not None else (etree.Element,)
+        if isinstance(node, etree._ElementTree):
+            return list(node.iter(*tags))
+        return list(node.iterdescendants(*tags))
+
+    def find(self, node, tag, attrs=None):
+        for element in self.find_all(node, (tag,)):
+            if not attrs or all(
+                element.get(key) == value for key, value in attrs.items()
+            ):
+                return element
+        return None
+
+    def compile(self, selector):
+        compiled = self._selectors.get(selector)
+        if compiled is None:
+            compiled = CSSSelector(selector)
+            self._selectors[selector] = compiled
+        return compiled
+
+    def select(self, node, selector):
+        if isinstance(selector, str):
+            selector = self.compile(selector)
+        found = selector(node)
+        if isinstance(node, etree._ElementTree):
+            return found
+        # BeautifulSoupと同様に、要素自身は含めない
+        return [element for element in found if element is not node]
+
+    def get_text(self, node):
+        return "".join(node.itertext())
+
+    def children(self, node):
+        if isinstance(node, etree._ElementTree):
+            yield node.getroot()
+            return
+        if node.text:
+            yield node.text
+        for child in node:
+            # コメントなどは本文に含めず、後続のテキストだけを使う
+            if isinstance(child.tag, str):
+                yield child
+            if child.tail:
+                yield child.tail
+
+    def tag_name(self, node):
+        return node.tag
+
+    def get_attr(self, node, name, default=""):
+        return node.get(name, default)
+
+    def remove(self, node):
+        if node.getparent() is not None:
+            node.drop_tree()
+
+
+ENGINES = {SoupEngine.name: SoupEngine}
+if HAS_LXML:
+    ENGINES[LxmlEngine.name] = LxmlEngine
+
+# 名前ごとに1つだけ作って使い回す
+_engine_instances: Dict[str, HtmlEngine] = {}
+
+
+def get_engine(name: Optional[str] = None) -> HtmlEngine:
+    """HTMLエンジンを取得
+
+    "auto"の場合はlxmlが使えればlxml、なければhtml.parserを使う。
+    指定したエンジンが使えない場合もhtml.parserにフォールバックする。
+    """
+    name = (name or HTML_PARSER_BACKEND).lower()
+    if name == "auto":
+        name = LxmlEngine.name if HAS_LXML else SoupEngine.name
+    if name not in ENGINES:
+        logger.warning(f"HTMLパーサー {name} は使えないため html.parser を使います")
+        name = SoupEngine.name
+    engine = _engine_instances.get(name)
+    if engine is None:
+        engine = ENGINES[name]()
+        _engine_instances[name] = engine
+    return engine
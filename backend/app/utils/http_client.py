@@ -0,0 +1,365 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+import aiohttp
+from aiohttp.http_parser import HAS_BROTLI
+
+from app.config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_TOTAL_TIMEOUT,
+)
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.dns_cache import CachingResolver
+from app.utils.hedging import HedgePolicy
+from app.utils.host_limiter import HostLimiter, host_of, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# brotliが使える場合は要求に含める（aiohttpの既定はgzip, deflateのみ）
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+# 本文を読み込む単位（バイト）
+READ_CHUNK_SIZE = 16 * 1024
+
+# シングルトンパターンによるクライアントインスタンスの管理
+_http_client_instance = None
+
+
+class HttpClient:
+    """外部へのHTTPリクエストで共有するaiohttpセッション
+
+    接続プールを共有することで、同じホストへの2回目以降のリクエストは
+    TCP・TLSのハンドシェイクを省略できる。起動時に開き終了時に閉じるが、
+    lifespanが無効な環境（Lambda）のため初回利用時にも開く。
+    リクエストはrequest()を通し、配信元ホストごとの遮断・流量制限に従わせる。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _http_client_instance
+        if _http_client_instance is None:
+            _http_client_instance = cls()
+        return _http_client_instance
+
+    def __init__(
+        self,
+        limit: int = HTTP_POOL_LIMIT,
+        limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+        timeout: aiohttp.ClientTimeout = None,
+        limiter: HostLimiter = None,
+        breaker: CircuitBreaker = None,
+        hedging: HedgePolicy = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout or aiohttp.ClientTimeout(
+            total=HTTP_TOTAL_TIMEOUT, sock_connect=HTTP_CONNECT_TIMEOUT
+        )
+        self.limiter = limiter or HostLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedging = hedging or HedgePolicy()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.resolver: Optional[CachingResolver] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 送信してから応答を解放するまでのリクエスト数
+        self._in_flight = 0
+        self.stats = {"requests": 0, "max_in_flight": 0}
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """共有セッションを取得（未作成・終了済みの場合は作成）
+
+        以前と異なるイベントループから呼ばれた場合は、前のループで作った
+        セッションとリゾルバを閉じてから作り直す。
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not None and self._loop is not loop:
+            self._close_stale()
+        if self._session is None or self._session.closed:
+            if self.resolver is None:
+                self.resolver = CachingResolver()
+            self._session = aiohttp.ClientSession(
+                connector=self._create_connector(),
+                timeout=self.timeout,
+                headers={"Accept-Encoding": ACCEPT_ENCODING},
+            )
+            self._loop = loop
+            logger.info("共有HTTPセッションを作成しました")
+        return self._session
+
+    def _close_stale(self) -> None:
+        """前のイベントループで作ったセッションとリゾルバを閉じる"""
+        session, resolver, loop = self._session, self.resolver, self._loop
+        self._session = None
+        self.resolver = None
+        self._loop = None
+        if loop.is_running():
+            # 他のスレッドで動いているループでは、そのループ上で閉じる
+            asyncio.run_coroutine_threadsafe(self._close(session, resolver), loop)
+            return
+        # 止まったループの接続は待たずに閉じる（閉じたループのトランスポートは無効）。
+        # 接続を閉じる処理は同期的に終わるため、待たずに一度だけ進める
+        try:
+            if session is not None and not session.closed:
+                closing = session.close()
+                try:
+                    closing.send(None)
+                except StopIteration:
+                    pass
+                else:
+                    closing.close()
+            if resolver is not None:
+                resolver.cancel()
+        except RuntimeError as e:
+            logger.debug(f"前のイベントループの接続を閉じられませんでした: {e}")
+        logger.info("前のイベントループで作った共有HTTPセッションを閉じました")
+
+    def _create_connector(self) -> aiohttp.BaseConnector:
+        """接続プールを作成"""
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            # 名前解決のキャッシュはTTLを扱えるリゾルバ側で行う
+            resolver=self.resolver,
+            use_dns_cache=False,
+        )
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        max_wait: Optional[float] = None,
+        hedge: bool = False,
+        **kwargs: Any,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """ホストごとのサーキットブレーカーと流量制限に従ってリクエストを送信
+
+        遮断中のホストにはCircuitOpenErrorを、許可を待つ時間がmax_waitを
+        超える見込みの場合はHostThrottledErrorを送出する。
+        429・503でRetry-Afterを受け取った場合は、以降のリクエストをその時刻まで止める。
+        接続エラー・タイムアウト・5xxはサーキットブレーカーに失敗として、
+        2xx・3xxは成功として記録し、4xxはどちらにも数えない。
+        hedgeを指定した冪等なリクエストは、応答が遅い場合に追加のリクエストを送る。
+        """
+        host = host_of(url)
+        self.breaker.before_request(host)
+        status = None
+        started = time.monotonic()
+        try:
+            await self.limiter.acquire(host, max_wait)
+            started = time.monotonic()
+            self._in_flight += 1
+            self.stats["requests"] += 1
+            self.stats["max_in_flight"] = max(
+                self.stats["max_in_flight"], self._in_flight
+            )
+            try:
+                response = await self._send(host, method, url, hedge, **kwargs)
+            except BaseException:
+                self._in_flight -= 1
+                raise
+            try:
+                status = response.status
+                if status == 429 or (
+                    status == 503 and "Retry-After" in response.headers
+                ):
+                    self.limiter.defer(
+                        host, parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                yield response
+            finally:
+                response.release()
+                self._in_flight -= 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if (
+                isinstance(e, aiohttp.ClientResponseError)
+                and status is not None
+                and status < 500
+            ):
+                # 呼び出し側のraise_for_status()による4xxは、ホストの状態を表さないため
+                # 成功にも失敗にも数えない（1件の存在しないフィードで他のフィードを止めない）
+                self.breaker.release(host)
+                raise
+            self.breaker.record(
+                host, False, time.monotonic() - started, str(e) or e.__class__.__name__
+            )
+            raise
+        except BaseException:
+            # 呼び出し側の都合による中断は、5xxを受け取った場合を除き結果に数えない
+            if status is not None and status >= 500:
+                self.breaker.record(
+                    host, False, time.monotonic() - started, f"HTTP {status}"
+                )
+            else:
+                self.breaker.release(host)
+            raise
+
+        if status >= 500:
+            self.breaker.record(
+                host, False, time.monotonic() - started, f"HTTP {status}"
+            )
+        elif status < 400:
+            self.breaker.record(host, True, time.monotonic() - started)
+        else:
+            self.breaker.release(host)
+
+    async def _send(
+        self, host: str, method: str, url: str, hedge: bool, **kwargs: Any
+    ) -> aiohttp.ClientResponse:
+        """リクエストを送り、ヘッダーを受信した応答を返す"""
+        session = self.get_session()
+        delay = self.hedging.delay_for(host) if hedge else None
+        started = time.monotonic()
+        if delay is None:
+            response = await session.request(method, url, **kwargs)
+            self.hedging.observe(host, time.monotonic() - started)
+            return response
+
+        primary = asyncio.ensure_future(session.request(method, url, **kwargs))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # 予算や流量制限に余裕がなければ、最初のリクエストの応答を待つ
+            if not done and self.limiter.try_acquire(host) and self.hedging.try_spend():
+                logger.info(
+                    f"応答が{delay:.2f}秒を超えたため追加のリクエストを送ります: {url}"
+                )
+                hedge_started = time.monotonic()
+                tasks.add(asyncio.ensure_future(session.request(method, url, **kwargs)))
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    response = task.result()
+                    if task is primary:
+                        self.hedging.observe(host, time.monotonic() - started)
+                    else:
+                        self.hedging.stats["hedge_won"] += 1
+                        self.hedging.observe(host, time.monotonic() - hedge_started)
+                    # 同時に応答した他方は使わずに閉じる
+                    for other in done - {task}:
+                        _discard(other)
+                    return response
+            raise error
+        finally:
+            for task in tasks:
+                _discard(task)
+
+    def get(self, url: str, **kwargs: Any):
+        """GETリクエストを送信（request()の省略形）"""
+        return self.request("GET", url, **kwargs)
+
+    async def open(self) -> None:
+        """セッションを開く"""
+        self.get_session()
+
+    async def close(self) -> None:
+        """セッションを閉じ、プール中の接続を解放"""
+        session, resolver = self._session, self.resolver
+        self._session = None
+        self.resolver = None
+        self._loop = None
+        await self._close(session, resolver)
+
+    @staticmethod
+    async def _close(
+        session: Optional[aiohttp.ClientSession],
+        resolver: Optional[CachingResolver],
+    ) -> None:
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info("共有HTTPセッションを閉じました")
+        if resolver is not None:
+            await resolver.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """接続プールの状態を取得"""
+        if self._session is None or self._session.closed:
+            return {
+                "open": False,
+                "in_flight": self._in_flight,
+                **self.stats,
+                "hosts": self.limiter.get_stats(),
+                "hedging": self.hedging.get_stats(),
+            }
+        # 接続数はaiohttpの内部に依存しないよう、送信中のリクエスト数で代える
+        return {
+            "open": True,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "in_flight": self._in_flight,
+            **self.stats,
+            "dns": self.resolver.get_stats(),
+            "hosts": self.limiter.get_stats(),
+            "hedging": self.hedging.get_stats(),
+        }
+
+
+def _discard(task: asyncio.Future) -> None:
+    """使わなかったリクエストを取り消し、受信済みの応答は接続ごと閉じる"""
+
+    def close(finished: asyncio.Future) -> None:
+        if not finished.cancelled() and finished.exception() is None:
+            finished.result().close()
+
+    task.cancel()
+    task.add_done_callback(close)
+
+
+async def read_prefix(
+    response: aiohttp.ClientResponse,
+    max_bytes: int,
+    stop_marker: Optional[bytes] = None,
+) -> Tuple[bytes, bool]:
+    """本文を先頭から読み、stop_markerの出現かmax_bytesで打ち切る
+
+    stop_markerは大文字・小文字を区別しない。戻り値は読み込んだ本文と、
+    本文を最後まで読んだかどうか。途中で打ち切った接続はプールに戻さず閉じられる。
+    """
+    marker = stop_marker.lower() if stop_marker else None
+    buffer = bytearray()
+    while len(buffer) < max_bytes:
+        chunk = await response.content.read(
+            min(READ_CHUNK_SIZE, max_bytes - len(buffer))
+        )
+        if not chunk:
+            return bytes(buffer), True
+        # チャンクの境界をまたぐマーカーも見つけられるよう少し手前から探す
+        search_from = max(len(buffer) - len(marker) + 1, 0) if marker else 0
+        buffer.extend(chunk)
+        if marker and buffer[search_from:].lower().find(marker) != -1:
+            break
+    return bytes(buffer), response.content.at_eof()
+
+
+async def read_until(
+    response: aiohttp.ClientResponse, consume: Callable[[bytes], bool]
+) -> Tuple[bytes, bool]:
+    """本文を先頭から読み、チャンクごとにconsumeを呼んでTrueが返ったら打ち切る
+
+    戻り値は読み込んだ本文と、本文を最後まで読んだかどうか。
+    途中で打ち切った接続はプールに戻さず閉じられる。
+    """
+    buffer = bytearray()
+    while True:
+        chunk = await response.content.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return bytes(buffer), True
+        buffer.extend(chunk)
+        if consume(chunk):
+            return bytes(buffer), response.content.at_eof()
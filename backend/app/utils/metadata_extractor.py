@@ -1,6 +1,7 @@
-from bs4 import BeautifulSoup
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from app.utils.html_engine import HtmlEngine, get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -8,44 +9,68 @@ logger = logging.getLogger(__name__)
 class MetadataExtractor:
     """HTMLからメタデータを抽出するユーティリティクラス"""
 
-    def __init__(self):
-        pass
+    # 抽出結果のキャッシュのキーに含める版（抽出結果が変わる変更をしたら上げる）
+    VERSION = "1"
+
+    def __init__(self, engine: Optional[HtmlEngine] = None):
+        # HTMLの解析に使うエンジン（既定は設定に従いlxml、なければhtml.parser）
+        self.engine = engine or get_engine()
+
+    def has_head_metadata(self, metadata: Dict[str, Any]) -> bool:
+        """<head>だけで主要なメタデータ（タイトル・説明・画像）が揃ったかどうか"""
+        return all(metadata.get(key) for key in ("title", "description", "image"))
+
+    def _find_first(self, root: Any, candidates: List[Dict[str, str]]) -> Optional[Any]:
+        """候補の属性を優先順に試し、最初に見つかったmetaタグを取得"""
+        for attrs in candidates:
+            element = self.engine.find(root, "meta", attrs)
+            if element is not None:
+                return element
+        return None
 
     def extract_metadata(self, html: str, url: str) -> Dict[str, Any]:
         """HTMLからメタデータを抽出する"""
         try:
-            soup = BeautifulSoup(html, "html.parser")
+            engine = self.engine
+            root = engine.parse(html)
             metadata: Dict[str, Any] = {}
 
             # タイトルの抽出（優先順位: OGP > Twitter Cards > HTMLタイトル）
-            metadata["title"] = soup.find("meta", property="og:title") or soup.find(
-                "meta", attrs={"name": "twitter:title"}
+            title_meta = self._find_first(
+                root, [{"property": "og:title"}, {"name": "twitter:title"}]
             )
-            if metadata["title"]:
-                metadata["title"] = metadata["title"].get("content", "")
+            if title_meta is not None:
+                metadata["title"] = engine.get_attr(title_meta, "content")
             else:
-                title_tag = soup.find("title")
-                metadata["title"] = title_tag.get_text() if title_tag else ""
+                title_tag = engine.find(root, "title")
+                metadata["title"] = (
+                    engine.get_text(title_tag) if title_tag is not None else ""
+                )
 
             # 説明の抽出
-            metadata["description"] = (
-                soup.find("meta", property="og:description")
-                or soup.find("meta", attrs={"name": "twitter:description"})
-                or soup.find("meta", attrs={"name": "description"})
+            description_meta = self._find_first(
+                root,
+                [
+                    {"property": "og:description"},
+                    {"name": "twitter:description"},
+                    {"name": "description"},
+                ],
             )
-            if metadata["description"]:
-                metadata["description"] = metadata["description"].get("content", "")
+            if description_meta is not None:
+                metadata["description"] = engine.get_attr(description_meta, "content")
             else:
                 # 説明がない場合は、最初の段落を使用
-                first_p = soup.find("p")
-                metadata["description"] = first_p.get_text() if first_p else ""
+                first_p = engine.find(root, "p")
+                metadata["description"] = (
+                    engine.get_text(first_p) if first_p is not None else ""
+                )
 
             # 画像の抽出
-            metadata["image"] = soup.find("meta", property="og:image") or soup.find(
-                "meta", attrs={"name": "twitter:image"}
+            image_meta = self._find_first(
+                root, [{"property": "og:image"}, {"name": "twitter:image"}]
             )
-            if metadata["image"]:
-                metadata["image"] = metadata["image"].get("content", "")
+            if image_meta is not None:
+                metadata["image"] = engine.get_attr(image_meta, "content")
                 # 相対URLを絶対URLに変換
                 if metadata["image"] and not metadata["image"].startswith(
                     ("http://", "https://")
@@ -62,12 +87,14 @@ class MetadataExtractor:
                             metadata["image"] = f"{base_url}/{metadata['image']}"
             else:
                 # OGPやTwitter Cardsに画像がない場合は、最初の大きな画像を使用
-                images = soup.find_all("img")
+                metadata["image"] = None
+                images = engine.find_all(root, ["img"])
                 for img in images:
-                    if img.get("src") and (
-                        img.get("width", "0") > "200" or img.get("height", "0") > "200"
+                    if engine.get_attr(img, "src") and (
+                        engine.get_attr(img, "width", "0") > "200"
+                        or engine.get_attr(img, "height", "0") > "200"
                     ):
-                        img_src = img.get("src", "")
+                        img_src = engine.get_attr(img, "src")
                         # 相対URLを絶対URLに変換
                         if img_src and not img_src.startswith(("http://", "https://")):
                             base_url = "/".join(url.split("/")[:3])
@@ -83,9 +110,9 @@ class MetadataExtractor:
                         break
 
             # キーワード/カテゴリの抽出
-            keywords_meta = soup.find("meta", attrs={"name": "keywords"})
-            if keywords_meta:
-                keywords = keywords_meta.get("content", "")
+            keywords_meta = engine.find(root, "meta", {"name": "keywords"})
+            if keywords_meta is not None:
+                keywords = engine.get_attr(keywords_meta, "content")
                 metadata["keywords"] = [
                     k.strip() for k in keywords.split(",") if k.strip()
                 ]
@@ -104,9 +131,9 @@ class MetadataExtractor:
                     "#keywords",
                 ]
                 for selector in category_selectors:
-                    elements = soup.select(selector)
+                    elements = engine.select(root, selector)
                     for el in elements:
-                        cat_text = el.get_text().strip()
+                        cat_text = engine.get_text(el).strip()
                         if cat_text and len(cat_text) < 30:  # 長すぎるものは除外
                             categories.append(cat_text)
 
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """同じキーへの同時呼び出しを1回の実行にまとめるクラス
+
+    実行中のキーに対する呼び出しは新たに処理を始めず、
+    実行中の処理の結果（または例外）を共有する。
+    処理はタスクとして実行されるため、最初の呼び出し元が
+    キャンセルされても待機中の呼び出し元には影響しない。
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.stats = {"originated": 0, "coalesced": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """キーごとに1回だけfnを実行し、その結果を返す"""
+        task = self._calls.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            logger.debug(f"実行中の処理に合流します: {key}")
+        else:
+            self.stats["originated"] += 1
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        """処理完了時に登録を解除"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 呼び出し元が全てキャンセルされた場合も例外を回収しておく
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        """実行中の処理数"""
+        return len(self._calls)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import SITE_RULES_FILE
+from app.utils.host_limiter import host_of
+from app.utils.html_engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+# シングルトンパターンによるレジストリインスタンスの管理
+_site_rules_instance = None
+
+# 組み込みのサイト別ルール（SITE_RULES_FILEと同じ形式）
+DEFAULT_SITE_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "hatena",
+        "domains": [
+            "hatenablog.com",
+            "hatenablog.jp",
+            "hateblo.jp",
+            "hatenadiary.com",
+            "hatenadiary.jp",
+            "hatena.ne.jp",
+        ],
+        "content": [".entry-content"],
+        "noise": [".table-of-contents", ".hatena-star-container"],
+    },
+    {
+        "name": "aws",
+        "domains": ["aws.amazon.com"],
+        "content": [".blog-post"],
+    },
+    {
+        "name": "azure",
+        "domains": ["azure.microsoft.com"],
+        "content": [".blog-content"],
+    },
+]
+
+
+class SiteRule:
+    """サイトごとの本文抽出ルール
+
+    content: 本文の要素を探すCSSセレクタ（先に一致したものを使う）
+    noise: 本文から取り除く要素のCSSセレクタ（共通のノイズタグに加えて削除する）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        domains: Iterable[str],
+        content: Iterable[str],
+        noise: Iterable[str] = (),
+    ):
+        self.name = name
+        self.domains = [domain.strip().lower().lstrip(".") for domain in domains]
+        self.content = list(content)
+        self.noise = list(noise)
+        # 抽出結果のキャッシュのキーに含める、セレクタの内容を表す値
+        self.fingerprint = hashlib.sha256(
+            json.dumps([self.content, self.noise]).encode("utf-8")
+        ).hexdigest()[:16]
+        # エンジンごとに解析済みのセレクタ
+        self._compiled: Dict[str, Tuple[List[Any], List[Any]]] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SiteRule":
+        """設定ファイルの1件からルールを作成（不正な場合はValueError）"""
+        domains = data.get("domains") or []
+        content = data.get("content") or []
+        if not domains or not content:
+            raise ValueError("domains and content are required")
+        noise = data.get("noise") or []
+        if not all(isinstance(v, str) for v in [*domains, *content, *noise]):
+            raise ValueError("domains, content and noise must be strings")
+        return cls(data.get("name") or domains[0], domains, content, noise)
+
+    def compiled(self, engine: Any) -> Tuple[List[Any], List[Any]]:
+        """HTMLエンジン向けに解析した (本文のセレクタ, ノイズのセレクタ)"""
+        compiled = self._compiled.get(engine.name)
+        if compiled is None:
+            compiled = (
+                [engine.compile(selector) for selector in self.content],
+                [engine.compile(selector) for selector in self.noise],
+            )
+            self._compiled[engine.name] = compiled
+        return compiled
+
+
+class SiteRuleRegistry:
+    """ドメインで引けるサイト別ルールの一覧
+
+    ルールは登録したドメイン（サブドメインを含む）に適用する。
+    URLのホスト名をドットの位置で短くしながら辞書を引くため、
+    登録数によらずホスト名のラベル数の回数で見つかる。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _site_rules_instance
+        if _site_rules_instance is None:
+            _site_rules_instance = cls()
+        return _site_rules_instance
+
+    def __init__(self, rules_file: str = SITE_RULES_FILE):
+        self._rules: Dict[str, SiteRule] = {}
+        for data in DEFAULT_SITE_RULES:
+            self.register(SiteRule.from_dict(data))
+        if rules_file:
+            self.load_file(rules_file)
+
+    def register(self, rule: SiteRule) -> None:
+        """ルールを登録（同じドメインのルールは置き換える）"""
+        for domain in rule.domains:
+            self._rules[domain] = rule
+
+    def load_file(self, path: str) -> int:
+        """JSONファイルからルールを読み込み、登録した件数を返す
+
+        形式は {"sites": [{"name": ..., "domains": [...], "content": [...],
+        "noise": [...]}, ...]}。不正なルールは警告して読み飛ばす。
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                sites = json.load(f).get("sites", [])
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error(f"サイト別ルールを読み込めません ({path}): {str(e)}")
+            return 0
+
+        loaded = 0
+        for data in sites:
+            try:
+                rule = SiteRule.from_dict(data)
+                # セレクタの誤りは抽出時ではなく読み込み時に検出する
+                rule.compiled(get_engine())
+            except Exception as e:
+                logger.warning(f"サイト別ルールの指定が不正です: {data} ({str(e)})")
+                continue
+            self.register(rule)
+            loaded += 1
+        logger.info(f"サイト別ルールを読み込みました: {loaded}件 ({path})")
+        return loaded
+
+    def lookup(self, url: str) -> Optional[SiteRule]:
+        """URLに適用するルールを取得（なければNone）"""
+        host = host_of(url)
+        while host:
+            rule = self._rules.get(host)
+            if rule is not None:
+                return rule
+            _, _, host = host.partition(".")
+        return None
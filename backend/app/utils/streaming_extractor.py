@@ -0,0 +1,412 @@
+import codecs
+import logging
+import re
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import (
+    STREAMING_EXTRACTION_MAX_BYTES,
+    STREAMING_EXTRACTION_MAX_SECONDS,
+    STREAMING_EXTRACTION_PROBE_BYTES,
+)
+from app.utils.charset import SNIFF_BYTES, detect_charset
+from app.utils.content_extractor import (
+    EMPTY_TEXT,
+    WHITESPACE_PATTERN,
+    ContentExtractor,
+    TextSummary,
+    join_text,
+    summarize_text,
+)
+from app.utils.html_engine import HAS_LXML, get_engine
+from app.utils.site_rules import SiteRuleRegistry
+
+if HAS_LXML:
+    from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# 終了タグを持たない要素（標準ライブラリのパーサーは終了を通知しない）
+VOID_TAGS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+# 受信しながら判定できる単純なセレクタ（tag / .class / #id とその組み合わせ）
+SIMPLE_SELECTOR_PATTERN = re.compile(r"^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$")
+# 段落として本文の候補に数える最短の文字数（全体を解析する場合のフォールバックと同じ）
+MIN_PARAGRAPH_LENGTH = 50
+# 本文の要素が見つかったとみなす文字数（全体を解析する場合のセレクタによる抽出と同じ）
+MIN_CONTAINER_LENGTH = 200
+
+# 単純なセレクタの解析結果: (タグ名, id, クラス名の集合)
+SimpleSelector = Tuple[Optional[str], Optional[str], frozenset]
+
+
+def parse_simple_selector(selector: str) -> Optional[SimpleSelector]:
+    """単純なセレクタを解析（子孫の指定や属性の条件などを含む場合はNone）"""
+    match = SIMPLE_SELECTOR_PATTERN.match(selector.strip())
+    if match is None:
+        return None
+    tag, rest = match.groups()
+    element_id, classes = None, set()
+    for part in re.findall(r"[.#][\w-]+", rest):
+        if part[0] == "#":
+            element_id = part[1:]
+        else:
+            classes.add(part[1:])
+    return (tag.lower() if tag else None, element_id, frozenset(classes))
+
+
+def matches(selector: SimpleSelector, tag: str, attrib: Dict[str, str]) -> bool:
+    """要素が単純なセレクタに一致するかどうか"""
+    selector_tag, element_id, classes = selector
+    if selector_tag is not None and selector_tag != tag:
+        return False
+    if element_id is not None and attrib.get("id") != element_id:
+        return False
+    return not classes or classes <= set((attrib.get("class") or "").split())
+
+
+class _Element:
+    """開いている要素（本文の候補となる要素ならテキストを集める）"""
+
+    __slots__ = (
+        "tag",
+        "noise",
+        "priority",
+        "order",
+        "parts",
+        "summary",
+        "paragraphs",
+        "length",
+    )
+
+    def __init__(self, tag: str, noise: bool, priority: Optional[int], order: int):
+        self.tag = tag
+        self.noise = noise
+        # 文書中での開始の順序
+        self.order = order
+        # 一致したセレクタの順位（小さいほど優先）と、集めたテキストとその要約
+        self.priority = priority
+        self.parts: Optional[List[str]] = [] if priority is not None else None
+        self.summary: TextSummary = EMPTY_TEXT
+        # 直下にある段落のテキストとその合計の長さ
+        self.paragraphs: List[str] = []
+        self.length = 0
+
+    def text_length(self) -> int:
+        return self.summary[0] + self.summary[1]
+
+
+class _StdlibTokenizer(HTMLParser):
+    """標準ライブラリのパーサーの通知を、lxmlのtargetと同じ形で渡す"""
+
+    def __init__(self, target: "StreamingContentExtractor"):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.target.start(tag, {name: value or "" for name, value in attrs})
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        self.handle_starttag(tag, attrs)
+        self.target.end(tag)
+
+    def handle_endtag(self, tag: str):
+        self.target.end(tag)
+
+    def handle_data(self, data: str):
+        self.target.data(data)
+
+
+class StreamingContentExtractor:
+    """記事ページを受信しながら本文を抽出する
+
+    受信したチャンクを順にデコードしてHTMLのトークナイザーに渡し、木を作らずに
+    本文らしい要素（サイト別ルールまたは既定のセレクタに一致する要素、なければ
+    段落を最も多く含む要素）のテキストを集める。要約に使う文字数（budget）が
+    集まった時点、またはサイト別ルールの最も優先度の高いセレクタに一致した要素が
+    閉じた時点で完了とし、以降の受信と解析を打ち切れるようにする。
+    サイト別ルールの他のセレクタに一致した要素は保留し、本文の終わり
+    （finish_input()）で優先度の最も高いものに決める。
+
+    完了しないまま本文が終わった場合は、全体を受信してからContentExtractorで
+    抽出する（短いページでは結果が変わらない）。既定のセレクタで早期に打ち切った
+    場合は、後に続く優先度の高い要素を見ないため、全体を解析した結果と一致しない
+    場合がある。
+
+    解析はイベントループ上で行うため、解析したバイト数（max_bytes）か合計の
+    解析時間（max_seconds）が上限を超えた場合、または<body>の開始から
+    probe_bytesを解析しても本文の候補がない場合は、受信しながらの抽出をやめる。
+    以降のチャンクは解析しない。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        budget: int,
+        charset: Optional[str] = None,
+        max_bytes: int = STREAMING_EXTRACTION_MAX_BYTES,
+        max_seconds: float = STREAMING_EXTRACTION_MAX_SECONDS,
+        probe_bytes: int = STREAMING_EXTRACTION_PROBE_BYTES,
+        engine_name: Optional[str] = None,
+        site_rules: Optional[SiteRuleRegistry] = None,
+    ):
+        self.budget = budget
+        self.header_charset = charset
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.probe_bytes = probe_bytes
+        self.engine_name = engine_name or get_engine().name
+        extractor = ContentExtractor(get_engine(self.engine_name), site_rules)
+        self.noise_tags = extractor.noise_tags
+
+        self.text: Optional[str] = None
+        self.done = False
+        # 受信しながらの抽出をやめたかどうか（全体を受信してから抽出する）
+        self.abandoned = False
+        self.bytes_fed = 0
+        # イベントループ上で解析に使った合計秒数
+        self.parse_seconds = 0.0
+
+        # サイト別ルールがあればそのセレクタ、なければ既定のセレクタで本文の要素を探す
+        rule = extractor.site_rules.lookup(url)
+        self.has_rule = rule is not None
+        content = rule.content if rule is not None else extractor.default_selectors
+        noise = rule.noise if rule is not None else []
+        self.selectors = [parse_simple_selector(s) for s in content]
+        self.noise_selectors = [parse_simple_selector(s) for s in noise]
+        if None in self.selectors or None in self.noise_selectors:
+            # 受信しながら判定できないセレクタを含む場合は最初から全体の抽出に任せる
+            self.abandoned = True
+
+        self._stack: List[_Element] = []
+        self._opened = 0
+        # 閉じたサイト別ルールの要素のうち最も優先度の高いもの: (順位, 開始の順序, テキスト)
+        self._rule_best: Optional[Tuple[int, int, str]] = None
+        self._noise = 0
+        self._containers: List[_Element] = []
+        self._paragraph: Optional[List[str]] = None
+        # 既定のセレクタで十分な長さの要素が見つかった場合は段落による判定をしない
+        self._found_container = False
+        # <body>の開始位置（解析済みのバイト数）と、本文の候補が見つかったかどうか
+        self._body_offset: Optional[int] = None
+        self._candidate_seen = False
+        self._head = bytearray()
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._tokenizer: Any = None
+
+    def _create_tokenizer(self) -> Any:
+        if self.engine_name == "lxml" and HAS_LXML:
+            return etree.HTMLParser(target=self)
+        return _StdlibTokenizer(self)
+
+    def feed(self, chunk: bytes) -> bool:
+        """受信したチャンクを解析し、本文が揃ったかどうかを返す"""
+        if self.done or self.abandoned:
+            return self.done
+        self.bytes_fed += len(chunk)
+        if not self._parse(chunk, final=False):
+            return False
+
+        if not self.done and (
+            self.bytes_fed >= self.max_bytes
+            or self.parse_seconds >= self.max_seconds
+            or (
+                not self._candidate_seen
+                and self._body_offset is not None
+                and self.bytes_fed - self._body_offset >= self.probe_bytes
+            )
+        ):
+            # 長いページや本文の見つからないページの解析でイベントループを止め続けない
+            self.abandoned = True
+        return self.done
+
+    def finish_input(self) -> bool:
+        """本文を最後まで渡した後に呼び、本文が揃ったかどうかを返す
+
+        閉じていない要素を閉じ、保留していたサイト別ルールの要素から本文を決める。
+        """
+        if self.done or self.abandoned:
+            return self.done
+        if not self._parse(b"", final=True):
+            return False
+        while self._stack and not self.done:
+            self._close(self._stack.pop())
+        if not self.done and self._rule_best is not None and self._rule_best[2]:
+            self._finish(self._rule_best[2])
+        return self.done
+
+    def _parse(self, chunk: bytes, final: bool) -> bool:
+        """チャンクをデコードしてトークナイザーに渡す（失敗した場合はFalse）"""
+        started = time.perf_counter()
+        try:
+            if self._decoder is None:
+                # 文字コードの宣言を探せるだけの先頭部分が届くまで待つ
+                self._head.extend(chunk)
+                if len(self._head) < SNIFF_BYTES and not final:
+                    return True
+                chunk, self._head = bytes(self._head), bytearray()
+                charset, _ = detect_charset(chunk, self.header_charset, partial=True)
+                self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+                self._tokenizer = self._create_tokenizer()
+            self._tokenizer.feed(self._decoder.decode(chunk, final))
+            if final:
+                self._tokenizer.close()
+        except Exception as e:
+            logger.warning(f"受信しながらの本文抽出を中止しました: {str(e)}")
+            self.abandoned = True
+            return False
+        finally:
+            self.parse_seconds += time.perf_counter() - started
+        return True
+
+    def _finish(self, text: str) -> None:
+        if self.abandoned:
+            return
+        self.text = text
+        self.done = True
+
+    # 以下はトークナイザーから呼ばれる（lxmlのtargetと同じ形）
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self.done:
+            return
+        if tag in VOID_TAGS:
+            return
+        if tag == "body" and self._body_offset is None:
+            self._body_offset = self.bytes_fed
+        if tag == "p" and self._stack and self._stack[-1].tag == "p":
+            # 閉じられていない段落は次の段落の開始で閉じる
+            self.end("p")
+
+        noise = self._noise > 0
+        if not noise and (
+            tag in self.noise_tags
+            or any(matches(s, tag, attrib) for s in self.noise_selectors)
+        ):
+            noise = True
+        priority = None
+        if not noise:
+            priority = next(
+                (i for i, s in enumerate(self.selectors) if matches(s, tag, attrib)),
+                None,
+            )
+
+        element = _Element(tag, noise and self._noise == 0, priority, self._opened)
+        self._opened += 1
+        if element.noise:
+            self._noise += 1
+        if priority is not None:
+            self._containers.append(element)
+            self._candidate_seen = True
+        if tag == "p" and not noise:
+            self._paragraph = []
+        self._stack.append(element)
+
+    def end(self, tag: str) -> None:
+        if self.done:
+            return
+        # 閉じ忘れた子要素があれば一緒に閉じる（対応する開始タグがなければ無視する）
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index and not self.done:
+            self._close(self._stack.pop())
+
+    def data(self, text: str) -> None:
+        if self.done or self._noise:
+            return
+        if self._containers:
+            summary = summarize_text(text)
+            for element in self._containers:
+                element.parts.append(text)
+                element.summary = join_text(element.summary, summary)
+            if self._containers[0].text_length() >= self.budget:
+                # 外側の要素ほどテキストが長いため、最も外側の要素で判定し、
+                # 開いている要素のうち優先度の高いセレクタに一致したものを使う
+                candidates = [
+                    element
+                    for element in self._containers
+                    if element.text_length() > MIN_CONTAINER_LENGTH
+                    or element is self._containers[0]
+                ]
+                best = min(candidates, key=lambda element: element.priority)
+                # サイト別ルールでは最も優先度の高いセレクタの要素でなければ確定しない
+                if not self.has_rule or best.priority == 0:
+                    self._finish(self._clean("".join(best.parts)))
+                    return
+        if self._paragraph is not None:
+            self._paragraph.append(text)
+
+    def close(self) -> None:
+        """lxmlのtargetとして必要（本文の終わりでは呼ばない）"""
+        return None
+
+    def _clean(self, text: str) -> str:
+        return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+    def _close_rule_element(self, element: _Element, text: str) -> None:
+        """サイト別ルールの要素が閉じたときの処理
+
+        全体を解析する場合と同じく、優先度の最も高いセレクタに一致した要素のうち
+        文書中で最初のものを本文とする。最も優先度の高いセレクタの要素が閉じた
+        時点で本文が確定し、それ以外は本文の終わりまで保留する。
+        """
+        candidate = (element.priority, element.order, text)
+        if self._rule_best is None or candidate[:2] < self._rule_best[:2]:
+            self._rule_best = candidate
+        if element.priority != 0 or any(c.priority == 0 for c in self._containers):
+            # 外側に同じセレクタの要素が開いていれば、そちらが文書中で先になる
+            return
+        if text:
+            self._finish(text)
+        else:
+            # 本文が空の場合は全体を解析した抽出（テキスト密度など）に任せる
+            self.abandoned = True
+
+    def _close(self, element: _Element) -> None:
+        """要素が閉じたときの処理"""
+        if element.noise:
+            self._noise -= 1
+
+        if element.parts is not None:
+            self._containers.remove(element)
+            text = self._clean("".join(element.parts))
+            if self.has_rule:
+                self._close_rule_element(element, text)
+                return
+            if len(text) > MIN_CONTAINER_LENGTH:
+                self._found_container = True
+
+        if element.tag == "p" and self._paragraph is not None:
+            text = self._clean("".join(self._paragraph))
+            self._paragraph = None
+            if (
+                len(text) > MIN_PARAGRAPH_LENGTH
+                and self._stack
+                and not self._found_container
+                and not self.has_rule
+            ):
+                # 段落のテキストを親要素に積み上げ、最も多く含む要素を本文とみなす
+                parent = self._stack[-1]
+                self._candidate_seen = True
+                parent.paragraphs.append(text)
+                parent.length += len(text) + 1
+                if parent.length >= self.budget:
+                    self._finish("\n".join(parent.paragraphs))
@@ -18,12 +18,14 @@ class ArticleSummarizer:
         # クライアントの初期化方法を修正
         self.client = AsyncOpenAI(api_key=api_key)
         self.max_tokens = 4096  # GPT-3.5-turboの入力制限
+        # 要約に使う本文の文字数（日本語の場合、1文字≒2トークンと仮定）
+        self.max_input_chars = self.max_tokens * 2
         self.summary_length = 200  # 要約の目標文字数
 
     def _truncate_text(self, text: str) -> str:
         """トークン制限に収まるようにテキストを切り詰める"""
         # 簡易的な実装として文字数で制限（実際はトークン数で制限すべき）
-        return text[: self.max_tokens * 2]  # 日本語の場合、1文字≒2トークンと仮定
+        return text[: self.max_input_chars]
 
     @retry(
         stop=stop_after_attempt(3),  # 3回まで再試行
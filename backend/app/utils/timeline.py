@@ -0,0 +1,221 @@
+import heapq
+import json
+import secrets
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.config import TIMELINE_SNAPSHOT_MAX_ENTRIES, TIMELINE_SNAPSHOT_TTL
+from app.utils.feed_parser import parse_date
+
+# 並び順のキー（公開日時, リンク）。どちらも降順で並べる
+SortKey = Tuple[str, str]
+# マージ元: (フィード情報, 新しい順に並んだ記事リスト)のリスト
+Sources = List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]
+
+# シングルトンパターンによるスナップショットの管理
+_timeline_snapshots_instance = None
+
+
+def entry_sort_key(entry: Dict[str, Any]) -> SortKey:
+    """記事の並び順のキーを取得"""
+    return (entry.get("published", ""), entry.get("link", ""))
+
+
+def sort_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """記事を新しい順に並べ替える（フィード取得時に一度だけ行う）"""
+    return sorted(entries, key=entry_sort_key, reverse=True)
+
+
+def normalize_since(since: Optional[str]) -> Optional[str]:
+    """sinceパラメータを記事の公開日時と比較できる形式に正規化"""
+    if not since:
+        return None
+    parsed = parse_date(since)
+    if parsed is None:
+        raise ValueError("sinceの日時形式が不正です")
+    return parsed.isoformat()
+
+
+def iter_new_entries(
+    entries: Iterable[Dict[str, Any]],
+    since: Optional[str] = None,
+    known_guids: Optional[Set[str]] = None,
+    since_link: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """新しい順に並んだ記事から、since以降かつ未取得の記事だけを返す
+
+    sinceと同じ公開日時の記事は、後から追加されたものを取りこぼさないよう含める。
+    ただし前回の最新記事 (since, since_link) そのものは除く。
+    sinceより古い記事に達した時点で打ち切るため、
+    処理量はフィード全体ではなく新着記事の件数に比例する。
+    """
+    for entry in entries:
+        if since:
+            published = entry.get("published", "")
+            if published < since:
+                break
+            if published == since and entry.get("link", "") == since_link:
+                continue
+        if known_guids and entry.get("guid") in known_guids:
+            continue
+        yield entry
+
+
+def watermark(entries: List[Dict[str, Any]]) -> Optional[str]:
+    """次回のsinceに使う、最新記事の公開日時"""
+    return entries[0].get("published") if entries else None
+
+
+def watermark_link(entries: List[Dict[str, Any]]) -> Optional[str]:
+    """次回のsince_linkに使う、最新記事のリンク"""
+    return entries[0].get("link") if entries else None
+
+
+def newest_key(entry_lists: Iterable[List[Dict[str, Any]]]) -> Optional[SortKey]:
+    """新しい順に並んだ記事リストのうち、最も新しい記事の並び順のキー"""
+    return max(
+        (entry_sort_key(entries[0]) for entries in entry_lists if entries),
+        default=None,
+    )
+
+
+def encode_cursor(key: SortKey, snapshot_id: Optional[str] = None) -> str:
+    """ページ位置（とマージ元のスナップショット）を不透明なカーソル文字列に変換"""
+    values = [*key, snapshot_id] if snapshot_id else list(key)
+    raw = json.dumps(values, ensure_ascii=False).encode("utf-8")
+    return urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor_values(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise ValueError("不正なカーソルです") from e
+    if not isinstance(values, list) or len(values) not in (2, 3):
+        raise ValueError("不正なカーソルです")
+    return values
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """カーソル文字列をページ位置に戻す"""
+    published, link = _decode_cursor_values(cursor)[:2]
+    return (str(published), str(link))
+
+
+def cursor_snapshot_id(cursor: str) -> Optional[str]:
+    """カーソルに含まれるマージ元のスナップショットのID（なければNone）"""
+    values = _decode_cursor_values(cursor)
+    return str(values[2]) if len(values) == 3 else None
+
+
+def _start_index(entries: List[Dict[str, Any]], after: SortKey) -> int:
+    """降順のリストでカーソルより後ろ（古い）最初の位置を二分探索"""
+    low, high = 0, len(entries)
+    while low < high:
+        mid = (low + high) // 2
+        if entry_sort_key(entries[mid]) < after:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def merge_timeline(
+    sources: Sources,
+    limit: int,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    known_guids: Optional[Set[str]] = None,
+    snapshot_id: Optional[str] = None,
+    since_link: Optional[str] = None,
+) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], Optional[str]]:
+    """新しい順に並んだフィードごとの記事をk-wayマージして1ページ分を返す
+
+    sourcesは(フィード情報, 新しい順に並んだ記事リスト)のリスト。
+    戻り値は(フィード情報, 記事)のリストと次ページのカーソル。
+    since / since_link / known_guidsを指定すると新着記事だけを対象にする。
+    snapshot_idは次ページのカーソルに含め、次ページを同じマージ元から返せるようにする。
+    マージはヒープで遅延評価されるため、ページの深さに関わらず
+    全記事を並べ替えることはない。
+    """
+    after = decode_cursor(cursor) if cursor else None
+
+    def iterate(
+        feed: Dict[str, Any], entries: List[Dict[str, Any]]
+    ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        start = _start_index(entries, after) if after else 0
+        for entry in iter_new_entries(
+            islice(entries, start, None), since, known_guids, since_link
+        ):
+            yield feed, entry
+
+    merged = heapq.merge(
+        *(iterate(feed, entries) for feed, entries in sources),
+        key=lambda item: entry_sort_key(item[1]),
+        reverse=True,
+    )
+    page = list(islice(merged, limit + 1))
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(entry_sort_key(page[-1][1]), snapshot_id)
+    return page, next_cursor
+
+
+class TimelineSnapshots:
+    """タイムラインのマージ元をカーソルの続きのために短時間保持する（LRU）
+
+    1ページ目で取得したフィードごとの記事リスト（キャッシュ済みのリストへの参照）と
+    取得エラーを保持し、2ページ目以降はフィードを取得し直さずに同じマージ元から返す。
+    他のワーカーや期限切れでスナップショットがない場合は取得し直す。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _timeline_snapshots_instance
+        if _timeline_snapshots_instance is None:
+            _timeline_snapshots_instance = cls()
+        return _timeline_snapshots_instance
+
+    def __init__(
+        self,
+        max_entries: int = TIMELINE_SNAPSHOT_MAX_ENTRIES,
+        ttl: float = TIMELINE_SNAPSHOT_TTL,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def new_id() -> str:
+        return secrets.token_urlsafe(12)
+
+    def put(self, snapshot_id: str, owner: Any, snapshot: Dict[str, Any]) -> None:
+        """マージ元を保存（ownerは取得したユーザーで、他のユーザーには返さない）"""
+        self._entries[snapshot_id] = (time.monotonic() + self.ttl, owner, snapshot)
+        self._entries.move_to_end(snapshot_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, snapshot_id: Optional[str], owner: Any) -> Optional[Dict[str, Any]]:
+        """保存したマージ元を取得（期限切れ・他のユーザーのものはNone）"""
+        if not snapshot_id:
+            return None
+        item = self._entries.get(snapshot_id)
+        if item is None:
+            return None
+        expires_at, snapshot_owner, snapshot = item
+        if expires_at <= time.monotonic():
+            del self._entries[snapshot_id]
+            return None
+        if snapshot_owner != owner:
+            return None
+        self._entries.move_to_end(snapshot_id)
+        return snapshot
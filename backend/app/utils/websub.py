@@ -0,0 +1,334 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from app.config import (
+    WEBSUB_CALLBACK_BASE_URL,
+    WEBSUB_LEASE_SECONDS,
+    WEBSUB_RENEW_MARGIN,
+)
+from app.dynamodb.repositories.websub import get_websub_repository
+from app.utils.feed_fetcher import FeedFetcher
+from app.utils.feed_parser import parse_feed_bytes
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.host_limiter import HostThrottledError
+from app.utils.http_client import HttpClient
+
+logger = logging.getLogger(__name__)
+
+# コールバックのパス（APIルーターのプレフィックスを含む）
+CALLBACK_PATH = "/api/v1/feeds/websub/callback"
+# 購読要求への応答がないまま再要求するまでの秒数
+PENDING_RETRY_SECONDS = 3600
+# X-Hub-Signatureで使われるハッシュアルゴリズム
+SIGNATURE_ALGORITHMS = {
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha384": hashlib.sha384,
+    "sha512": hashlib.sha512,
+}
+
+# シングルトンパターンによるマネージャーインスタンスの管理
+_websub_manager_instance = None
+
+
+def subscription_key(feed_url: str) -> str:
+    """購読の保存に使うキー（フィードURLのハッシュ）"""
+    return hashlib.sha256(feed_url.encode("utf-8")).hexdigest()[:32]
+
+
+class WebSubSubscription:
+    """ハブへの購読の状態"""
+
+    def __init__(self, feed_url: str, topic: str, hub: str):
+        self.feed_url = feed_url
+        self.topic = topic
+        self.hub = hub
+        self.key = subscription_key(feed_url)
+        # コールバックURLに含めるID（保存先のキーと推測困難なトークン）
+        self.callback_id = f"{self.key}.{secrets.token_urlsafe(24)}"
+        self.secret = secrets.token_hex(32)
+        self.state = "pending"
+        self.requested_at = 0.0
+        self.lease_expires_at: Optional[float] = None
+
+    @classmethod
+    def from_record(cls, data: Dict[str, Any]) -> "WebSubSubscription":
+        subscription = cls(data["feed_url"], data["topic"], data["hub"])
+        subscription.callback_id = data["callback_id"]
+        subscription.secret = data["secret"]
+        subscription.state = data["state"]
+        subscription.requested_at = data.get("requested_at") or 0.0
+        subscription.lease_expires_at = data.get("lease_expires_at")
+        return subscription
+
+    def to_record(self) -> Dict[str, Any]:
+        """保存用の値（秘密鍵を含む）"""
+        return {
+            "id": self.key,
+            "feed_url": self.feed_url,
+            "topic": self.topic,
+            "hub": self.hub,
+            "callback_id": self.callback_id,
+            "secret": self.secret,
+            "state": self.state,
+            "requested_at": self.requested_at,
+            "lease_expires_at": self.lease_expires_at,
+        }
+
+    @property
+    def callback_url(self) -> str:
+        return f"{WEBSUB_CALLBACK_BASE_URL}{CALLBACK_PATH}/{self.callback_id}"
+
+    def is_active(self) -> bool:
+        """検証済みでリース期間内かどうか"""
+        return (
+            self.state == "verified"
+            and self.lease_expires_at is not None
+            and self.lease_expires_at > time.time()
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "feed_url": self.feed_url,
+            "topic": self.topic,
+            "hub": self.hub,
+            "state": self.state,
+            "lease_expires_at": self.lease_expires_at,
+        }
+
+
+class WebSubManager:
+    """WebSubのハブ購読・検証・配信受信を管理するクラス
+
+    購読が有効なフィードはプッシュで更新され、定期取得は
+    安全策として最大間隔まで延ばされる。リースが切れた場合や
+    検証されなかった場合は通常の定期取得に戻る。
+
+    ハブからの検証・配信はどのワーカーにも届くため、購読はリポジトリに保存し、
+    手元にない購読はコールバックIDに含まれるキーで読み込む。
+    """
+
+    @classmethod
+    def get_instance(cls):
+        """シングルトンインスタンスを取得"""
+        global _websub_manager_instance
+        if _websub_manager_instance is None:
+            _websub_manager_instance = cls()
+        return _websub_manager_instance
+
+    def __init__(self, feed_fetcher: FeedFetcher = None, repository=None):
+        self.feed_fetcher = feed_fetcher or FeedFetcher.get_instance()
+        self.repository = repository or get_websub_repository()
+        self.enabled = bool(WEBSUB_CALLBACK_BASE_URL)
+        self._by_feed: Dict[str, WebSubSubscription] = {}
+        self._by_callback: Dict[str, WebSubSubscription] = {}
+        self.stats = {"received": 0, "rejected": 0, "verified": 0}
+
+    def is_active(self, feed_url: str) -> bool:
+        """フィードがプッシュで更新されているかどうか"""
+        subscription = self._by_feed.get(feed_url)
+        return subscription is not None and subscription.is_active()
+
+    def _remember(self, subscription: WebSubSubscription) -> None:
+        previous = self._by_feed.get(subscription.feed_url)
+        if previous is not None:
+            self._by_callback.pop(previous.callback_id, None)
+        self._by_feed[subscription.feed_url] = subscription
+        self._by_callback[subscription.callback_id] = subscription
+
+    async def _load(self, key: str) -> Optional[WebSubSubscription]:
+        """保存された購読を読み込む"""
+        data = await self.repository.get_subscription(key)
+        if data is None:
+            return None
+        subscription = WebSubSubscription.from_record(data)
+        self._remember(subscription)
+        return subscription
+
+    async def _save(self, subscription: WebSubSubscription) -> None:
+        await self.repository.save_subscription(subscription.to_record())
+
+    async def get_subscription(self, callback_id: str) -> Optional[WebSubSubscription]:
+        """コールバックIDから購読を取得（手元になければ保存先から読み込む）"""
+        subscription = self._by_callback.get(callback_id)
+        if subscription is None:
+            key = callback_id.partition(".")[0]
+            loaded = await self._load(key) if key else None
+            if loaded is None or not hmac.compare_digest(
+                loaded.callback_id, callback_id
+            ):
+                return None
+            subscription = loaded
+        return subscription
+
+    async def ensure_subscribed(self, feed_url: str, feed_info: Dict[str, Any]) -> None:
+        """ハブを告知しているフィードを未購読であれば購読する"""
+        hub = feed_info.get("hub")
+        if not self.enabled or not hub:
+            return
+
+        subscription = self._by_feed.get(feed_url)
+        if subscription is None or not subscription.is_active():
+            # 他のワーカーで検証された状態を反映する
+            try:
+                loaded = await self._load(subscription_key(feed_url))
+            except Exception as e:
+                logger.warning(f"WebSubの購読を読み込めませんでした ({feed_url}): {e}")
+                loaded = None
+            subscription = loaded or subscription
+        if subscription is not None and (
+            subscription.is_active()
+            or time.time() - subscription.requested_at < PENDING_RETRY_SECONDS
+        ):
+            return
+
+        topic = feed_info.get("url") or feed_url
+        if subscription is None or subscription.hub != hub:
+            subscription = WebSubSubscription(feed_url, topic, hub)
+            self._remember(subscription)
+        await self._request(subscription, "subscribe")
+
+    async def renew_expiring(self) -> None:
+        """リース期限が近い購読を更新"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        for subscription in list(self._by_feed.values()):
+            if (
+                subscription.state == "verified"
+                and subscription.lease_expires_at is not None
+                and subscription.lease_expires_at - now < WEBSUB_RENEW_MARGIN
+                and now - subscription.requested_at >= WEBSUB_RENEW_MARGIN
+            ):
+                await self._request(subscription, "subscribe")
+
+    async def unsubscribe(self, feed_url: str) -> None:
+        """購読を解除"""
+        subscription = self._by_feed.get(feed_url)
+        if subscription is not None:
+            await self._request(subscription, "unsubscribe")
+
+    async def _request(self, subscription: WebSubSubscription, mode: str) -> None:
+        """ハブに購読・解除を要求（検証はコールバックで非同期に行われる）"""
+        subscription.requested_at = time.time()
+        # 検証は他のワーカーに届くこともあるため、要求する前に保存する
+        try:
+            await self._save(subscription)
+        except Exception as e:
+            logger.warning(f"WebSubの購読を保存できないため要求を見送ります: {e}")
+            return
+        form = {
+            "hub.mode": mode,
+            "hub.topic": subscription.topic,
+            "hub.callback": subscription.callback_url,
+            "hub.lease_seconds": str(WEBSUB_LEASE_SECONDS),
+            "hub.secret": subscription.secret,
+        }
+        try:
+            http_client = HttpClient.get_instance()
+            async with http_client.request(
+                "POST", subscription.hub, data=form
+            ) as response:
+                if response.status >= 300:
+                    body = await response.text()
+                    logger.warning(
+                        f"WebSubハブが要求を拒否しました ({subscription.hub}): "
+                        f"{response.status} {body[:200]}"
+                    )
+                    return
+            logger.info(f"WebSub {mode} を要求しました: {subscription.topic}")
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            HostThrottledError,
+            CircuitOpenError,
+        ) as e:
+            logger.warning(
+                f"WebSubハブへの要求に失敗しました ({subscription.hub}): {e}"
+            )
+
+    async def verify(
+        self,
+        callback_id: str,
+        mode: str,
+        topic: str,
+        challenge: str,
+        lease_seconds: Optional[int] = None,
+    ) -> Optional[str]:
+        """ハブからの検証要求に応答（不一致の場合はNone）"""
+        subscription = await self.get_subscription(callback_id)
+        if subscription is None or topic != subscription.topic:
+            return None
+
+        if mode == "denied":
+            subscription.state = "denied"
+            await self._save(subscription)
+            logger.warning(f"WebSubの購読が拒否されました: {topic}")
+            return ""
+
+        if mode == "subscribe":
+            subscription.state = "verified"
+            subscription.lease_expires_at = time.time() + (
+                lease_seconds or WEBSUB_LEASE_SECONDS
+            )
+            await self._save(subscription)
+            self.stats["verified"] += 1
+            logger.info(f"WebSubの購読が検証されました: {topic}")
+            return challenge
+
+        if mode == "unsubscribe":
+            self._by_callback.pop(callback_id, None)
+            self._by_feed.pop(subscription.feed_url, None)
+            await self.repository.delete_subscription(subscription.key)
+            logger.info(f"WebSubの購読を解除しました: {topic}")
+            return challenge
+
+        return None
+
+    async def receive(
+        self,
+        subscription: WebSubSubscription,
+        body: bytes,
+        signature: Optional[str],
+        encoding: Optional[str] = None,
+    ) -> bool:
+        """配信されたコンテンツを取り込む（署名が不正な場合は解析せずに破棄してFalse）"""
+        if not self._verify_signature(subscription.secret, body, signature):
+            self.stats["rejected"] += 1
+            logger.warning(f"WebSub配信の署名が一致しません: {subscription.topic}")
+            return False
+
+        data = parse_feed_bytes(body, encoding)
+        count = await self.feed_fetcher.ingest_pushed(subscription.feed_url, data)
+        self.stats["received"] += 1
+        logger.info(f"WebSubで{count}件の記事を受信しました: {subscription.topic}")
+        return True
+
+    def _verify_signature(
+        self, secret: str, body: bytes, signature: Optional[str]
+    ) -> bool:
+        """X-Hub-Signatureヘッダーを検証"""
+        if not signature or "=" not in signature:
+            return False
+        method, _, received = signature.partition("=")
+        algorithm = SIGNATURE_ALGORITHMS.get(method.lower())
+        if algorithm is None:
+            return False
+        expected = hmac.new(secret.encode("utf-8"), body, algorithm).hexdigest()
+        return hmac.compare_digest(expected, received.strip().lower())
+
+    def get_subscriptions(self) -> Dict[str, Any]:
+        """購読状態の一覧を取得"""
+        return {
+            "enabled": self.enabled,
+            "subscriptions": [s.to_dict() for s in self._by_feed.values()],
+            **self.stats,
+        }
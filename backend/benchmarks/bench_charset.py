@@ -0,0 +1,132 @@
+"""日本語ページの文字コード判定と圧縮転送の計測
+
+Shift_JIS / EUC-JP / UTF-8 の日本語ページを生成し、
+従来の response.text() 相当（Content-Typeがなければ統計的推定）と
+decode_body（ヘッダー > BOM > meta > UTF-8 > 統計的推定）の
+デコード時間と正答率、gzip・brotliでの転送量を比較する。
+
+実行方法（backendディレクトリで実行）:
+    python -m benchmarks.bench_charset --pages 60 --paragraphs 40
+"""
+
+import argparse
+import gzip
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+from charset_normalizer import detect
+
+from app.utils.charset import decode_body
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ["shift_jis", "euc-jp", "utf-8"]
+# 判定の手がかりの与え方（Content-Type / metaタグ / なし）
+DECLARATIONS = ["header", "meta", "none"]
+WORDS = (
+    "記事 東京 経済 技術 発表 開発者 新しい サービス について しました です。 ます。 "
+    "情報 日本 市場 テクノロジー クラウド データ 利用者 ニュース 、 。"
+).split()
+
+# 1ページ分: (本文のバイト列, Content-Typeのcharset, 元の文字列)
+Page = Tuple[bytes, Optional[str], str]
+
+
+def build_page(
+    rng: random.Random, encoding: str, declaration: str, paragraphs: int
+) -> Page:
+    """日本語のHTMLページを生成"""
+    meta = f'<meta charset="{encoding}">' if declaration == "meta" else ""
+    body = "".join(
+        f"<p>{''.join(rng.choice(WORDS) for _ in range(60))}</p>"
+        for _ in range(paragraphs)
+    )
+    html = (
+        f"<!DOCTYPE html><html><head>{meta}<title>ベンチマーク記事</title>"
+        f'<meta property="og:title" content="日本語の記事タイトル"></head>'
+        f"<body>{body}</body></html>"
+    )
+    header = encoding if declaration == "header" else None
+    return html.encode(encoding), header, html
+
+
+def legacy_decode(body: bytes, header_charset: Optional[str]) -> str:
+    """従来のresponse.text()相当（ヘッダーがなければ本文全体から統計的に推定）"""
+    encoding = header_charset or detect(body)["encoding"] or "utf-8"
+    return body.decode(encoding)
+
+
+def run(
+    name: str, decode: Callable[[bytes, Optional[str]], str], pages: List[Page]
+) -> None:
+    """全ページをデコードし、所要時間と正しく復元できた割合を表示"""
+    correct = 0
+    start = time.perf_counter()
+    for body, header, original in pages:
+        try:
+            correct += decode(body, header) == original
+        except (UnicodeDecodeError, LookupError):
+            pass
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {name:<14} {elapsed * 1000 / len(pages):8.3f}ms/page "
+        f"correct={correct}/{len(pages)}"
+    )
+
+
+def report_compression(pages: List[Page]) -> None:
+    """gzip・brotliでの転送量と展開時間を表示"""
+    raw = sum(len(body) for body, _, _ in pages)
+    codecs = [("gzip", lambda b: gzip.compress(b, 6), gzip.decompress)]
+    if brotli is not None:
+        codecs.append(
+            ("br", lambda b: brotli.compress(b, quality=5), brotli.decompress)
+        )
+    print(f"  {'identity':<14} {raw / 1024:10.1f}KiB")
+    for name, compress, decompress in codecs:
+        compressed = [compress(body) for body, _, _ in pages]
+        start = time.perf_counter()
+        for data in compressed:
+            decompress(data)
+        elapsed = time.perf_counter() - start
+        size = sum(len(data) for data in compressed)
+        print(
+            f"  {name:<14} {size / 1024:10.1f}KiB ({size / raw:5.1%}) "
+            f"decompress={elapsed * 1000 / len(pages):.3f}ms/page"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="文字コード判定と圧縮転送のベンチマーク"
+    )
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = {
+        (encoding, declaration): [
+            build_page(rng, encoding, declaration, args.paragraphs)
+            for _ in range(args.pages // (len(ENCODINGS) * len(DECLARATIONS)) or 1)
+        ]
+        for encoding in ENCODINGS
+        for declaration in DECLARATIONS
+    }
+
+    for (encoding, declaration), pages in corpus.items():
+        print(f"{encoding} / {declaration}")
+        run("response.text", legacy_decode, pages)
+        run("decode_body", decode_body, pages)
+
+    print("転送量")
+    report_compression([page for pages in corpus.values() for page in pages])
+
+
+if __name__ == "__main__":
+    main()
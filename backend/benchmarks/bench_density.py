@@ -0,0 +1,99 @@
+"""テキスト密度による本文抽出の計測（深い入れ子のページ）
+
+divを深く入れ子にしたページを生成し、要素ごとに子孫をたどり直す従来の方法と、
+木を1回たどるscore_densityによる方法で、extract_content_by_densityの
+1ページあたりの時間と結果の一致を比較する。
+
+実行方法（backendディレクトリで実行）:
+    python -m benchmarks.bench_density --depth 10 50 200 --pages 5
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Callable, List
+
+from app.utils.content_extractor import ContentExtractor
+from app.utils.html_engine import ENGINES, get_engine
+
+WORDS = (
+    "記事 東京 経済 技術 発表 開発者 新しい サービス について しました です。 ます。 "
+    "情報 日本 市場 テクノロジー クラウド データ 利用者 ニュース 、 。"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_page(rng: random.Random, depth: int, paragraphs: int) -> str:
+    """divをdepth段入れ子にし、各段に段落とリンクを置いたページを生成"""
+    parts = ["<html><head><title>bench</title></head><body>"]
+    for level in range(depth):
+        parts.append(f"<div class='level-{level}'>")
+        parts.append(f"<a href='/l/{level}'>{sentence(rng, 3)}</a>")
+        if level % 3 == 0:
+            parts.append(f"<section><p>{sentence(rng, 30)}</p></section>")
+    for i in range(paragraphs):
+        parts.append(
+            f"<p>{sentence(rng, 50)} <a href='/p/{i}'>{sentence(rng, 4)}</a>\n"
+            f"  <em>{sentence(rng, 5)}</em>&nbsp;{sentence(rng, 10)}</p>"
+        )
+    parts.append("</div>" * depth)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def legacy_extract(extractor: ContentExtractor, root: Any) -> List[str]:
+    """従来の実装（候補ごとに子孫をたどり直す）"""
+    engine = extractor.engine
+    candidates = []
+    for element in engine.find_all(root, ["p", "div", "section"]):
+        if engine.find_all(element, extractor.noise_tags):
+            continue
+        density = extractor.calculate_text_density(element)
+        text = extractor.clean_text(engine.get_text(element))
+        if density > 10 and len(text) > 100:
+            candidates.append({"text": text, "density": density})
+    candidates.sort(key=lambda x: x["density"], reverse=True)
+    return [c["text"] for c in candidates[:5]]
+
+
+def measure(func: Callable[[Any], List[str]], roots: List[Any]) -> tuple:
+    """全ページを処理し、1ページあたりのミリ秒と結果を返す"""
+    start = time.perf_counter()
+    results = [func(root) for root in roots]
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / len(roots), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="テキスト密度による本文抽出のベンチマーク"
+    )
+    parser.add_argument("--depth", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--paragraphs", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for depth in args.depth:
+        pages = [build_page(rng, depth, args.paragraphs) for _ in range(args.pages)]
+        print(f"depth={depth} paragraphs={args.paragraphs}")
+        for name in ENGINES:
+            extractor = ContentExtractor(get_engine(name))
+            roots = [extractor.engine.parse(page) for page in pages]
+            legacy_ms, expected = measure(
+                lambda root: legacy_extract(extractor, root), roots
+            )
+            single_ms, actual = measure(extractor.extract_content_by_density, roots)
+            same = sum(a == e for a, e in zip(actual, expected))
+            print(
+                f"  {name:<12} legacy={legacy_ms:9.2f}ms single-pass={single_ms:8.2f}ms "
+                f"({legacy_ms / single_ms:5.1f}x) same={same}/{len(pages)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
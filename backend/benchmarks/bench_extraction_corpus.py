@@ -0,0 +1,299 @@
+"""保存した記事ページによる本文・メタデータ抽出の速度と品質の計測
+
+benchmarks/corpus/ のコーパス（manifest.jsonに記事ページと期待する抽出結果を記載）を
+ネットワークを使わずに読み込み、抽出方法（content / streaming / metadata）と
+HTMLパーサーの組み合わせごとに、ページごとの処理時間・最大メモリ使用量・
+期待する結果との一致度を出力する。
+
+- 処理時間: デコードから抽出までの中央値（--repeat回）
+- メモリ: 抽出中に増えたRSSの最大値（Linuxのみ。確保済みの領域に収まる小さな
+  ページでは0になる）とPythonのヒープの最大値
+- 本文の一致度: 空白を除いた文字bigramのF1（日本語と英語を同じ方法で比較する）。
+  streamingは要約に使う文字数（--budget）までを比較する
+- メタデータの一致度: 期待する結果に書いた項目のうち一致した割合
+
+--output で結果をJSONに保存し、--baseline に以前の結果を渡すと差分を表示する。
+コーパスのページや期待する結果を変える場合は、比較できなくなるため新しい版の
+ディレクトリ（v2など）を作り、manifest.jsonのversionを上げる。
+
+実行方法（backendディレクトリで実行）:
+    python -m benchmarks.bench_extraction_corpus
+    python -m benchmarks.bench_extraction_corpus --output before.json
+    python -m benchmarks.bench_extraction_corpus --baseline before.json --engines lxml
+"""
+
+import argparse
+import gc
+import json
+import os
+import re
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.charset import decode_body
+from app.utils.content_extractor import ContentExtractor
+from app.utils.html_engine import ENGINES, get_engine
+from app.utils.http_client import READ_CHUNK_SIZE
+from app.utils.metadata_extractor import MetadataExtractor
+from app.utils.streaming_extractor import StreamingContentExtractor
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus", "v1")
+EXTRACTORS = ("content", "streaming", "metadata")
+# 要約に使う文字数（ArticleSummarizer.max_input_chars と同じ）
+DEFAULT_BUDGET = 4096 * 2
+# メタデータとして比較する項目
+METADATA_FIELDS = ("title", "description", "image", "keywords")
+# 差分として表示する一致度の変化の下限
+SCORE_TOLERANCE = 0.005
+
+
+def load_corpus(directory: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """コーパスを読み込み、(版, ページの一覧)を返す"""
+    with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages = []
+    for entry in manifest["pages"]:
+        with open(os.path.join(directory, entry["file"]), "rb") as f:
+            body = f.read()
+        with open(
+            os.path.join(directory, entry["expected"]["content"]), "r", encoding="utf-8"
+        ) as f:
+            content = f.read()
+        pages.append(
+            {
+                **entry,
+                "body": body,
+                "expected_content": content,
+                "expected_metadata": entry["expected"]["metadata"],
+            }
+        )
+    return manifest["version"], pages
+
+
+def bigrams(text: str) -> Counter:
+    text = re.sub(r"\s+", "", text)
+    return Counter(text[i : i + 2] for i in range(len(text) - 1))
+
+
+def text_overlap(actual: str, expected: str) -> Dict[str, float]:
+    """文字bigramによる適合率・再現率・F1"""
+    actual_grams, expected_grams = bigrams(actual), bigrams(expected)
+    overlap = sum((actual_grams & expected_grams).values())
+    precision = overlap / max(sum(actual_grams.values()), 1)
+    recall = overlap / max(sum(expected_grams.values()), 1)
+    f1 = 2 * precision * recall / (precision + recall) if overlap else 0.0
+    return {"precision": precision, "recall": recall, "score": f1}
+
+
+def metadata_match(actual: Dict[str, Any], expected: Dict[str, Any]) -> Dict[str, Any]:
+    """期待する項目のうち一致した割合と、一致しなかった項目"""
+    fields = [field for field in METADATA_FIELDS if field in expected]
+    missed = [field for field in fields if actual.get(field) != expected[field]]
+    score = (len(fields) - len(missed)) / len(fields) if fields else 1.0
+    return {"score": score, "missed": missed}
+
+
+def make_runner(extractor: str, engine_name: str, budget: int) -> Callable:
+    """ページを受け取り抽出結果を返す関数（本番と同じくデコードから行う）"""
+    engine = get_engine(engine_name)
+    content_extractor = ContentExtractor(engine)
+    metadata_extractor = MetadataExtractor(engine)
+
+    def content(page: Dict[str, Any]) -> str:
+        html = decode_body(page["body"], page["charset"])
+        return content_extractor.extract_main_content(html, page["url"])
+
+    def streaming(page: Dict[str, Any]) -> str:
+        # 要約のエンドポイントと同じく、揃わなければ全体を受信してから抽出する
+        extractor = StreamingContentExtractor(
+            page["url"], budget, page["charset"], engine_name=engine_name
+        )
+        body = page["body"]
+        for start in range(0, len(body), READ_CHUNK_SIZE):
+            if extractor.feed(body[start : start + READ_CHUNK_SIZE]):
+                return extractor.text
+        if extractor.finish_input():
+            return extractor.text
+        return content(page)
+
+    def metadata(page: Dict[str, Any]) -> Dict[str, Any]:
+        html = decode_body(page["body"], page["charset"])
+        return metadata_extractor.extract_metadata(html, page["url"])
+
+    return {"content": content, "streaming": streaming, "metadata": metadata}[extractor]
+
+
+def score(extractor: str, result: Any, page: Dict[str, Any], budget: int) -> Dict:
+    if extractor == "metadata":
+        return metadata_match(result, page["expected_metadata"])
+    expected = page["expected_content"]
+    if extractor == "streaming":
+        return text_overlap(result[:budget], expected[:budget])
+    return text_overlap(result, expected)
+
+
+def measure_time(func: Callable, page: Dict[str, Any], repeat: int) -> float:
+    """1回目を除いた処理時間の中央値（ミリ秒）"""
+    func(page)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(page)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def _proc_status(field: str) -> int:
+    with open("/proc/self/status", "r") as f:
+        return int(re.search(rf"{field}:\s+(\d+)", f.read()).group(1))
+
+
+def measure_rss(func: Callable, page: Dict[str, Any]) -> Optional[int]:
+    """抽出中に増えたRSSの最大値（KiB）。計測できない環境ではNone
+
+    lxmlの木のようにPythonのヒープ外で確保されるメモリも含めるため、
+    /proc/self/clear_refs で最大値をリセットしてからVmHWMを読む。
+    """
+    gc.collect()
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        before = _proc_status("VmRSS")
+    except (OSError, AttributeError):
+        return None
+    func(page)
+    return max(_proc_status("VmHWM") - before, 0)
+
+
+def measure_heap(func: Callable, page: Dict[str, Any]) -> int:
+    """抽出中のPythonのヒープの最大値（KiB）"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(page)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak // 1024
+
+
+def run(
+    extractor: str,
+    engine_name: str,
+    pages: List[Dict[str, Any]],
+    repeat: int,
+    budget: int,
+) -> Dict[str, Any]:
+    """抽出方法とHTMLパーサーの組み合わせ1つを計測"""
+    func = make_runner(extractor, engine_name, budget)
+    results = {}
+    for page in pages:
+        quality = score(extractor, func(page), page, budget)
+        results[page["id"]] = {
+            "ms": measure_time(func, page, repeat),
+            "rss_kib": measure_rss(func, page),
+            "heap_kib": measure_heap(func, page),
+            **quality,
+        }
+    rss = [r["rss_kib"] for r in results.values() if r["rss_kib"] is not None]
+    mean = {
+        "ms": statistics.mean(r["ms"] for r in results.values()),
+        "rss_kib": max(rss) if rss else None,
+        "heap_kib": max(r["heap_kib"] for r in results.values()),
+        "score": statistics.mean(r["score"] for r in results.values()),
+    }
+    return {"pages": results, "mean": mean}
+
+
+def format_row(label: str, result: Dict[str, Any]) -> str:
+    rss = "-" if result["rss_kib"] is None else f"{result['rss_kib']:,}"
+    row = (
+        f"  {label:<20} {result['ms']:8.2f}ms  rss={rss:>8}KiB "
+        f"heap={result['heap_kib']:>8,}KiB  score={result['score']:.3f}"
+    )
+    if "recall" in result:
+        row += f" (p={result['precision']:.3f} r={result['recall']:.3f})"
+    if result.get("missed"):
+        row += f" missed={','.join(result['missed'])}"
+    return row
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """以前の結果との差分を表示（両方で計測したページだけで比べる）"""
+    if baseline.get("corpus_version") != report["corpus_version"]:
+        print(
+            f"baseline is corpus v{baseline.get('corpus_version')}, "
+            f"not v{report['corpus_version']}; skipping comparison"
+        )
+        return
+    print("\ncompared with baseline")
+    for key, current in report["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        page_ids = [p for p in current["pages"] if p in previous["pages"]]
+        if not page_ids:
+            continue
+        before = [previous["pages"][p] for p in page_ids]
+        after = [current["pages"][p] for p in page_ids]
+        before_ms = statistics.mean(r["ms"] for r in before)
+        after_ms = statistics.mean(r["ms"] for r in after)
+        print(
+            f"  {key:<24} time {before_ms:8.2f}ms -> {after_ms:8.2f}ms "
+            f"({(after_ms / before_ms - 1) * 100:+6.1f}%)  "
+            f"score {statistics.mean(r['score'] for r in before):.3f} -> "
+            f"{statistics.mean(r['score'] for r in after):.3f}"
+        )
+        for page_id, old, new in zip(page_ids, before, after):
+            if abs(new["score"] - old["score"]) > SCORE_TOLERANCE:
+                print(
+                    f"    {page_id:<22} score {old['score']:.3f} -> {new['score']:.3f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="保存した記事ページによる抽出の速度と品質のベンチマーク"
+    )
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument(
+        "--extractors", nargs="+", choices=EXTRACTORS, default=list(EXTRACTORS)
+    )
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=None)
+    parser.add_argument("--pages", nargs="+", default=None, help="計測するページのID")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET)
+    parser.add_argument("--output", help="結果を保存するJSONファイル")
+    parser.add_argument("--baseline", help="比較する以前の結果のJSONファイル")
+    args = parser.parse_args()
+
+    version, pages = load_corpus(args.corpus)
+    if args.pages:
+        pages = [page for page in pages if page["id"] in args.pages]
+    size = sum(len(page["body"]) for page in pages)
+    print(f"corpus v{version}: {len(pages)} pages ({size / 1024:.0f}KiB)")
+
+    report: Dict[str, Any] = {"corpus_version": version, "results": {}}
+    for extractor in args.extractors:
+        for engine_name in args.engines or list(ENGINES):
+            key = f"{extractor}/{engine_name}"
+            result = run(extractor, engine_name, pages, args.repeat, args.budget)
+            report["results"][key] = result
+            print(key)
+            for page_id, page_result in result["pages"].items():
+                print(format_row(page_id, page_result))
+            print(format_row("mean (peak for memory)", result["mean"]))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""抽出処理のプロセスプールによるイベントループの遅延の計測
+
+大きな記事ページの本文抽出を同時に実行しながら、一定間隔で起きるタスクの
+遅れ（イベントループの遅延）を計測し、イベントループ上で抽出する従来の方法と
+ExtractionPoolのワーカーで抽出する方法を比較する。
+
+実行方法（backendディレクトリで実行）:
+    python -m benchmarks.bench_extraction_pool --jobs 40 --concurrency 8 --workers 0 2 4
+    HTML_PARSER_BACKEND=html.parser python -m benchmarks.bench_extraction_pool
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from app.utils.extraction_pool import ExtractionPool
+from benchmarks.bench_html_engine import build_page
+
+# 遅延を計測するタスクが起きる間隔（秒）
+PROBE_INTERVAL = 0.005
+
+
+async def probe(lags: List[float], stop: asyncio.Event) -> None:
+    """一定間隔で起き、予定時刻からの遅れを記録"""
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(time.perf_counter() - expected, 0.0))
+
+
+async def run(workers: int, pages: List[bytes], concurrency: int) -> None:
+    pool = ExtractionPool(workers=workers)
+    await pool.start()
+    semaphore = asyncio.Semaphore(concurrency)
+    url = "https://example.com/articles/1"
+
+    async def job(page: bytes) -> None:
+        async with semaphore:
+            await pool.extract_content(page, "utf-8", url)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(job(page) for page in pages))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await prober
+    await pool.close()
+
+    lags.sort()
+    print(
+        f"workers={workers:<3} total={elapsed * 1000:8.1f}ms "
+        f"({len(pages) / elapsed:6.1f} pages/s) "
+        f"loop_lag p50={lags[len(lags) // 2] * 1000:7.2f}ms "
+        f"p99={lags[int(len(lags) * 0.99)] * 1000:7.2f}ms "
+        f"max={lags[-1] * 1000:7.2f}ms"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    pages = [
+        build_page(rng, args.paragraphs, "density").encode("utf-8")
+        for _ in range(args.jobs)
+    ]
+    print(
+        f"jobs={args.jobs} concurrency={args.concurrency} "
+        f"page={len(pages[0]) / 1024:.0f}KiB"
+    )
+    for workers in args.workers:
+        await run(workers, pages, args.concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="抽出用プロセスプールのベンチマーク")
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--paragraphs", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
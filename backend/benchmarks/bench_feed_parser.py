@@ -0,0 +1,137 @@
+"""フィードパーサーのスループット計測
+
+記事数の多い RSS 2.0 / RSS 1.0(RDF) / Atom フィードを生成し、
+FeedParserでの解析時間とピークメモリを計測する。
+
+実行方法（backendディレクトリで実行）:
+    python -m benchmarks.bench_feed_parser --items 1000 5000 20000
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict
+
+from app.utils.feed_parser import FeedParser
+
+CHUNK_SIZE = 64 * 1024
+
+
+def build_rss2(items: int) -> bytes:
+    """RSS 2.0フィードを生成"""
+    now = datetime.now(timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">',
+        "<channel><title>ベンチマーク</title><link>https://example.com/</link>",
+        "<description>RSS 2.0</description>",
+    ]
+    for i in range(items):
+        published = (now - timedelta(minutes=i)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        parts.append(
+            f"<item><title>記事タイトル {i}</title>"
+            f"<link>https://example.com/articles/{i}</link>"
+            f"<guid>https://example.com/articles/{i}</guid>"
+            f"<description>&lt;p&gt;本文の概要 {i} です。&lt;/p&gt;</description>"
+            f"<pubDate>{published}</pubDate>"
+            f"<category>tech</category><category>news</category>"
+            f'<media:thumbnail url="https://example.com/images/{i}.png"/></item>'
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+def build_rdf(items: int) -> bytes:
+    """RSS 1.0(RDF)フィードを生成（はてなブックマーク形式、Shift_JIS）"""
+    now = datetime.now(timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="Shift_JIS"?>',
+        '<rdf:RDF xmlns="http://purl.org/rss/1.0/"'
+        ' xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"'
+        ' xmlns:dc="http://purl.org/dc/elements/1.1/"'
+        ' xmlns:hatena="http://www.hatena.ne.jp/info/xmlns#">',
+        '<channel rdf:about="https://example.com/rss"><title>ベンチマーク</title>',
+        "<link>https://example.com/</link><description>RSS 1.0</description>",
+        "</channel>",
+    ]
+    for i in range(items):
+        published = (now - timedelta(minutes=i)).isoformat()
+        parts.append(
+            f'<item rdf:about="https://example.com/entry/{i}">'
+            f"<title>はてな記事 {i}</title>"
+            f"<link>https://example.com/entry/{i}</link>"
+            f"<description>説明文 {i}</description>"
+            f"<dc:date>{published}</dc:date><dc:subject>テクノロジー</dc:subject>"
+            f"<hatena:imageurl>https://example.com/img/{i}.jpg</hatena:imageurl>"
+            "</item>"
+        )
+    parts.append("</rdf:RDF>")
+    return "".join(parts).encode("shift_jis")
+
+
+def build_atom(items: int) -> bytes:
+    """Atomフィードを生成"""
+    now = datetime.now(timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom"><title>ベンチマーク</title>',
+        '<link href="https://example.com/"/>',
+    ]
+    for i in range(items):
+        published = (now - timedelta(minutes=i)).isoformat()
+        parts.append(
+            f"<entry><title>Atom記事 {i}</title><id>tag:example.com,2024:{i}</id>"
+            f'<link rel="alternate" href="https://example.com/posts/{i}"/>'
+            f"<published>{published}</published><updated>{published}</updated>"
+            f'<summary>要約 {i}</summary><category term="azure"/></entry>'
+        )
+    parts.append("</feed>")
+    return "".join(parts).encode("utf-8")
+
+
+def run(name: str, body: bytes, repeat: int) -> None:
+    """チャンク単位で解析し、時間とメモリを表示"""
+    best = float("inf")
+    entries = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser = FeedParser()
+        for offset in range(0, len(body), CHUNK_SIZE):
+            parser.feed(body[offset : offset + CHUNK_SIZE])
+        entries = len(parser.close()["entries"])
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parser = FeedParser()
+    for offset in range(0, len(body), CHUNK_SIZE):
+        parser.feed(body[offset : offset + CHUNK_SIZE])
+    parser.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<6} items={entries:>6} size={len(body) / 1024:>8.1f}KB "
+        f"time={best * 1000:>8.1f}ms rate={entries / best:>10.0f} items/s "
+        f"peak={peak / 1024 / 1024:>6.1f}MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="フィードパーサーのベンチマーク")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    builders: Dict[str, Callable[[int], bytes]] = {
+        "rss2": build_rss2,
+        "rdf": build_rdf,
+        "atom": build_atom,
+    }
+    for items in args.items:
+        for name, builder in builders.items():
+            run(name, builder(items), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""HTMLパーサーのエンジンごとの本文・メタデータ抽出時間の計測
+
+ナビゲーションや関連記事、スクリプトを含む記事ページを生成し、
+エンジンごとに解析のみ・本文抽出（ContentExtractor）・メタデータ抽出
+（MetadataExtractor）の1ページあたりの時間と、html.parserとの結果の一致数を比較する。
+本文抽出は、セレクタで本文が見つかるページ（article）と
+テキスト密度で判定するページ（density）の両方を計測する。
+
+実行方法（backendディレクトリで実行）:
+    python -m benchmarks.bench_html_engine --paragraphs 20 200 1000 --pages 20
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from app.utils.content_extractor import ContentExtractor
+from app.utils.html_engine import ENGINES, get_engine
+from app.utils.metadata_extractor import MetadataExtractor
+
+WORDS = (
+    "記事 東京 経済 技術 発表 開発者 新しい サービス について しました です。 ます。 "
+    "情報 日本 市場 テクノロジー クラウド データ 利用者 ニュース 、 。"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return "".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_page(rng: random.Random, paragraphs: int, layout: str) -> str:
+    """記事ページを生成（layoutはarticleまたはdensity）"""
+    nav = "".join(f'<li><a href="/c/{i}">カテゴリ{i}</a></li>' for i in range(30))
+    related = "".join(
+        f'<li><a href="/a/{i}">{sentence(rng, 6)}</a></li>' for i in range(20)
+    )
+    body = "".join(
+        f"<p>{sentence(rng, 40)}<a href='/x/{i}'>{sentence(rng, 3)}</a>"
+        f"<em>{sentence(rng, 5)}</em>{sentence(rng, 20)}</p>"
+        + (
+            f"<!-- ad slot {i} --><div class='ad'>{sentence(rng, 4)}</div>"
+            if i % 7 == 0
+            else ""
+        )
+        for i in range(paragraphs)
+    )
+    if layout == "article":
+        main = f"<article><h1>{sentence(rng, 8)}</h1>{body}</article>"
+    else:
+        main = (
+            f"<div id='content'><div class='body'><h1>{sentence(rng, 8)}</h1>"
+            f"{body}</div></div>"
+        )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{sentence(rng, 8)}</title>"
+        f"<meta property='og:title' content='{sentence(rng, 8)}'>"
+        f"<meta name='description' content='{sentence(rng, 20)}'>"
+        "<meta property='og:image' content='/images/cover.png'>"
+        "<script>window.dataLayer = [];</script><style>p { margin: 0 }</style>"
+        "</head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"{main}"
+        f"<aside><ul>{related}</ul></aside>"
+        f"<div class='related'><ul>{related}</ul></div>"
+        f"<footer><p>{sentence(rng, 10)}</p></footer>"
+        "<script>console.log('bench')</script></body></html>"
+    )
+
+
+def measure(func: Callable[[str], object], pages: List[str]) -> tuple:
+    """全ページを処理し、1ページあたりのミリ秒と結果を返す"""
+    start = time.perf_counter()
+    results = [func(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / len(pages), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTMLパーサーのエンジンのベンチマーク")
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[20, 200, 1000])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    url = "https://example.com/articles/1"
+    for paragraphs in args.paragraphs:
+        for layout in ("article", "density"):
+            pages = [build_page(rng, paragraphs, layout) for _ in range(args.pages)]
+            size = sum(len(page.encode("utf-8")) for page in pages) / len(pages)
+            print(
+                f"paragraphs={paragraphs} layout={layout} ({size / 1024:.0f}KiB/page)"
+            )
+
+            baseline = None
+            for name in ENGINES:
+                engine = get_engine(name)
+                content_extractor = ContentExtractor(engine)
+                metadata_extractor = MetadataExtractor(engine)
+                parse_ms, _ = measure(engine.parse, pages)
+                content_ms, contents = measure(
+                    lambda page: content_extractor.extract_main_content(page, url),
+                    pages,
+                )
+                metadata_ms, metadata = measure(
+                    lambda page: metadata_extractor.extract_metadata(page, url), pages
+                )
+                if baseline is None:
+                    baseline = (contents, metadata)
+                same = sum(
+                    c == bc and m == bm
+                    for c, m, bc, bm in zip(contents, metadata, *baseline)
+                )
+                print(
+                    f"  {name:<12} parse={parse_ms:8.2f}ms content={content_ms:8.2f}ms "
+                    f"metadata={metadata_ms:8.2f}ms same={same}/{len(pages)}"
+                )
+
+
+if __name__ == "__main__":
+    main()
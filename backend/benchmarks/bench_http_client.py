@@ -0,0 +1,163 @@
+"""共有HTTPセッションによるハンドシェイク削減の計測
+
+自己署名証明書でローカルにTLSサーバーを立て、
+リクエストごとにClientSessionを作る従来の方法と
+共有のHttpClientを使う方法で、所要時間とTLS接続数を比較する。
+
+実行方法（backendディレクトリで実行）:
+    python -m benchmarks.bench_http_client --requests 200 --concurrency 1 8
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import os
+import ssl
+import tempfile
+import time
+from typing import Awaitable, Callable, Set, Tuple
+
+import aiohttp
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.utils.http_client import HttpClient
+
+BODY = b"<html><head><title>bench</title></head><body>ok</body></html>"
+
+
+def create_certificate(directory: str) -> Tuple[str, str]:
+    """127.0.0.1向けの自己署名証明書を作成"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+async def start_server(
+    cert_path: str, key_path: str, connections: Set[object]
+) -> Tuple[web.AppRunner, str]:
+    """TLSサーバーを起動（接続ごとのトランスポートを記録する）"""
+
+    async def handler(request: web.Request) -> web.Response:
+        # 参照を保持してidの再利用による数え漏れを防ぐ
+        connections.add(request.transport)
+        return web.Response(body=BODY, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=context)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"https://127.0.0.1:{port}/"
+
+
+async def run(
+    name: str,
+    fetch: Callable[[], Awaitable[None]],
+    requests: int,
+    concurrency: int,
+    connections: Set[object],
+) -> None:
+    """指定した同時数でリクエストを繰り返し、結果を表示"""
+    connections.clear()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await fetch()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"{name:<12} concurrency={concurrency:<3} total={elapsed * 1000:8.1f}ms "
+        f"p50={latencies[len(latencies) // 2] * 1000:6.2f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95)] * 1000:6.2f}ms "
+        f"tls_connections={len(connections)}"
+    )
+
+
+async def main_async(requests: int, concurrencies: list) -> None:
+    connections: Set[object] = set()
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = create_certificate(directory)
+        runner, url = await start_server(cert_path, key_path, connections)
+        client_context = ssl.create_default_context(cafile=cert_path)
+
+        async def per_request() -> None:
+            # 従来の実装：リクエストごとにセッションを作成
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, ssl=client_context) as response:
+                    await response.read()
+
+        http_client = HttpClient()
+
+        async def shared() -> None:
+            session = http_client.get_session()
+            async with session.get(url, ssl=client_context) as response:
+                await response.read()
+
+        try:
+            for concurrency in concurrencies:
+                await run(
+                    "per-request", per_request, requests, concurrency, connections
+                )
+                await run("shared", shared, requests, concurrency, connections)
+        finally:
+            await http_client.close()
+            await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="共有HTTPセッションのベンチマーク")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""ローカル検証用のWebSubハブ
+
+ハブを告知するフィードの配信元とハブを兼ねる簡易サーバー。
+購読要求を受けるとコールバックに検証要求を送り、
+/publish を呼ぶと新しい記事を追加して購読者に署名付きで配信する。
+
+使い方:
+    python scripts/websub_local_hub.py --port 8900
+    # バックエンドは WEBSUB_CALLBACK_BASE_URL=http://localhost:8000 で起動し、
+    # http://localhost:8900/feed をフィードとして登録する
+    curl -X POST http://localhost:8900/publish
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+import aiohttp
+from aiohttp import web
+
+
+class LocalHub:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.topic = f"{base_url}/feed"
+        self.items: List[Dict[str, str]] = []
+        self.subscribers: Dict[str, str] = {}
+        self.add_item()
+
+    def add_item(self) -> None:
+        number = len(self.items) + 1
+        self.items.insert(
+            0,
+            {
+                "title": f"ローカルハブの記事 {number}",
+                "link": f"{self.base_url}/articles/{number}",
+                "published": format_datetime(datetime.now(timezone.utc)),
+            },
+        )
+
+    def render_feed(self) -> bytes:
+        items = "".join(
+            f"<item><title>{escape(i['title'])}</title><link>{i['link']}</link>"
+            f"<guid>{i['link']}</guid><pubDate>{i['published']}</pubDate></item>"
+            for i in self.items
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+            "<title>Local WebSub Feed</title>"
+            f"<link>{self.base_url}/</link>"
+            f'<atom:link rel="self" href="{self.topic}"/>'
+            f'<atom:link rel="hub" href="{self.base_url}/hub"/>'
+            f"{items}</channel></rss>"
+        ).encode("utf-8")
+
+    async def feed(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.render_feed(),
+            content_type="application/rss+xml",
+            charset="utf-8",
+        )
+
+    async def hub(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get("hub.topic") != self.topic:
+            return web.Response(status=400, text="unknown topic")
+        # 検証はハブ側から非同期に行う
+        asyncio.create_task(self.verify(dict(form)))
+        return web.Response(status=202)
+
+    async def verify(self, form: Dict[str, str]) -> None:
+        challenge = secrets.token_hex(16)
+        params = {
+            "hub.mode": form["hub.mode"],
+            "hub.topic": form["hub.topic"],
+            "hub.challenge": challenge,
+            "hub.lease_seconds": form.get("hub.lease_seconds", "3600"),
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.get(form["hub.callback"], params=params) as response:
+                body = await response.text()
+        if response.status != 200 or body != challenge:
+            print(f"検証に失敗しました: {form['hub.callback']} ({response.status})")
+            return
+        if form["hub.mode"] == "subscribe":
+            self.subscribers[form["hub.callback"]] = form.get("hub.secret", "")
+        else:
+            self.subscribers.pop(form["hub.callback"], None)
+        print(f"{form['hub.mode']} を検証しました: {form['hub.callback']}")
+
+    async def publish(self, request: web.Request) -> web.Response:
+        self.add_item()
+        body = self.render_feed()
+        async with aiohttp.ClientSession() as session:
+            for callback, secret in self.subscribers.items():
+                headers = {"Content-Type": "application/rss+xml; charset=utf-8"}
+                if secret:
+                    digest = hmac.new(secret.encode(), body, hashlib.sha256)
+                    headers["X-Hub-Signature"] = f"sha256={digest.hexdigest()}"
+                async with session.post(callback, data=body, headers=headers) as r:
+                    print(f"配信しました: {callback} ({r.status})")
+        return web.json_response(
+            {"items": len(self.items), "subscribers": len(self.subscribers)}
+        )
+
+
+def create_app(base_url: str) -> web.Application:
+    hub = LocalHub(base_url)
+    app = web.Application()
+    app["hub"] = hub
+    app.router.add_get("/feed", hub.feed)
+    app.router.add_post("/hub", hub.hub)
+    app.router.add_post("/publish", hub.publish)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ローカル検証用のWebSubハブ")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+    base_url = f"http://{args.host}:{args.port}"
+    web.run_app(create_app(base_url), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import asyncio
+import os
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.body_cache import BodyCache  # noqa: E402
+
+
+def test_evicts_least_recently_used_without_rescanning(tmp_path):
+    async def scenario():
+        cache = BodyCache(directory=str(tmp_path), max_bytes=250)
+        await cache.set("https://example.com/a", b"a" * 100)
+        await cache.set("https://example.com/b", b"b" * 100)
+        # aを使うと、次に追加したときにはbが最も古くなる
+        with await cache.get("https://example.com/a") as cached:
+            assert bytes(cached.body) == b"a" * 100
+        await cache.set("https://example.com/c", b"c" * 100)
+        return cache
+
+    cache = asyncio.run(scenario())
+
+    assert asyncio.run(cache.get("https://example.com/b")) is None
+    stats = cache.get_stats()
+    assert stats["evicted"] == 1
+    assert stats["bytes"] == 200
+    blobs = [name for _, _, files in os.walk(cache.blob_dir) for name in files]
+    assert len(blobs) == 2
+
+
+def test_shared_bodies_are_counted_once_and_reloaded(tmp_path):
+    async def scenario():
+        cache = BodyCache(directory=str(tmp_path), max_bytes=1000)
+        await cache.set("https://example.com/a", b"x" * 100)
+        await cache.set("https://example.com/b", b"x" * 100)
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.get_stats()["bytes"] == 100
+    assert cache.stats["deduplicated"] == 1
+
+    # 再起動後も保存済みの索引から合計サイズを復元する
+    reloaded = BodyCache(directory=str(tmp_path), max_bytes=1000)
+    assert reloaded.get_stats()["entries"] == 2
+    assert reloaded.get_stats()["bytes"] == 100
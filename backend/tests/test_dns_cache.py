@@ -0,0 +1,86 @@
+import asyncio
+import os
+import socket
+
+import pytest
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.dns_cache import CachingResolver  # noqa: E402
+
+
+class StubResolver:
+    """問い合わせ回数を数え、登録されていないホスト名は解決に失敗する"""
+
+    def __init__(self, hosts):
+        self.hosts = hosts
+        self.queries = 0
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        self.queries += 1
+        await asyncio.sleep(0)
+        if host not in self.hosts:
+            raise OSError(f"Name or service not known: {host}")
+        return [
+            {
+                "hostname": host,
+                "host": self.hosts[host],
+                "port": port,
+                "family": family,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+        ]
+
+    async def close(self):
+        pass
+
+
+def resolver(negative_ttl: float = 30) -> CachingResolver:
+    caching = CachingResolver(negative_ttl=negative_ttl, default_ttl=60)
+    caching._dns = None
+    caching._threaded = StubResolver({"example.com": "192.0.2.1"})
+    return caching
+
+
+def test_failed_lookups_are_cached_for_the_negative_ttl():
+    async def scenario():
+        caching = resolver()
+        for _ in range(3):
+            with pytest.raises(OSError):
+                await caching.resolve("missing.example.com")
+        return caching
+
+    caching = asyncio.run(scenario())
+
+    assert caching._threaded.queries == 1
+    assert caching.stats["failures"] == 1
+    assert caching.stats["negative_hits"] == 2
+
+
+def test_failed_lookups_are_retried_after_the_negative_ttl():
+    async def scenario():
+        caching = resolver(negative_ttl=0)
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await caching.resolve("missing.example.com")
+        return caching
+
+    assert asyncio.run(scenario())._threaded.queries == 2
+
+
+def test_concurrent_lookups_share_one_query_and_keep_the_port():
+    async def scenario():
+        caching = resolver()
+        results = await asyncio.gather(
+            caching.resolve("example.com", 443), caching.resolve("example.com", 80)
+        )
+        cached = await caching.resolve("example.com", 8080)
+        return caching, results, cached
+
+    caching, results, cached = asyncio.run(scenario())
+
+    assert caching._threaded.queries == 1
+    assert [r[0]["port"] for r in results] == [443, 80]
+    assert cached[0]["host"] == "192.0.2.1" and cached[0]["port"] == 8080
+    assert caching.stats["hits"] == 1
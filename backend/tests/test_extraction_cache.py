@@ -0,0 +1,35 @@
+import asyncio
+import os
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.extraction_cache import ExtractionCache  # noqa: E402
+
+KEYS = ["aa" + "0" * 62, "bb" + "1" * 62, "cc" + "2" * 62]
+
+
+def test_disk_tier_evicts_oldest_and_tracks_size(tmp_path):
+    async def scenario():
+        cache = ExtractionCache(
+            max_entries=1, directory=str(tmp_path), disk_max_bytes=250
+        )
+        for key in KEYS:
+            await cache.set(key, "x" * 80)
+        return cache
+
+    cache = asyncio.run(scenario())
+
+    on_disk = {name for _, _, files in os.walk(tmp_path) for name in files}
+    assert on_disk == {f"{KEYS[1]}.json", f"{KEYS[2]}.json"}
+    stats = cache.get_stats()
+    assert stats["disk_evicted"] == 1
+    assert stats["disk_bytes"] == sum(
+        os.path.getsize(cache._path(key)) for key in KEYS[1:]
+    )
+
+    # 再起動後はディスクから読み出し、合計サイズも引き継ぐ
+    reloaded = ExtractionCache(max_entries=1, directory=str(tmp_path))
+    assert reloaded.get_stats()["disk_bytes"] == stats["disk_bytes"]
+    assert asyncio.run(reloaded.get(KEYS[1])) == "x" * 80
+    assert asyncio.run(reloaded.get(KEYS[0])) is None
+    assert reloaded.stats["disk_hits"] == 1
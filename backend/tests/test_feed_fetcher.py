@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from aiohttp import web  # noqa: E402
+
+from app.utils.feed_cache import FeedCache  # noqa: E402
+from app.utils.feed_fetcher import FeedFetcher  # noqa: E402
+from app.utils.host_limiter import HostLimiter  # noqa: E402
+from app.utils.http_client import HttpClient  # noqa: E402
+
+RSS = (
+    b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+    b"<item><title>a</title><link>https://example.com/a</link></item>"
+    b"</channel></rss>"
+)
+
+
+class ArticleRepository:
+    async def upsert_articles(self, entries, url):
+        return len(entries)
+
+
+def test_304_without_cached_parse_is_refetched_unconditionally(tmp_path):
+    """手元にない本文を304で返された場合は、条件なしで1回だけ取得し直す"""
+    requests = []
+
+    async def feed(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("Cache-Control") != "no-cache":
+            return web.Response(status=304)
+        return web.Response(body=RSS, content_type="application/rss+xml")
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/rss", feed)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        client = HttpClient(limiter=HostLimiter(rate=1000, burst=1000))
+        fetcher = FeedFetcher(
+            cache=FeedCache(shared_dir=str(tmp_path)),
+            article_repository=ArticleRepository(),
+            http_client=client,
+        )
+        try:
+            return await fetcher.fetch(f"http://127.0.0.1:{port}/rss"), fetcher
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    data, fetcher = asyncio.run(scenario())
+
+    assert [e["link"] for e in data["entries"]] == ["https://example.com/a"]
+    assert len(requests) == 2
+    assert "If-None-Match" not in requests[1]
+    assert fetcher.stats["not_modified_retried"] == 1
@@ -0,0 +1,86 @@
+import codecs
+import os
+
+import pytest
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.feed_parser import (  # noqa: E402
+    FeedParseError,
+    FeedParser,
+    parse_feed_bytes,
+)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"<!DOCTYPE html><html><head><title>t</title></head><body></body></html>",
+        b'<?xml version="1.0"?><rss version="2.0"></rss>',
+        b'<?xml version="1.0"?><opml version="2.0"><body/></opml>',
+        b"",
+    ],
+)
+def test_non_feed_documents_are_rejected(body):
+    with pytest.raises(FeedParseError):
+        parse_feed_bytes(body)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'<rss version="2.0"><channel><title>t</title></channel></rss>',
+        b'<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title></feed>',
+        b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"'
+        b' xmlns="http://purl.org/rss/1.0/"><channel><title>t</title></channel>'
+        b"</rdf:RDF>",
+    ],
+)
+def test_empty_feeds_of_each_format_are_accepted(body):
+    data = parse_feed_bytes(body)
+    assert data["feed"]["title"] == "t"
+    assert data["entries"] == []
+
+
+def rss(title: str, encoding: str = "") -> str:
+    declaration = f'<?xml version="1.0" encoding="{encoding}"?>' if encoding else ""
+    return (
+        f'{declaration}<rss version="2.0"><channel><title>{title}</title>'
+        "<item><title>記事タイトル</title><link>https://example.com/1</link></item>"
+        "</channel></rss>"
+    )
+
+
+def test_shift_jis_split_across_chunks():
+    """マルチバイト文字の途中でチャンクが切れても正しく復号する"""
+    body = rss("日本語のフィード", "Shift_JIS").encode("shift_jis")
+    parser = FeedParser()
+    for i in range(0, len(body), 7):
+        parser.feed(body[i : i + 7])
+    data = parser.close()
+
+    assert data["feed"]["title"] == "日本語のフィード"
+    assert data["entries"][0]["title"] == "記事タイトル"
+
+
+def test_declaration_wins_over_content_type_hint():
+    body = rss("宣言の符号化", "EUC-JP").encode("euc_jp")
+    assert parse_feed_bytes(body, "Shift_JIS")["feed"]["title"] == "宣言の符号化"
+
+
+def test_content_type_hint_is_used_without_declaration():
+    body = rss("ヒントの符号化").encode("euc_jp")
+    assert parse_feed_bytes(body, "EUC-JP")["feed"]["title"] == "ヒントの符号化"
+
+
+@pytest.mark.parametrize("hint", [None, "Shift_JIS"])
+@pytest.mark.parametrize(
+    "codec, declared, bom",
+    [
+        ("utf-8", "UTF-8", codecs.BOM_UTF8),
+        ("utf-16-le", "UTF-16", codecs.BOM_UTF16_LE),
+    ],
+)
+def test_byte_order_mark_wins_over_content_type_hint(codec, declared, bom, hint):
+    body = bom + rss("ＢＯＭ付き", declared).encode(codec)
+    assert parse_feed_bytes(body, hint)["feed"]["title"] == "ＢＯＭ付き"
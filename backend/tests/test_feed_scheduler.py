@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.feed_cache import FeedCache  # noqa: E402
+from app.utils.feed_scheduler import (  # noqa: E402
+    SCHEDULER_TICK,
+    FeedPollState,
+    FeedScheduler,
+)
+
+URL = "https://feeds.example.com/rss"
+DATA = {"feed": {"title": "t"}, "entries": [{"guid": "1", "published": ""}]}
+
+
+class Fetcher:
+    """キャッシュに保存するか、失敗するフィード取得器"""
+
+    def __init__(self, cache: FeedCache):
+        self.cache = cache
+        self.fail = False
+
+    async def fetch(self, url: str, revalidate: bool = False):
+        if self.fail:
+            raise RuntimeError("upstream error")
+        self.cache.set(url, DATA, etag='"v1"')
+        return DATA
+
+
+class WebSub:
+    async def ensure_subscribed(self, url, feed):
+        return None
+
+    def is_active(self, url):
+        return False
+
+
+def scheduler(tmp_path, cache: FeedCache) -> FeedScheduler:
+    return FeedScheduler(
+        feed_fetcher=Fetcher(cache),
+        websub=WebSub(),
+        lock_file=str(tmp_path / "poll.lock"),
+    )
+
+
+def test_only_one_process_polls(tmp_path):
+    """ロックファイルを取得できたスケジューラーだけが定期取得を担当する"""
+    first = scheduler(tmp_path, FeedCache(shared_dir=""))
+    second = scheduler(tmp_path, FeedCache(shared_dir=""))
+    assert first.try_lead()
+    assert not second.try_lead()
+
+    # 担当していたプロセスが止まると他が引き継ぐ
+    asyncio.run(first.stop())
+    assert second.try_lead()
+    asyncio.run(second.stop())
+
+
+def test_poll_shares_result_and_expires_on_failure(tmp_path):
+    """取得結果は他のワーカーに共有し、失敗した後は古い結果を新しいものとして扱わない"""
+    shared_dir = str(tmp_path / "feeds")
+    poller_cache = FeedCache(shared_dir=shared_dir)
+    poller = scheduler(tmp_path, poller_cache)
+    state = FeedPollState(URL)
+
+    asyncio.run(poller._poll(state))
+    assert poller_cache.get(URL).ttl == state.interval + SCHEDULER_TICK
+
+    # 他のワーカーは共有された結果を配信元に問い合わせずに使える
+    worker_cache = FeedCache(shared_dir=shared_dir)
+    loaded = asyncio.run(worker_cache.load_shared(URL))
+    assert loaded.data == DATA and loaded.etag == '"v1"' and loaded.is_fresh()
+
+    poller.feed_fetcher.fail = True
+    asyncio.run(poller._poll(state))
+    assert state.failures == 1
+    assert not poller_cache.get(URL).is_fresh()
+
+    worker_cache = FeedCache(shared_dir=shared_dir)
+    assert not asyncio.run(worker_cache.load_shared(URL)).is_fresh()
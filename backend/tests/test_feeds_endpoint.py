@@ -0,0 +1,232 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.api.v1.endpoints import feeds  # noqa: E402
+from app.config import FEED_BATCH_MAX_FEEDS  # noqa: E402
+from app.schemas.feed import (  # noqa: E402
+    Article,
+    FavoriteArticleCreate,
+    ParseFeedsRequest,
+)
+from app.utils.circuit_breaker import CircuitOpenError  # noqa: E402
+from app.utils.timeline import TimelineSnapshots  # noqa: E402
+
+
+class OpenCircuitFetcher:
+    """常に遮断中として振る舞うフィード取得器"""
+
+    async def fetch(self, url: str):
+        raise CircuitOpenError("feeds.example.com", 12)
+
+
+def test_parse_feed_returns_503_when_circuit_is_open():
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            feeds.parse_feed(
+                url="https://feeds.example.com/rss",
+                since=None,
+                since_link=None,
+                known=[],
+                user=None,
+                feed_fetcher=OpenCircuitFetcher(),
+            )
+        )
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers["Retry-After"] == "13"
+
+
+def test_parse_feeds_request_rejects_too_many_feeds():
+    """URLとフィードIDの合計が上限を超える一括解析は受け付けない（422）"""
+    urls = [f"https://example.com/{i}.xml" for i in range(FEED_BATCH_MAX_FEEDS)]
+    assert len(ParseFeedsRequest(urls=urls).urls) == FEED_BATCH_MAX_FEEDS
+
+    with pytest.raises(ValidationError):
+        ParseFeedsRequest(urls=urls, feed_ids=[1])
+
+
+class FavoriteRepository:
+    def __init__(self):
+        self.added = []
+
+    async def add_favorite_article(self, article, user_id):
+        self.added.append(article)
+        return article
+
+
+class ArticleRepository:
+    async def get_article(self, article_id):
+        return Article(
+            id=article_id,
+            link="https://example.com/a",
+            title="保存済みの記事",
+            description="説明",
+        )
+
+
+class User:
+    id = "user-1"
+
+
+def add_favorite(article: FavoriteArticleCreate) -> FavoriteArticleCreate:
+    favorites = FavoriteRepository()
+    asyncio.run(
+        feeds.add_favorite_article(
+            article,
+            user=User(),
+            favorite_article_repository=favorites,
+            feed_repository=None,
+            article_repository=ArticleRepository(),
+        )
+    )
+    return favorites.added[0]
+
+
+def test_add_favorite_fills_in_from_article_store():
+    """article_idだけを指定した場合はリンク・タイトル等を記事ストアから補完する"""
+    added = add_favorite(FavoriteArticleCreate(article_id="abc", is_external=True))
+    assert added.article_link == "https://example.com/a"
+    assert added.article_title == "保存済みの記事"
+    assert added.article_description == "説明"
+
+
+def test_add_external_favorite_with_empty_title():
+    """article_idのない外部記事は、タイトルが空でもそのまま登録する"""
+    added = add_favorite(
+        FavoriteArticleCreate(
+            article_link="https://example.com/b", article_title="", is_external=True
+        )
+    )
+    assert added.article_link == "https://example.com/b"
+    assert added.article_title == ""
+
+    with pytest.raises(ValidationError):
+        FavoriteArticleCreate(article_link="https://example.com/b", is_external=True)
+
+
+class Feed:
+    def __init__(self, feed_id: int, url: str):
+        self.id = feed_id
+        self.url = url
+        self.name = url
+        self.enabled = True
+
+
+class FeedRepository:
+    def __init__(self, feeds):
+        self.feeds = feeds
+
+    async def get_all_feeds(self):
+        return self.feeds
+
+
+class CountingFetcher:
+    """fetch_manyの呼び出し回数を数えるフィード取得器"""
+
+    def __init__(self, entries_by_url):
+        self.entries_by_url = entries_by_url
+        self.calls = 0
+
+    async def fetch_many(self, urls):
+        self.calls += 1
+        return [{"feed": {}, "entries": self.entries_by_url[url]} for url in urls]
+
+
+def timeline_page(fetcher, snapshots, cursor=None, user=User()):
+    return asyncio.run(
+        feeds.get_timeline(
+            limit=3,
+            cursor=cursor,
+            since=None,
+            since_link=None,
+            known=[],
+            user=user,
+            feed_repository=FeedRepository(
+                [Feed(1, "https://a.example/rss"), Feed(2, "https://b.example/rss")]
+            ),
+            feed_fetcher=fetcher,
+            snapshots=snapshots,
+        )
+    )
+
+
+def test_timeline_follow_up_pages_do_not_refetch_feeds():
+    """2ページ目以降は1ページ目のマージ元から返し、フィードを取得し直さない"""
+    entries = {
+        url: [
+            {"published": f"2024-01-0{day}T00:00:00", "link": f"{url}/{day}"}
+            for day in range(9, 0, -2 if url.startswith("https://a") else -3)
+        ]
+        for url in ("https://a.example/rss", "https://b.example/rss")
+    }
+    fetcher = CountingFetcher(entries)
+    snapshots = TimelineSnapshots()
+
+    links = []
+    response = timeline_page(fetcher, snapshots)
+    links += [entry["link"] for entry in response["entries"]]
+    while response["next_cursor"]:
+        response = timeline_page(fetcher, snapshots, response["next_cursor"])
+        links += [entry["link"] for entry in response["entries"]]
+
+    assert fetcher.calls == 1
+    all_entries = sorted(
+        (e for feed_entries in entries.values() for e in feed_entries),
+        key=lambda e: (e["published"], e["link"]),
+        reverse=True,
+    )
+    assert links == [e["link"] for e in all_entries]
+
+
+def test_timeline_snapshot_is_not_shared_between_users():
+    """他のユーザーのカーソルではスナップショットを使わずに取得し直す"""
+    entries = {
+        "https://a.example/rss": [
+            {"published": f"2024-01-0{day}T00:00:00", "link": f"a/{day}"}
+            for day in range(9, 0, -1)
+        ],
+        "https://b.example/rss": [],
+    }
+    fetcher = CountingFetcher(entries)
+    snapshots = TimelineSnapshots()
+    cursor = timeline_page(fetcher, snapshots)["next_cursor"]
+
+    class OtherUser:
+        id = "user-2"
+
+    timeline_page(fetcher, snapshots, cursor, OtherUser())
+    assert fetcher.calls == 2
+
+
+def test_parse_feeds_resolves_feed_ids_from_one_listing():
+    """フィードIDはフィード一覧を1回読み込んで解決する"""
+
+    class ListingRepository(FeedRepository):
+        listings = 0
+
+        async def get_all_feeds(self):
+            self.listings += 1
+            return self.feeds
+
+    repository = ListingRepository(
+        [Feed("1", "https://a.example/rss"), Feed("2", "https://b.example/rss")]
+    )
+    fetcher = CountingFetcher({"https://b.example/rss": []})
+    response = asyncio.run(
+        feeds.parse_feeds(
+            ParseFeedsRequest(feed_ids=[2, "3"]),
+            user=None,
+            feed_repository=repository,
+            feed_fetcher=fetcher,
+        )
+    )
+
+    assert repository.listings == 1
+    results = {result["feed_id"]: result for result in response["results"]}
+    assert results["2"]["status"] == "success"
+    assert results["3"]["code"] == 404
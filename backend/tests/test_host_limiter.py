@@ -0,0 +1,102 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.host_limiter import HostLimiter, HostThrottledError  # noqa: E402
+
+
+def test_idle_hosts_are_dropped_when_over_the_limit():
+    limiter = HostLimiter(rate=1, burst=2, max_buckets=10, overrides={})
+    # 1件目のホストはトークンを使い切ったまま、残りは使わずに満杯のまま
+    assert limiter.try_acquire("busy.example.com")
+    assert limiter.try_acquire("busy.example.com")
+    for i in range(9):
+        limiter._bucket(f"idle{i}.example.com")
+
+    limiter._bucket("new.example.com")
+
+    assert set(limiter.get_stats()) == {"busy.example.com", "new.example.com"}
+    # 制限中のホストの状態は残るため、続けて送ることはできない
+    assert not limiter.try_acquire("busy.example.com")
+
+
+def test_least_recently_used_hosts_are_dropped_when_none_are_idle():
+    limiter = HostLimiter(rate=1, burst=1, max_buckets=10, overrides={})
+    for i in range(10):
+        assert limiter.try_acquire(f"host{i}.example.com")
+    # host0を使い直すと、最も古いのはhost1になる
+    limiter.defer("host0.example.com", 60)
+
+    limiter._bucket("new.example.com")
+
+    hosts = set(limiter.get_stats())
+    assert len(hosts) == 10
+    assert "host0.example.com" in hosts
+    assert "host1.example.com" not in hosts
+    assert "new.example.com" in hosts
+
+
+def test_hosts_with_waiting_requests_are_kept():
+    async def scenario():
+        limiter = HostLimiter(rate=20, burst=1, max_buckets=2, overrides={})
+        assert limiter.try_acquire("slow.example.com")
+        waiter = asyncio.create_task(limiter.acquire("slow.example.com"))
+        await asyncio.sleep(0)
+        limiter._bucket("a.example.com")
+        limiter._bucket("b.example.com")
+        hosts = set(limiter.get_stats())
+        await waiter
+        return hosts
+
+    assert "slow.example.com" in asyncio.run(scenario())
+
+
+def test_burst_is_allowed_then_requests_wait_for_tokens():
+    async def scenario():
+        limiter = HostLimiter(rate=50, burst=3, max_wait=5, overrides={})
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(3):
+            await limiter.acquire("example.com")
+        burst_elapsed = loop.time() - started
+        await asyncio.gather(*(limiter.acquire("example.com") for _ in range(5)))
+        return burst_elapsed, loop.time() - started, limiter
+
+    burst_elapsed, elapsed, limiter = asyncio.run(scenario())
+
+    assert burst_elapsed < 0.05
+    # バーストを超えた5件は毎秒50件（20ミリ秒ごと）に制限される
+    assert elapsed >= 5 / 50 * 0.9
+    stats = limiter.get_stats()["example.com"]
+    assert stats["requests"] == 8
+    assert stats["max_queue_depth"] >= 4
+
+
+def test_requests_beyond_max_wait_are_rejected():
+    async def scenario():
+        limiter = HostLimiter(rate=1, burst=1, max_wait=0.5, overrides={})
+        await limiter.acquire("example.com")
+        with pytest.raises(HostThrottledError) as excinfo:
+            await limiter.acquire("example.com")
+        return excinfo.value, limiter
+
+    error, limiter = asyncio.run(scenario())
+
+    assert error.host == "example.com"
+    assert error.retry_after > 0.5
+    assert limiter.get_stats()["example.com"]["rejected"] == 1
+
+
+def test_overrides_and_retry_after_apply_per_host():
+    limiter = HostLimiter(rate=1, burst=1, overrides={"fast.example.com": (100.0, 10)})
+    assert all(limiter.try_acquire("fast.example.com") for _ in range(10))
+    assert limiter.try_acquire("slow.example.com")
+    assert not limiter.try_acquire("slow.example.com")
+
+    limiter.defer("fast.example.com", 30)
+    assert not limiter.try_acquire("fast.example.com")
+    assert 29 < limiter.blocked_for("fast.example.com") <= 30
+    assert limiter.blocked_for("slow.example.com") == 0.0
@@ -0,0 +1,156 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.host_limiter import HostLimiter
+from app.utils.http_client import HttpClient
+
+
+async def _serve(routes):
+    """テスト用のHTTPサーバーを起動し、(runner, ベースURL)を返す"""
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _client() -> HttpClient:
+    breaker = CircuitBreaker(window=10, min_requests=2, failure_rate=0.5)
+    return HttpClient(limiter=HostLimiter(rate=1000, burst=1000), breaker=breaker)
+
+
+async def _fetch(client: HttpClient, url: str) -> int:
+    async with client.get(url) as response:
+        response.raise_for_status()
+        return response.status
+
+
+def test_4xx_does_not_open_circuit():
+    """raise_for_status()による4xxは失敗に数えず、同じホストの他のURLを止めない"""
+
+    async def missing(request):
+        return web.Response(status=404)
+
+    async def ok(request):
+        return web.Response(text="ok")
+
+    async def scenario():
+        runner, base = await _serve({"/missing": missing, "/ok": ok})
+        client = _client()
+        try:
+            for _ in range(5):
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await _fetch(client, f"{base}/missing")
+            assert await _fetch(client, f"{base}/ok") == 200
+            stats = client.breaker.get_stats()["127.0.0.1"]
+            assert stats["state"] == "closed"
+            assert stats["failure_rate"] == 0.0
+            # 4xxは成功にも数えず、記録されるのは200の1件だけ
+            assert stats["requests"] == 1
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_5xx_opens_circuit():
+    """5xxは失敗として記録され、続けば遮断される"""
+
+    async def broken(request):
+        return web.Response(status=500)
+
+    async def scenario():
+        runner, base = await _serve({"/broken": broken})
+        client = _client()
+        try:
+            for _ in range(2):
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await _fetch(client, f"{base}/broken")
+            assert client.breaker.get_stats()["127.0.0.1"]["state"] == "open"
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+def test_4xx_probe_does_not_close_open_circuit():
+    """試行中の4xxは遮断を解除せず、次のリクエストで改めて試行する"""
+    breaker = CircuitBreaker(window=10, min_requests=2, failure_rate=0.5)
+    breaker.record("example.com", False, 0.1, "HTTP 500")
+    breaker.record("example.com", False, 0.1, "HTTP 500")
+    circuit = breaker._circuits["example.com"]
+    circuit.opened_at -= circuit.open_seconds
+
+    breaker.before_request("example.com")
+    breaker.release("example.com")
+
+    assert circuit.state == "half_open"
+    breaker.before_request("example.com")
+    assert circuit.probing
+
+
+def test_closed_circuits_without_recent_failures_expire():
+    breaker = CircuitBreaker(idle_seconds=60)
+    breaker.record("ok.example.com", True, 0.1)
+    breaker.record("failing.example.com", False, 0.1, "HTTP 500")
+    breaker._expired_at -= 60
+    breaker._circuits["failing.example.com"].last_failure_at -= 30
+
+    breaker.before_request("new.example.com")
+
+    assert set(breaker.get_stats()) == {"failing.example.com", "new.example.com"}
+
+
+def test_session_from_previous_loop_is_closed():
+    """別のイベントループで使う場合は、前のループのセッションを閉じて作り直す"""
+    client = _client()
+
+    async def open_session():
+        return client.get_session()
+
+    first = asyncio.run(open_session())
+    second = asyncio.run(open_session())
+    try:
+        assert first.closed
+        assert second is not first and not second.closed
+    finally:
+        asyncio.run(client.close())
+
+
+def test_stats_count_in_flight_requests():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(request):
+            await release.wait()
+            return web.Response(text="ok")
+
+        runner, base = await _serve({"/slow": slow})
+        client = _client()
+        try:
+            tasks = [
+                asyncio.create_task(_fetch(client, f"{base}/slow")) for _ in range(3)
+            ]
+            while client.get_stats()["in_flight"] < 3:
+                await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(*tasks)
+            return client.get_stats()
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_flight"] == 0
+    assert stats["requests"] == 3
+    assert stats["max_in_flight"] == 3
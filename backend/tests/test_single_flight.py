@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.single_flight import SingleFlight  # noqa: E402
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        group = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"calls": calls}
+
+        waiters = [asyncio.create_task(group.do("feed", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert group.in_flight() == 1
+        release.set()
+        results = await asyncio.gather(*waiters)
+        return group, calls, results
+
+    group, calls, results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats == {"originated": 1, "coalesced": 4}
+    assert group.in_flight() == 0
+
+
+def test_exception_is_shared_and_key_is_released():
+    async def scenario():
+        group = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream error")
+
+        results = await asyncio.gather(
+            group.do("feed", fail), group.do("feed", fail), return_exceptions=True
+        )
+
+        async def succeed():
+            return "ok"
+
+        # 失敗した後は新たに実行し直す
+        return results, await group.do("feed", succeed), group
+
+    results, retried, group = asyncio.run(scenario())
+
+    assert [str(r) for r in results] == ["upstream error", "upstream error"]
+    assert retried == "ok"
+    assert group.stats["originated"] == 2
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others():
+    async def scenario():
+        group = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(group.do("feed", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(group.do("feed", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, group
+
+    result, group = asyncio.run(scenario())
+
+    assert result == "done"
+    assert group.in_flight() == 0
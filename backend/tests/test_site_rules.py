@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.site_rules import SiteRule, SiteRuleRegistry  # noqa: E402
+
+
+@pytest.fixture
+def registry() -> SiteRuleRegistry:
+    return SiteRuleRegistry(rules_file="")
+
+
+@pytest.mark.parametrize(
+    "url, name",
+    [
+        ("https://hatenablog.com/entry/1", "hatena"),
+        ("https://example.hatenablog.com/entry/1", "hatena"),
+        ("https://A.B.Hatenablog.COM/entry/1", "hatena"),
+        ("https://aws.amazon.com/blogs/aws/x", "aws"),
+        ("https://amazon.com/", None),
+        ("https://nothatenablog.com/", None),
+        ("https://hatenablog.com.example.org/", None),
+        ("not a url", None),
+    ],
+)
+def test_lookup_matches_registered_domain_suffixes(registry, url, name):
+    rule = registry.lookup(url)
+    assert (rule.name if rule else None) == name
+
+
+def test_most_specific_domain_wins(registry):
+    registry.register(SiteRule("docs", ["docs.aws.amazon.com"], ["main"]))
+
+    assert registry.lookup("https://docs.aws.amazon.com/x").name == "docs"
+    assert registry.lookup("https://eu.docs.aws.amazon.com/x").name == "docs"
+    assert registry.lookup("https://aws.amazon.com/x").name == "aws"
+
+
+def test_rules_file_overrides_and_skips_invalid_entries(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps(
+            {
+                "sites": [
+                    {
+                        "name": "custom",
+                        "domains": [".Hatenablog.com"],
+                        "content": ["article"],
+                    },
+                    {"name": "broken", "domains": ["broken.example"]},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    registry = SiteRuleRegistry(rules_file=str(path))
+
+    assert registry.lookup("https://x.hatenablog.com/").name == "custom"
+    assert registry.lookup("https://hateblo.jp/").name == "hatena"
+    assert registry.lookup("https://broken.example/") is None
@@ -0,0 +1,196 @@
+import asyncio
+import os
+
+from aiohttp import web
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.api.v1.endpoints import feeds  # noqa: E402
+from app.schemas.feed import AiSummaryCreate  # noqa: E402
+from app.utils.body_cache import BodyCache  # noqa: E402
+from app.utils.content_extractor import ContentExtractor  # noqa: E402
+from app.utils.host_limiter import HostLimiter  # noqa: E402
+from app.utils.html_engine import ENGINES, get_engine  # noqa: E402
+from app.utils.http_client import READ_CHUNK_SIZE, HttpClient  # noqa: E402
+from app.utils.site_rules import SiteRule, SiteRuleRegistry  # noqa: E402
+from app.utils.streaming_extractor import StreamingContentExtractor  # noqa: E402
+
+# 本文の候補（セレクタに一致する要素や長い段落）がない長いページ
+NO_CANDIDATE_PAGE = (
+    "<html><head><title>index</title></head><body>"
+    + "".join(
+        f"<div class='row'><a href='/p/{i}'>項目{i}</a><span>説明{i}</span></div>"
+        for i in range(20000)
+    )
+    + "</body></html>"
+).encode("utf-8")
+
+
+def feed_all(extractor: StreamingContentExtractor, body: bytes) -> None:
+    for start in range(0, len(body), READ_CHUNK_SIZE):
+        if extractor.feed(body[start : start + READ_CHUNK_SIZE]):
+            break
+
+
+def test_gives_up_when_no_candidate_is_found():
+    """本文の候補が見つからなければ、先頭の一部だけを解析して打ち切る"""
+    for engine_name in ENGINES:
+        extractor = StreamingContentExtractor(
+            "https://example.com/list", 8192, "utf-8", engine_name=engine_name
+        )
+        feed_all(extractor, NO_CANDIDATE_PAGE)
+        assert extractor.abandoned and not extractor.done
+        assert extractor.bytes_fed <= extractor.probe_bytes + 2 * READ_CHUNK_SIZE
+
+        # 打ち切った後のチャンクは解析しない
+        parsed = (extractor.bytes_fed, extractor.parse_seconds)
+        extractor.feed(NO_CANDIDATE_PAGE[:READ_CHUNK_SIZE])
+        assert (extractor.bytes_fed, extractor.parse_seconds) == parsed
+
+
+def test_gives_up_when_parse_time_budget_is_spent():
+    """解析の合計時間が上限を超えたら、以降のチャンクは解析しない"""
+    extractor = StreamingContentExtractor(
+        "https://example.com/list", 8192, "utf-8", max_seconds=0.0
+    )
+    feed_all(extractor, NO_CANDIDATE_PAGE)
+    assert extractor.abandoned
+    assert extractor.bytes_fed == READ_CHUNK_SIZE
+
+
+def rule_registry() -> SiteRuleRegistry:
+    registry = SiteRuleRegistry(rules_file="")
+    registry.register(
+        SiteRule("example", ["example.com"], [".article-body", "article"])
+    )
+    return registry
+
+
+def test_site_rule_follows_selector_priority():
+    """優先度の低いセレクタの要素が先に閉じても、全体を解析した場合と同じ本文を返す"""
+    body = "".join(f"<p>本文の段落{i}です。</p>" for i in range(5))
+    for padding in ("", "<!-- " + "x" * 8192 + " -->"):
+        page = (
+            f"<html><head><title>t</title>{padding}</head><body>"
+            "<article>promo teaser text</article>"
+            f"<div class='article-body'>{body}</div>"
+            "</body></html>"
+        ).encode("utf-8")
+        for engine_name in ENGINES:
+            registry = rule_registry()
+            expected = ContentExtractor(
+                get_engine(engine_name), registry
+            ).extract_main_content(page.decode("utf-8"), "https://example.com/a")
+            extractor = StreamingContentExtractor(
+                "https://example.com/a",
+                8192,
+                "utf-8",
+                engine_name=engine_name,
+                site_rules=registry,
+            )
+            feed_all(extractor, page)
+            assert extractor.finish_input()
+            assert extractor.text == expected
+            assert "promo" not in extractor.text
+
+
+def test_site_rule_finishes_early_on_highest_priority_selector():
+    """最も優先度の高いセレクタの要素が閉じた時点で、残りを受信せずに完了する"""
+    page = (
+        "<html><head><title>t</title></head><body>"
+        "<div class='article-body'>"
+        + "本文です。" * 1000
+        + "</div>"
+        + "<div>"
+        + "x" * 100000
+        + "</div></body></html>"
+    ).encode("utf-8")
+    extractor = StreamingContentExtractor(
+        "https://example.com/a", 100000, "utf-8", site_rules=rule_registry()
+    )
+    feed_all(extractor, page)
+    assert extractor.done
+    assert extractor.text == "本文です。" * 1000
+    assert extractor.bytes_fed < len(page)
+
+
+class RecordingStreamingExtractor(StreamingContentExtractor):
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
+class RecordingPool:
+    """抽出用のプロセスプールの代わりに、渡された本文を記録する"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def extract_content(self, body, charset, url):
+        self.calls.append(body)
+        return "プールで抽出した本文です。" * 20
+
+
+class SummaryRepository:
+    async def get_summary_by_article_link(self, link, feed_id):
+        return None
+
+    async def create_summary(self, link, summary, feed_id, article_id):
+        return {"article_link": link, "summary": summary}
+
+
+class Summarizer:
+    max_input_chars = 8192
+
+    async def summarize(self, text, lang):
+        return text[:10]
+
+
+def test_summarize_fallback_does_not_parse_whole_page_in_loop(monkeypatch, tmp_path):
+    """受信しながらの抽出を打ち切ったページは、全体をプールで抽出する"""
+
+    def parse_in_loop(self, html, url):
+        raise AssertionError("ページ全体をイベントループ上で解析した")
+
+    monkeypatch.setattr(ContentExtractor, "extract_main_content", parse_in_loop)
+    monkeypatch.setattr(feeds, "StreamingContentExtractor", RecordingStreamingExtractor)
+
+    async def page(request):
+        return web.Response(body=NO_CANDIDATE_PAGE, content_type="text/html")
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/list", page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        client = HttpClient(limiter=HostLimiter(rate=1000, burst=1000))
+        pool = RecordingPool()
+        try:
+            result = await feeds.summarize_article(
+                AiSummaryCreate(
+                    article_link=f"http://127.0.0.1:{port}/list", feed_id=0
+                ),
+                lang="ja",
+                ai_summary_repository=SummaryRepository(),
+                summarizer=Summarizer(),
+                article_repository=None,
+                http_client=client,
+                body_cache=BodyCache(directory=str(tmp_path)),
+                extraction_pool=pool,
+            )
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return result, pool
+
+    result, pool = asyncio.run(scenario())
+    assert result["summary"] == "プールで抽出した本文です"[:10]
+    assert pool.calls == [NO_CANDIDATE_PAGE]
+    extractor = RecordingStreamingExtractor.instances[-1]
+    assert extractor.abandoned
+    assert extractor.bytes_fed < len(NO_CANDIDATE_PAGE) // 4
@@ -0,0 +1,152 @@
+import os
+
+import pytest
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from app.utils.timeline import (  # noqa: E402
+    TimelineSnapshots,
+    cursor_snapshot_id,
+    decode_cursor,
+    encode_cursor,
+    iter_new_entries,
+    merge_timeline,
+    newest_key,
+    sort_entries,
+)
+
+T1 = "2024-05-01T10:00:00+00:00"
+T2 = "2024-05-01T11:00:00+00:00"
+
+
+def entry(published: str, link: str) -> dict:
+    return {"published": published, "link": link, "guid": link}
+
+
+def test_since_keeps_entries_published_at_the_same_time():
+    """前回の最新記事と同時刻に追加された記事を取りこぼさない"""
+    seen = entry(T1, "https://example.com/b")
+    entries = sort_entries(
+        [
+            entry(T2, "https://example.com/new"),
+            seen,
+            entry(T1, "https://example.com/a"),
+            entry(T1, "https://example.com/c"),
+            entry("2024-05-01T09:00:00+00:00", "https://example.com/old"),
+        ]
+    )
+
+    links = [e["link"] for e in iter_new_entries(entries, T1, None, seen["link"])]
+
+    assert links == [
+        "https://example.com/new",
+        "https://example.com/c",
+        "https://example.com/a",
+    ]
+
+
+def test_since_without_link_includes_the_boundary_entry():
+    entries = [entry(T1, "https://example.com/a")]
+    assert list(iter_new_entries(entries, T1)) == entries
+    assert list(iter_new_entries(entries, T2)) == []
+
+
+def test_newest_key_picks_the_latest_entry_across_feeds():
+    feeds = [
+        [entry(T1, "https://a.example/1")],
+        [],
+        [entry(T1, "https://b.example/1")],
+    ]
+    assert newest_key(feeds) == (T1, "https://b.example/1")
+    assert newest_key([[], []]) is None
+
+
+def feed_sources():
+    """公開日時が重なる記事を含む3フィード分のマージ元"""
+    a = sort_entries(
+        [
+            entry(f"2024-05-0{d}T00:00:00+00:00", f"https://a.example/{d}")
+            for d in (1, 3, 5)
+        ]
+        + [entry(T1, "https://a.example/same")]
+    )
+    b = sort_entries(
+        [
+            entry(f"2024-05-0{d}T00:00:00+00:00", f"https://b.example/{d}")
+            for d in (2, 4)
+        ]
+        + [entry(T1, "https://b.example/same")]
+    )
+    return [({"feed_id": 1}, a), ({"feed_id": 2}, b), ({"feed_id": 3}, [])]
+
+
+def all_keys(sources):
+    keys = [(e["published"], e["link"]) for _, entries in sources for e in entries]
+    return sorted(keys, reverse=True)
+
+
+def test_pages_follow_the_global_order_without_gaps_or_duplicates():
+    sources = feed_sources()
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = merge_timeline(sources, 3, cursor)
+        seen.extend((e["published"], e["link"]) for _, e in page)
+        if cursor is None:
+            break
+
+    assert seen == all_keys(sources)
+
+
+def test_cursor_round_trip_keeps_position_and_snapshot():
+    key = (T1, "https://example.com/日本語")
+    assert decode_cursor(encode_cursor(key)) == key
+    assert cursor_snapshot_id(encode_cursor(key)) is None
+    cursor = encode_cursor(key, "snap")
+    assert decode_cursor(cursor) == key
+    assert cursor_snapshot_id(cursor) == "snap"
+
+    _, next_cursor = merge_timeline(feed_sources(), 2, snapshot_id="snap")
+    assert cursor_snapshot_id(next_cursor) == "snap"
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(("a",))])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        merge_timeline(feed_sources(), 2, cursor)
+
+
+def test_cursor_between_equal_timestamps_continues_with_the_next_link():
+    """同時刻の記事の途中でページが切れても、残りの記事から続ける"""
+    sources = feed_sources()
+    keys = all_keys(sources)
+    boundary = keys.index((T1, "https://b.example/same"))
+
+    page, _ = merge_timeline(sources, 10, encode_cursor(keys[boundary]))
+
+    assert [(e["published"], e["link"]) for _, e in page] == keys[boundary + 1 :]
+
+
+def test_merge_with_since_includes_same_timestamp_entries():
+    sources = feed_sources()
+
+    page, _ = merge_timeline(sources, 10, since=T1, since_link="https://b.example/same")
+
+    links = [e["link"] for _, e in page]
+    assert "https://a.example/same" in links
+    assert "https://b.example/same" not in links
+    assert all(e["published"] >= T1 for _, e in page)
+
+
+def test_snapshots_expire_and_are_private_to_their_owner():
+    snapshots = TimelineSnapshots(max_entries=2, ttl=60)
+    for snapshot_id in ("a", "b", "c"):
+        snapshots.put(snapshot_id, "alice", {"sources": snapshot_id})
+
+    assert snapshots.get("a", "alice") is None
+    assert snapshots.get("c", "alice") == {"sources": "c"}
+    assert snapshots.get("c", "bob") is None
+
+    expired = TimelineSnapshots(ttl=0)
+    expired.put("x", "alice", {})
+    assert expired.get("x", "alice") is None
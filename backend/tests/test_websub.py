@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import hmac
+import os
+
+import pytest
+
+os.environ.setdefault("ARTICLE_STORE_BACKEND", "local")
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.api.v1.endpoints.feeds import read_limited_body  # noqa: E402
+from app.dynamodb.repositories.websub import LocalWebSubRepository  # noqa: E402
+from app.utils.websub import WebSubManager, WebSubSubscription  # noqa: E402
+
+FEED_URL = "https://example.com/feed.xml"
+HUB = "https://hub.example.com/"
+
+
+class Fetcher:
+    """配信された記事を記録するフィード取得器"""
+
+    def __init__(self):
+        self.pushed = []
+
+    async def ingest_pushed(self, url, data):
+        self.pushed.append((url, data))
+        return len(data["entries"])
+
+
+class Request:
+    """本文をチャンクで返すリクエスト"""
+
+    def __init__(self, chunks, headers=None):
+        self.chunks = chunks
+        self.headers = headers or {}
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def subscribed(repository) -> WebSubSubscription:
+    subscription = WebSubSubscription(FEED_URL, FEED_URL, HUB)
+    asyncio.run(repository.save_subscription(subscription.to_record()))
+    return subscription
+
+
+def test_verify_on_another_worker_uses_saved_subscription():
+    repository = LocalWebSubRepository()
+    subscription = subscribed(repository)
+    other = WebSubManager(feed_fetcher=Fetcher(), repository=repository)
+
+    challenge = asyncio.run(
+        other.verify(subscription.callback_id, "subscribe", FEED_URL, "abc", 600)
+    )
+
+    assert challenge == "abc"
+    assert other.is_active(FEED_URL)
+    saved = asyncio.run(repository.get_subscription(subscription.key))
+    assert saved["state"] == "verified"
+
+
+def test_unknown_or_forged_callback_is_rejected():
+    repository = LocalWebSubRepository()
+    subscription = subscribed(repository)
+    manager = WebSubManager(feed_fetcher=Fetcher(), repository=repository)
+
+    forged = subscription.key + ".forged-token"
+    assert asyncio.run(manager.get_subscription(forged)) is None
+    assert asyncio.run(manager.get_subscription("missing.token")) is None
+    assert asyncio.run(manager.get_subscription(subscription.callback_id))
+
+
+def test_receive_rejects_bad_signature_without_parsing():
+    fetcher = Fetcher()
+    manager = WebSubManager(feed_fetcher=fetcher, repository=LocalWebSubRepository())
+    subscription = WebSubSubscription(FEED_URL, FEED_URL, HUB)
+
+    # 解析すれば失敗する本文でも、署名が不正なら解析せずに破棄する
+    accepted = asyncio.run(
+        manager.receive(subscription, b"not a feed", "sha256=" + "0" * 64)
+    )
+
+    assert accepted is False
+    assert fetcher.pushed == []
+    assert manager.stats["rejected"] == 1
+
+
+def test_receive_ingests_signed_body():
+    fetcher = Fetcher()
+    manager = WebSubManager(feed_fetcher=fetcher, repository=LocalWebSubRepository())
+    subscription = WebSubSubscription(FEED_URL, FEED_URL, HUB)
+    body = (
+        b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+        b"<item><title>a</title><link>https://example.com/a</link></item>"
+        b"</channel></rss>"
+    )
+    digest = hmac.new(subscription.secret.encode(), body, hashlib.sha256)
+
+    accepted = asyncio.run(
+        manager.receive(subscription, body, "sha256=" + digest.hexdigest())
+    )
+
+    assert accepted is True
+    assert fetcher.pushed[0][0] == FEED_URL
+
+
+def test_read_limited_body_rejects_oversized_bodies():
+    with pytest.raises(HTTPException) as declared:
+        asyncio.run(read_limited_body(Request([], {"Content-Length": "11"}), 10))
+    assert declared.value.status_code == 413
+
+    with pytest.raises(HTTPException) as streamed:
+        asyncio.run(read_limited_body(Request([b"12345", b"678901"]), 10))
+    assert streamed.value.status_code == 413
+
+    body = asyncio.run(read_limited_body(Request([b"12345", b"67890"]), 10))
+    assert body == b"1234567890"
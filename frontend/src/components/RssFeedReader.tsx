@@ -40,6 +40,8 @@ const RssFeedReader: React.FC = () => {
     favoriteArticles,
     favoriteArticlesList,
     toggleFavorite,
+    hasMoreArticles,
+    loadMoreArticles,
   } = useRssFeed();
 
   const handleMenuSelect = (menu: MenuType): void => {
@@ -82,6 +84,8 @@ const RssFeedReader: React.FC = () => {
               onArticleRead={readArticle}
               favoriteArticles={favoriteArticles}
               onToggleFavorite={toggleFavorite}
+              hasMore={hasMoreArticles}
+              onLoadMore={loadMoreArticles}
             />
           )}
         </div>
@@ -1,4 +1,4 @@
-import React, { useState, useMemo, useEffect } from 'react';
+import React, { useState, useMemo, useEffect, useRef } from 'react';
 import { ArticleListProps } from '@/types/components';
 import { Article } from '@/types';
 import { feedsApi } from '@/services/api';
@@ -17,7 +17,9 @@ const ArticleList: React.FC<ArticleListProps> = ({
   onArticleRead,
   feeds,
   favoriteArticles,
-  onToggleFavorite
+  onToggleFavorite,
+  hasMore = false,
+  onLoadMore
 }) => {
   const [selectedFeeds, setSelectedFeeds] = useState<string[]>([]);
   const [readFilter, setReadFilter] = useState<'all' | 'read' | 'unread'>('all');
@@ -27,6 +29,20 @@ const ArticleList: React.FC<ArticleListProps> = ({
   const [showFilterSheet, setShowFilterSheet] = useState(false);
   const [showSummaryDialog, setShowSummaryDialog] = useState(false);
   const [currentSummaryArticle, setCurrentSummaryArticle] = useState<Article | null>(null);
+  const loadMoreRef = useRef<HTMLDivElement | null>(null);
+
+  // 一覧の末尾が見えたら続きのページを取得
+  useEffect(() => {
+    const sentinel = loadMoreRef.current;
+    if (!sentinel || !hasMore || !onLoadMore) return;
+    const observer = new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) {
+        onLoadMore();
+      }
+    }, { rootMargin: '400px' });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [hasMore, onLoadMore, articles.length]);
 
   // 画面サイズの検出
   useEffect(() => {
@@ -214,6 +230,7 @@ const ArticleList: React.FC<ArticleListProps> = ({
           ))}
         </div>
       )}
+      {hasMore && <div ref={loadMoreRef} className="h-8" aria-hidden="true" />}
     </div>
   );
 };
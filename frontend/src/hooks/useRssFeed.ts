@@ -1,8 +1,10 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { feedsApi } from '../services/api';
 
-import { MOCK_ARTICLES } from '../mocks/feedData.ts';
-import { Feed, Article, FavoriteArticleData, RssEntry } from '../types';
+import { Feed, Article, FavoriteArticleData, TimelineEntry, TimelineResponse, TimelineStreamEvent } from '../types';
+
+// タイムライン取得時の1ページあたりの記事数
+const TIMELINE_PAGE_SIZE = 100;
 
 
 interface UseRssFeedReturn {
@@ -19,8 +21,31 @@ interface UseRssFeedReturn {
   readArticle: (articleLink: string) => Promise<void>;
   toggleFavorite: (article: Article) => Promise<void>;
   fetchArticles: (feeds: Feed[]) => Promise<void>;
+  hasMoreArticles: boolean;
+  loadMoreArticles: () => Promise<void>;
 }
 
+const toArticles = (entries: TimelineEntry[]): Article[] =>
+  entries.map((article: TimelineEntry) => ({
+    ...article,
+    published: new Date(article.published)
+  }));
+
+// 新しい順に並んだ2つの記事リストを、並べ替えずにマージする
+const mergeByPublished = (current: Article[], incoming: Article[]): Article[] => {
+  const merged: Article[] = [];
+  let i = 0;
+  let j = 0;
+  while (i < current.length && j < incoming.length) {
+    if ((incoming[j].published?.getTime() ?? 0) > (current[i].published?.getTime() ?? 0)) {
+      merged.push(incoming[j++]);
+    } else {
+      merged.push(current[i++]);
+    }
+  }
+  return merged.concat(current.slice(i), incoming.slice(j));
+};
+
 export const useRssFeed = (): UseRssFeedReturn => {
   const [feeds, setFeeds] = useState<Feed[]>([]);
   const [articles, setArticles] = useState<Article[]>([]);
@@ -28,6 +53,9 @@ export const useRssFeed = (): UseRssFeedReturn => {
   const [isLoading, setIsLoading] = useState<boolean>(true);
   const [favoriteArticles, setFavoriteArticles] = useState<string[]>([]);
   const [favoriteArticlesList, setFavoriteArticlesList] = useState<Article[]>([]);
+  // ページ単位で取得したタイムラインの次ページのカーソル（ストリームで取得した場合はnull）
+  const [timelineCursor, setTimelineCursor] = useState<string | null>(null);
+  const loadingMore = useRef(false);
 
   const fetchFeeds = async (): Promise<Feed[]> => {
     try {
@@ -43,45 +71,49 @@ export const useRssFeed = (): UseRssFeedReturn => {
   const fetchArticles = async (feeds: Feed[]): Promise<void> => {
     try {
       setIsLoading(true);
-      const enabledFeeds = feeds.filter(feed => feed.enabled);
-      
-      const fetchedArticles = [];
-      for (const feed of enabledFeeds) {
-        try {
-          console.log(`Fetching feed: ${feed.url}`);
-          const response = await feedsApi.parseFeed(feed.url);
-          
-          // 429エラーの場合、モックデータを使用
-          if (response.data.status === "error" && response.data.code === 429) {
-            console.log(`Using mock data for ${feed.url} due to rate limit`);
-            const mockArticles = MOCK_ARTICLES[feed.url] || [];
-            fetchedArticles.push(...mockArticles);
-          } else if (response.data && response.data.entries) {
-            const feedArticles = response.data.entries.map((article: RssEntry) => ({
-              ...article,
-              feedName: feed.name || feed.url,
-              feedUrl: feed.url
-            }));
-            fetchedArticles.push(...feedArticles);
+      setTimelineCursor(null);
+      if (!feeds.some(feed => feed.enabled)) {
+        setArticles([]);
+        return;
+      }
+
+      // 取得できたフィードから順に表示し、最初の記事が出るまでの時間を短くする
+      let streamedArticles: Article[] = [];
+      let received = false;
+      try {
+        await feedsApi.streamTimeline((event: TimelineStreamEvent) => {
+          if (event.type === 'error') {
+            console.error(`Error fetching articles from ${event.url}:`, event.message);
+            return;
           }
-        } catch (error) {
-          console.error(`Error fetching articles from ${feed.url}:`, error);
-          continue;
+          if (event.type !== 'feed') return;
+          received = true;
+          // 各フィードの記事はサーバー側で新しい順に並んでいるため、全体を並べ替えずにマージする
+          streamedArticles = mergeByPublished(streamedArticles, toArticles(event.entries));
+          setArticles(streamedArticles);
+          setIsLoading(false);
+        });
+        if (streamedArticles.length === 0) {
+          console.warn('No articles fetched from any feed');
+          setArticles([]);
         }
+        return;
+      } catch (error) {
+        if (received) throw error;
+        console.warn('Timeline stream unavailable, falling back to paged timeline:', error);
       }
 
-      if (fetchedArticles.length > 0) {
-        const sortedArticles = fetchedArticles
-          .map(article => ({
-            ...article,
-            published: new Date(article.published)
-          }))
-          .sort((a, b) => b.published.getTime() - a.published.getTime());
-        setArticles(sortedArticles);
-      } else {
+      // サーバー側で全フィードを新しい順にマージしたタイムラインの1ページ目を取得し、
+      // 続きはスクロールに合わせてloadMoreArticlesで取得する
+      const { data }: { data: TimelineResponse } = await feedsApi.getTimeline(TIMELINE_PAGE_SIZE);
+      data.errors.forEach(error => {
+        console.error(`Error fetching articles from ${error.url}:`, error.message);
+      });
+      if (data.entries.length === 0) {
         console.warn('No articles fetched from any feed');
-        setArticles([]);
       }
+      setArticles(toArticles(data.entries));
+      setTimelineCursor(data.next_cursor);
     } catch (error) {
       console.error('Error in fetchArticles:', error);
       setArticles([]);
@@ -90,6 +122,21 @@ export const useRssFeed = (): UseRssFeedReturn => {
     }
   };
 
+  // タイムラインの次ページを取得して末尾に追加
+  const loadMoreArticles = async (): Promise<void> => {
+    if (!timelineCursor || loadingMore.current) return;
+    loadingMore.current = true;
+    try {
+      const { data }: { data: TimelineResponse } = await feedsApi.getTimeline(TIMELINE_PAGE_SIZE, timelineCursor);
+      setArticles(prev => [...prev, ...toArticles(data.entries)]);
+      setTimelineCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Error loading more articles:', error);
+    } finally {
+      loadingMore.current = false;
+    }
+  };
+
   // 初期データの取得
   useEffect(() => {
     const initializeData = async () => {
@@ -316,6 +363,8 @@ export const useRssFeed = (): UseRssFeedReturn => {
     handleToggleFeed,
     readArticle,
     toggleFavorite,
-    fetchArticles
+    fetchArticles,
+    hasMoreArticles: timelineCursor !== null,
+    loadMoreArticles
   };
 }; 
\ No newline at end of file
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Feed, Article, RssFeedResponse, FavoriteArticleRequest } from '../types';
+import { Feed, Article, RssFeedResponse, TimelineResponse, TimelineStreamEvent, FavoriteArticleRequest } from '../types';
 import { debugEnvironment, debugApiRequest, debugApiResponse, debugApiError } from '../utils/debug';
 
 // 開発環境の場合のみデバッグ情報を表示
@@ -68,21 +68,56 @@ export const feedsApi = {
   updateFeed: (id: number, feed: Partial<Feed>) => api.put<Feed>(`/feeds/${id}`, feed),
   deleteFeed: (id: number) => api.delete(`/feeds/${id}`),
   parseFeed: (url: string) => api.get<RssFeedResponse>(`/feeds/parse-feed?url=${encodeURIComponent(url)}`),
+  getTimeline: (limit: number, cursor?: string | null) => api.get<TimelineResponse>('/feeds/timeline', {
+    params: cursor ? { limit, cursor } : { limit }
+  }),
+  // フィードごとの記事を取得できた順に受け取る（NDJSON）
+  streamTimeline: async (onEvent: (event: TimelineStreamEvent) => void) => {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${baseURL}/feeds/timeline/stream?format=ndjson`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      credentials: 'include'
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Timeline stream failed: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      buffer += decoder.decode(value, { stream: !done });
+      const lines = buffer.split('\n');
+      buffer = lines.pop() ?? '';
+      lines.filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
+      if (done) break;
+    }
+  },
   readArticle: (articleLink: string) => api.post('/feeds/read-articles', { article_link: articleLink }),
   getReadArticles: () => api.get('/feeds/read-articles'),
   getFavoriteArticles: () => api.get('/feeds/favorite-articles'),
-  addFavoriteArticle: (article: Article) => api.post('/feeds/favorite-articles', {
-    article_link: article.link,
-    article_title: article.title,
-    article_description: article.description || '',
-    article_image: article.image || '',
-    article_categories: article.categories || [],
-    feed_id: article.feedUrl === 'external://articles' ? null : article.feed_id,
-    is_external: article.feedUrl === 'external://articles'
-    } as FavoriteArticleRequest),
+  addFavoriteArticle: (article: Article) => {
+    const isExternal = article.feedUrl === 'external://articles';
+    const feedId = isExternal ? null : article.feed_id;
+    // 記事ストアにある記事はキーだけを送り、タイトル等はサーバー側で補完する
+    const request: FavoriteArticleRequest = article.article_id
+      ? { article_id: article.article_id, feed_id: feedId, is_external: isExternal }
+      : {
+          article_link: article.link,
+          article_title: article.title,
+          article_description: article.description || '',
+          article_image: article.image || '',
+          article_categories: article.categories || [],
+          feed_id: feedId,
+          is_external: isExternal
+        };
+    return api.post('/feeds/favorite-articles', request);
+  },
   removeFavoriteArticle: (articleLink: string) => api.delete(`/feeds/favorite-articles/${btoa(articleLink)}`),
   summarizeArticle: (article: Article, feedId: number) => api.post('/feeds/articles/summarize', {
     article_link: article.link,
+    article_id: article.article_id,
     feed_id: feedId
   }),
   extractMetadata: (url: string) => api.get(`/feeds/extract-metadata?url=${encodeURIComponent(url)}`),
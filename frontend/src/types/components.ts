@@ -32,4 +32,7 @@ export interface ArticleListProps {
   feeds: Feed[];
   favoriteArticles: string[];
   onToggleFavorite: (article: Article) => void;
+  // 続きのページがある場合に、末尾までスクロールしたとき呼ばれる
+  hasMore?: boolean;
+  onLoadMore?: () => void;
 } 
\ No newline at end of file
@@ -27,6 +27,7 @@ export interface Article {
     image?: string;
     categories?: string[];
     feed_id?: number | null;
+    article_id?: string;
 }
 
 export interface RssEntry {
@@ -36,6 +37,7 @@ export interface RssEntry {
     published: string;
     image?: string;
     categories?: string[];
+    article_id?: string;
   }
   
 export interface RssFeedResponse {
@@ -43,8 +45,31 @@ export interface RssFeedResponse {
     status: string;
     feed: any;
     code?: number;
+    watermark?: string | null;
+    watermark_link?: string | null;
   }
 
+export interface TimelineEntry extends RssEntry {
+    feedName: string;
+    feedUrl: string;
+    feed_id: number;
+  }
+
+export interface TimelineResponse {
+    entries: TimelineEntry[];
+    status: string;
+    next_cursor: string | null;
+    watermark?: string | null;
+    watermark_link?: string | null;
+    errors: { feed_id: number; url: string; message: string }[];
+  }
+
+// /feeds/timeline/stream で送られるイベント
+export type TimelineStreamEvent =
+  | { type: 'feed'; feed_id: number; feedName: string; feedUrl: string; entries: TimelineEntry[]; watermark: string | null; watermark_link: string | null }
+  | { type: 'error'; feed_id: number; url: string; code: number; message: string }
+  | { type: 'done'; feeds: number; errors: number; watermark: string | null; watermark_link: string | null };
+
 // FavoriteArticleBase に相当する基本インターフェース
 export interface FavoriteArticleBase {
     article_link: string;
@@ -54,10 +79,13 @@ export interface FavoriteArticleBase {
     article_categories: string[];
     feed_id?: number | null;
     is_external?: boolean;
+    article_id?: string | null;
 }
 
-// FavoriteArticleCreate に相当する（リクエスト用）
-export interface FavoriteArticleRequest extends FavoriteArticleBase {}
+// FavoriteArticleCreate に相当する（リクエスト用、article_idを指定した場合はリンク等を省略できる）
+export type FavoriteArticleRequest =
+  | FavoriteArticleBase
+  | { article_id: string; feed_id?: number | null; is_external?: boolean };
 
 // FavoriteArticle に相当する（レスポンス用）
 export interface FavoriteArticleData extends FavoriteArticleBase {